@@ -0,0 +1,112 @@
+"""
+Budget Analytics Benchmark for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Compares BudgetModel.analytics() (GROUP BY in SQLite) with the previous
+         fetch-every-row-and-sum-in-Python implementation: latency and peak memory.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m benchmarks.budget_analytics [--rows 200000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.connection_pool import get_pool, close_pool
+from database.migrations import MigrationRunner
+from models.budgetmodel import BudgetModel
+
+CATEGORIES = ['groceries', 'rent', 'transport', 'fun', 'utilities', 'health', 'gifts', 'salary']
+
+
+def legacy_analytics(db_path, trans_type=None, category=None):
+    """The pre-aggregation implementation, kept here as the baseline."""
+    query = 'SELECT amount, category, type FROM transactions'
+    filters = []
+    params = []
+    if trans_type:
+        filters.append("type=?")
+        params.append(trans_type)
+    if category:
+        filters.append("category=?")
+        params.append(category)
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(query, params).fetchall()
+    amounts = [r[0] for r in rows]
+    if not amounts:
+        return None
+    summary = {'sum': sum(amounts), 'average': sum(amounts) / len(amounts), 'by_category': {}}
+    for amt, cat, typ in rows:
+        if cat not in summary['by_category']:
+            summary['by_category'][cat] = {'sum': 0, 'count': 0}
+        summary['by_category'][cat]['sum'] += amt
+        summary['by_category'][cat]['count'] += 1
+    return summary
+
+
+def seed(db_path, rows):
+    rng = random.Random(42)
+    with sqlite3.connect(db_path) as conn:
+        MigrationRunner(conn).migrate()
+        conn.executemany(
+            'INSERT INTO transactions (name, amount, category, type, userId, timestamp) VALUES (?, ?, ?, ?, ?, ?)',
+            ((f'tx {i}', round(rng.uniform(1, 500), 2), rng.choice(CATEGORIES),
+              'income' if rng.random() < 0.2 else 'expense', rng.randint(1, 100),
+              f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00')
+             for i in range(rows)))
+        conn.commit()
+        conn.execute('ANALYZE')
+
+
+def measure(fn, repeat):
+    fn()  # warm the page cache for both contenders
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    # Memory is traced in a separate run; tracemalloc would skew the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings) * 1000, peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=200000, help='transactions to seed')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (best is reported)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        seed(db_path, args.rows)
+        model = BudgetModel(db_path)
+        cases = [
+            ('all rows', {}),
+            ('type=expense', {'trans_type': 'expense'}),
+            ('category=rent', {'category': 'rent'}),
+        ]
+        print(f"{args.rows} transactions\n")
+        print(f"{'Case':<16} {'legacy ms':>10} {'legacy KiB':>11} {'sql ms':>8} {'sql KiB':>8} {'speedup':>8}")
+        print("-" * 66)
+        for label, kwargs in cases:
+            old_ms, old_kib = measure(lambda: legacy_analytics(db_path, **kwargs), args.repeat)
+            new_ms, new_kib = measure(lambda: model.analytics(**kwargs), args.repeat)
+            print(f"{label:<16} {old_ms:>10.1f} {old_kib:>11.0f} {new_ms:>8.1f} {new_kib:>8.0f} {old_ms / new_ms:>7.1f}x")
+        close_pool(db_path)
+
+
+if __name__ == '__main__':
+    main()
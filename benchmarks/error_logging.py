@@ -0,0 +1,105 @@
+"""
+Error Logging Benchmark for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Compares the time logging.error() holds the calling thread (mean, 99th percentile
+         and worst call) with the old synchronous file handler (logging.basicConfig) and with
+         the queued JSON pipeline (models/errorlog.py), for distinct messages and for one
+         failure repeated, as during a credential-stuffing burst. Also reports how long the
+         listener took to write the queued records out, off the request thread.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m benchmarks.error_logging [--calls 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.errorlog import LogPipeline
+
+
+def file_handler(path):
+    """The handler logging.basicConfig(filename=...) installed."""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    return handler, None
+
+
+def pipeline_handler(path, calls):
+    pipeline = LogPipeline(path, logging.ERROR, max_bytes=0, backups=0, queue_size=calls + 1)
+    return pipeline.handler, pipeline
+
+
+def measure(make_handler, messages, repeat):
+    """
+    Microseconds the calling thread spent per call (mean, 99th percentile, worst) in the
+    run with the best mean, and that run's drain time in ms.
+    """
+    best = None
+    for run in range(repeat + 1):
+        handler, pipeline = make_handler()
+        logger = logging.getLogger(f'benchmark.error_logging.{id(handler)}.{run}')
+        logger.propagate = False
+        logger.addHandler(handler)
+        calls = []
+        for message in messages:
+            started = time.perf_counter()
+            logger.error(message)
+            calls.append(time.perf_counter() - started)
+        drain_started = time.perf_counter()
+        if pipeline is not None:
+            pipeline.stop()
+        handler.close()
+        drain = time.perf_counter() - drain_started
+        mean = sum(calls) / len(calls)
+        if run and (best is None or mean < best[0]):    # the first run warms up
+            calls.sort()
+            best = (mean, calls[int(len(calls) * 0.99)], calls[-1], drain)
+    mean, p99, worst, drain = best
+    return mean * 1e6, p99 * 1e6, worst * 1e6, drain * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=20000, help='logging.error() calls per timed run')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (best is reported)')
+    args = parser.parse_args(argv)
+
+    distinct = [f'Login failed: no user #{i}' for i in range(args.calls)]
+    repeated = ['Login failed: Invalid credentials.'] * args.calls
+    with tempfile.TemporaryDirectory() as tmp:
+        def path(name):
+            return os.path.join(tmp, name)
+
+        cases = [
+            ('file, distinct', lambda: file_handler(path('file.log')), distinct),
+            ('queue, distinct', lambda: pipeline_handler(path('queue.log'), args.calls), distinct),
+            ('file, repeated', lambda: file_handler(path('file.log')), repeated),
+            ('queue, repeated', lambda: pipeline_handler(path('sampled.log'), args.calls), repeated),
+        ]
+        results = [(label, *measure(make, messages, args.repeat)) for label, make, messages in cases]
+
+        # Every queued distinct record must reach the file as a JSON line
+        with open(path('queue.log'), encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        if [line['message'] for line in lines[-args.calls:]] != distinct:
+            print("✗ the queued pipeline lost or reordered records")
+            return 1
+
+        print(f"{args.calls} logging.error() calls per run\n")
+        print(f"{'Case':<18} {'us/call':>8} {'p99 us':>8} {'max us':>9} {'drain ms':>9}")
+        print("-" * 56)
+        for label, us, p99, worst, drain in results:
+            print(f"{label:<18} {us:>8.2f} {p99:>8.2f} {worst:>9.1f} {drain:>9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
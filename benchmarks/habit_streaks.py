@@ -0,0 +1,154 @@
+"""
+Habit Streaks Benchmark for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Compares fetching every streak of a user's habits with per-habit loops (one
+         query and a Python walk per habit), the single-pass window-function query
+         and the stored streak columns read with the habit list. The legacy loop only
+         walks back to the first gap; computing longest streaks too means walking all
+         of each habit's history, which is what the one-pass query does.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m benchmarks.habit_streaks [--habits 50] [--days 1095] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.connection_pool import close_pool
+from database.migrations import MigrationRunner
+from models.habitmodel import HabitModel
+
+USER_ID = 1
+
+
+def legacy_habit_streak(conn, habit_id):
+    """The pre-stored-streak HabitModel.habit_streak, kept here as the baseline."""
+    rows = conn.execute('SELECT completionDate FROM habit_completions WHERE habitId=? ORDER BY completionDate DESC',
+                        (habit_id,)).fetchall()
+    if not rows:
+        return 0
+    today = datetime.utcnow().date()
+    streak = 0
+    prev_date = None
+    for (date_str,) in rows:
+        d = datetime.strptime(date_str, '%Y-%m-%d').date()
+        if prev_date is None:
+            if d == today or d == today - timedelta(days=1):
+                streak = 1
+            else:
+                break
+        else:
+            if (prev_date - d).days == 1:
+                streak += 1
+            else:
+                break
+        prev_date = d
+    return streak
+
+
+def full_habit_streak(conn, habit_id):
+    """Current and longest streak from one walk over the habit's whole history."""
+    today = datetime.utcnow().date()
+    current = longest = 0
+    prev_date = None
+    for (date_str,) in conn.execute('SELECT DISTINCT completionDate FROM habit_completions WHERE habitId=? '
+                                    'ORDER BY completionDate', (habit_id,)):
+        d = datetime.strptime(date_str, '%Y-%m-%d').date()
+        current = current + 1 if prev_date is not None and (d - prev_date).days == 1 else 1
+        longest = max(longest, current)
+        prev_date = d
+    if prev_date is None or prev_date < today - timedelta(days=1):
+        current = 0
+    return current, longest
+
+
+def per_habit_loop(db_path, streak=legacy_habit_streak):
+    with sqlite3.connect(db_path) as conn:
+        habit_ids = [row[0] for row in conn.execute('SELECT habitId FROM habits WHERE userId=?', (USER_ID,))]
+        return {habit_id: streak(conn, habit_id) for habit_id in habit_ids}
+
+
+def seed(db_path, habits, days):
+    """habits habits for USER_ID (plus other users' noise), each completed on ~85% of the last days days."""
+    rng = random.Random(42)
+    today = datetime.utcnow().date()
+    with sqlite3.connect(db_path) as conn:
+        MigrationRunner(conn).migrate()
+        conn.executemany('INSERT INTO habits (userId, habitName) VALUES (?, ?)',
+                         [(user_id, f'habit {i}') for user_id in range(1, 11) for i in range(habits)])
+        conn.executemany(
+            'INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+            ((habit_id, (today - timedelta(days=offset)).strftime('%Y-%m-%d'))
+             for habit_id in range(1, habits * 10 + 1)
+             for offset in range(days - 1, -1, -1) if rng.random() < 0.85))
+        conn.commit()
+        conn.execute('ANALYZE')
+
+
+def measure(fn, repeat):
+    fn()  # warm the page cache for every contender
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    # Memory is traced in a separate run; tracemalloc would skew the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings) * 1000, peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--habits', type=int, default=50, help='habits per user')
+    parser.add_argument('--days', type=int, default=3 * 365, help='days of completion history')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (best is reported)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        seed(db_path, args.habits, args.days)
+        model = HabitModel(db_path)
+
+        # Every contender must agree before any timing is reported
+        current = per_habit_loop(db_path)
+        full = per_habit_loop(db_path, full_habit_streak)
+        computed = {k: (v['currentStreak'], v['longestStreak']) for k, v in model.compute_streaks(USER_ID).items()}
+        stored = {h['habitId']: (h['currentStreak'], h['longestStreak'])
+                  for h in model.get_habits(USER_ID, include_streaks=True)}
+        if not (full == computed == stored and current == {k: v[0] for k, v in full.items()}):
+            print("✗ Streak implementations disagree")
+            close_pool(db_path)
+            return 1
+
+        cases = [
+            ('loop, current', 'current', lambda: per_habit_loop(db_path)),
+            ('loop, full', 'both', lambda: per_habit_loop(db_path, full_habit_streak)),
+            ('one-pass query', 'both', lambda: model.compute_streaks(USER_ID)),
+            ('stored columns', 'both', lambda: model.get_habits(USER_ID, include_streaks=True)),
+        ]
+        print(f"{args.habits} habits x {args.days} days for one user; speedup is against 'loop, full'\n")
+        print(f"{'Case':<16} {'streaks':>8} {'ms':>8} {'KiB':>8} {'speedup':>8}")
+        print("-" * 52)
+        results = [(label, streaks, *measure(fn, args.repeat)) for label, streaks, fn in cases]
+        baseline = results[1][2]
+        for label, streaks, ms, kib in results:
+            print(f"{label:<16} {streaks:>8} {ms:>8.1f} {kib:>8.0f} {baseline / ms:>7.1f}x")
+        close_pool(db_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
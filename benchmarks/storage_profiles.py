@@ -0,0 +1,96 @@
+"""
+Storage Profile Benchmark for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Compares write throughput and p99 commit latency of each storage profile
+         with several concurrent writers, the way the Flask services hit arcadia.db.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m benchmarks.storage_profiles [--writers 6] [--writes 300]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.connection_pool import ConnectionPool
+from database.storage_profile import STORAGE_PROFILES
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _ms(value):
+    """Latency column: n/a when no write succeeded."""
+    return f"{value:>8.2f}" if value is not None else f"{'n/a':>8}"
+
+
+def run_profile(profile, writers, writes_per_writer):
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(os.path.join(tmp, 'bench.db'), max_size=writers, profile=profile)
+        with pool.connection() as conn:
+            conn.execute('''CREATE TABLE transactions (
+                transactionId INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL, amount REAL NOT NULL, category TEXT NOT NULL,
+                type TEXT NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def writer(worker_id):
+            local = []
+            for i in range(writes_per_writer):
+                started = time.perf_counter()
+                try:
+                    with pool.connection() as conn:
+                        conn.execute(
+                            'INSERT INTO transactions (name, amount, category, type) VALUES (?, ?, ?, ?)',
+                            (f'bench {worker_id}-{i}', 12.5, 'bench', 'expense'))
+                except Exception as e:
+                    with lock:
+                        errors.append(str(e))
+                    continue
+                local.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        pool.close()
+    return {
+        'profile': profile,
+        'writes_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+        'errors': len(errors),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=6, help='concurrent writer threads (default: 6 services)')
+    parser.add_argument('--writes', type=int, default=300, help='commits per writer')
+    args = parser.parse_args(argv)
+
+    print(f"{'Profile':<16} {'Writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'Errors':>7}")
+    print("-" * 53)
+    for profile in STORAGE_PROFILES:
+        r = run_profile(profile, args.writers, args.writes)
+        print(f"{r['profile']:<16} {r['writes_per_sec']:>10.0f} {_ms(r['p50_ms'])} {_ms(r['p99_ms'])} {r['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
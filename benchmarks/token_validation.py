@@ -0,0 +1,93 @@
+"""
+Token Validation Benchmark for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Compares AuthManager.validate_token() for opaque tokens read from auth_tokens on
+         every call (cache off), opaque tokens behind the token cache, and signed tokens
+         checked in memory, over many users' tokens validated round-robin.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m benchmarks.token_validation [--users 500] [--calls 20000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from calendar import timegm
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.connection_pool import close_pool
+from database.migrations import MigrationRunner
+from models.authmanager import AuthManager
+
+
+def seed(db_path, users):
+    """One opaque and one signed token per user; bcrypt is skipped by inserting tokens directly."""
+    expires = datetime.utcnow() + timedelta(hours=1)
+    with sqlite3.connect(db_path) as conn:
+        MigrationRunner(conn).migrate()
+        conn.executemany('INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, ?)',
+                         [(f'opaque-token-{user_id:06d}', user_id, expires.strftime('%Y-%m-%d %H:%M:%S'))
+                          for user_id in range(1, users + 1)])
+        conn.commit()
+        conn.execute('ANALYZE')
+    signer = AuthManager(db_path, token_kind='signed')
+    opaque = [f'opaque-token-{user_id:06d}' for user_id in range(1, users + 1)]
+    signed = [signer.signed_tokens.issue(user_id, timegm(expires.timetuple())) for user_id in range(1, users + 1)]
+    return opaque, signed
+
+
+def measure(manager, tokens, calls, repeat):
+    def run():
+        for i in range(calls):
+            manager.validate_token(tokens[i % len(tokens)])
+    run()  # warm the page cache, token cache and deny-list
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings) / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=500, help='users with a live token')
+    parser.add_argument('--calls', type=int, default=20000, help='validations per timed run')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (best is reported)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        opaque, signed = seed(db_path, args.users)
+        cases = [
+            ('opaque, no cache', AuthManager(db_path, token_cache_mode='off'), opaque),
+            ('opaque, cached', AuthManager(db_path, token_cache_mode='shared'), opaque),
+            ('signed', AuthManager(db_path, token_kind='signed'), signed),
+        ]
+        # Every contender must agree before any timing is reported
+        expected = list(range(1, args.users + 1))
+        for label, manager, tokens in cases:
+            if [manager.validate_token(token) for token in tokens] != expected:
+                print(f"✗ {label} returned the wrong users")
+                close_pool(db_path)
+                return 1
+
+        print(f"{args.users} users, {args.calls} validations per run\n")
+        print(f"{'Case':<18} {'us/call':>8} {'speedup':>8}")
+        print("-" * 36)
+        results = [(label, measure(manager, tokens, args.calls, args.repeat)) for label, manager, tokens in cases]
+        baseline = results[0][1]
+        for label, us in results:
+            print(f"{label:<18} {us:>8.2f} {baseline / us:>7.1f}x")
+        close_pool(db_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
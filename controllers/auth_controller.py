@@ -8,11 +8,33 @@ Description:
     Calls AuthManager model for database and security logic.
 """
 
+import math
 from flask import Flask, request, jsonify
 from models.authmanager import AuthManager, AuthError
+from models.errorlog import logging_stats
+from models.hashpool import get_hash_pool, HashPoolBusy
+from models.ratelimiter import RateLimiter, RateLimited
+from models.tokensweeper import TokenSweeper
 
 app = Flask(__name__)
 auth_manager = AuthManager()
+# Started by the entry point below; WSGI deployments call token_sweeper.start() or run
+# `python -m database.maintenance sweep-tokens` from cron
+token_sweeper = TokenSweeper(auth_manager.db_path)
+# Checked before any bcrypt work. request.remote_addr is the client only when the app is
+# served directly; behind a reverse proxy wrap app.wsgi_app in werkzeug's ProxyFix
+rate_limiter = RateLimiter(auth_manager.db_path)
+
+# Seconds a client is asked to wait when the bcrypt pool is full
+BUSY_RETRY_AFTER = 1
+
+@app.errorhandler(HashPoolBusy)
+def hash_pool_busy(e):
+    return jsonify({"error": str(e)}), 503, {"Retry-After": str(BUSY_RETRY_AFTER)}
+
+@app.errorhandler(RateLimited)
+def rate_limited(e):
+    return jsonify({"error": str(e)}), 429, {"Retry-After": str(math.ceil(e.retry_after))}
 
 @app.route("/auth/register", methods=["POST"])
 def register():
@@ -21,6 +43,9 @@ def register():
     password = data.get("password", "")
     if not username or not password:
         return jsonify({"error": "Missing username or password"}), 400
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({"error": "Username and password must be strings"}), 400
+    rate_limiter.check(request.remote_addr, username)
     try:
         auth_manager.register_user(username, password)
         return jsonify({"message": f"User {username} registered."}), 201
@@ -35,6 +60,9 @@ def login():
     remember_me = bool(data.get("rememberMe", False))
     if not username or not password:
         return jsonify({"error": "Missing username or password"}), 400
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({"error": "Username and password must be strings"}), 400
+    rate_limiter.check(request.remote_addr, username)
     try:
         token = auth_manager.login(username, password, remember_me)
         return jsonify({"token": token}), 200
@@ -69,6 +97,26 @@ def logout():
 def health():
     return jsonify({"status": "ok"}), 200
 
+@app.route("/auth/hash-pool/stats", methods=["GET"])
+def hash_pool_stats():
+    return jsonify({"hashPool": get_hash_pool().stats()}), 200
+
+@app.route("/auth/token-cache/stats", methods=["GET"])
+def token_cache_stats():
+    return jsonify({"tokenCache": auth_manager.token_cache_stats()}), 200
+
+@app.route("/auth/token-sweeper/stats", methods=["GET"])
+def token_sweeper_stats():
+    return jsonify({"tokenSweeper": token_sweeper.stats()}), 200
+
+@app.route("/auth/rate-limit/stats", methods=["GET"])
+def rate_limit_stats():
+    return jsonify({"rateLimit": rate_limiter.stats()}), 200
+
+@app.route("/auth/logging/stats", methods=["GET"])
+def error_log_stats():
+    return jsonify({"errorLog": logging_stats()}), 200
+
 @app.route("/auth/request-password-reset", methods=["POST"])
 def request_password_reset():
     data = request.get_json(force=True)
@@ -95,4 +143,5 @@ def validate_password_reset():
         return jsonify({"error": str(e)}), 400
 
 if __name__ == "__main__":
+    token_sweeper.start()
     app.run(debug=True)
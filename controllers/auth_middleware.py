@@ -0,0 +1,130 @@
+"""
+File: auth_middleware.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Bearer-token authentication shared by every Flask service.
+    require_auth(app) installs a before_request hook that validates the
+    Authorization header once per request through AuthManager (whose token
+    cache or signed tokens usually answer without a query), stores the user
+    in flask.g and rejects requests whose userId (query string, JSON body or
+    URL) names a different user. The time spent authenticating is sent back
+    in a Server-Timing header and summed per app in auth_stats(app).
+"""
+
+import threading
+import time
+from flask import g, jsonify, request
+from models.authmanager import AuthManager, AuthError
+
+# Endpoints that answer without a token
+EXEMPT_ENDPOINTS = ('health', 'static')
+
+_auth_manager = None
+_auth_manager_lock = threading.Lock()
+
+
+def get_auth_manager():
+    """The process-wide AuthManager, shared by all services so they share its token cache."""
+    global _auth_manager
+    with _auth_manager_lock:
+        if _auth_manager is None:
+            _auth_manager = AuthManager()
+        return _auth_manager
+
+
+def set_auth_manager(manager):
+    """Replace the process-wide AuthManager (e.g. with one on another database); returns the old one."""
+    global _auth_manager
+    with _auth_manager_lock:
+        old, _auth_manager = _auth_manager, manager
+        return old
+
+
+def current_user_id():
+    """userId of the authenticated caller of the current request."""
+    return g.user_id
+
+
+class AuthStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, rejected):
+        with self._lock:
+            self.requests += 1
+            self.rejected += rejected
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'rejected': self.rejected,
+                'avgMs': round(self.total / self.requests * 1000, 3) if self.requests else 0.0,
+                'maxMs': round(self.max * 1000, 3),
+            }
+
+
+def _error(message, status):
+    headers = {'WWW-Authenticate': 'Bearer'} if status == 401 else {}
+    return jsonify({'success': False, 'error': message}), status, headers
+
+
+def _claimed_user_ids():
+    """Every userId the request names, as strings."""
+    claimed = request.args.getlist('userId')
+    # Only JSON bodies are read: uploads such as statement imports stream request.stream themselves
+    body = request.get_json(silent=True) if request.is_json else None
+    if isinstance(body, dict) and body.get('userId') is not None:
+        claimed.append(body['userId'])
+    if request.view_args and 'user_id' in request.view_args:
+        claimed.append(request.view_args['user_id'])
+    return {str(user_id) for user_id in claimed}
+
+
+def _authenticate(stats, exempt):
+    if request.method == 'OPTIONS' or request.endpoint in exempt:
+        return None
+    started = time.perf_counter()
+    response = None
+    header = request.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        response = _error('Missing bearer token', 401)
+    else:
+        try:
+            g.user_id = get_auth_manager().validate_token(token.strip())
+        except AuthError:
+            response = _error('Invalid or expired token', 401)
+    if response is None and _claimed_user_ids() - {str(g.user_id)}:
+        response = _error('userId does not match the signed-in user', 403)
+    g.auth_seconds = time.perf_counter() - started
+    stats.add(g.auth_seconds, response is not None)
+    return response
+
+
+def _add_server_timing(response):
+    seconds = g.get('auth_seconds')
+    if seconds is not None:
+        response.headers.add('Server-Timing', f'auth;dur={seconds * 1000:.3f}')
+    return response
+
+
+def require_auth(app, exempt=EXEMPT_ENDPOINTS):
+    """Require a valid bearer token on every endpoint of app except those named in exempt."""
+    stats = AuthStats()
+    app.extensions['arcadia_auth'] = stats
+    app.before_request(lambda: _authenticate(stats, exempt))
+    app.after_request(_add_server_timing)
+    return app
+
+
+def auth_stats(app):
+    """Request count, rejections and time spent authenticating for an app set up by require_auth()."""
+    return app.extensions['arcadia_auth'].stats()
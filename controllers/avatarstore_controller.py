@@ -10,8 +10,10 @@ Description:
 
 from flask import Flask, request, jsonify
 from models.avatarstoremodel import AvatarStoreModel
+from controllers.auth_middleware import require_auth
 
 app = Flask(__name__)
+require_auth(app)
 store_model = AvatarStoreModel()
 
 @app.route('/store/purchase', methods=['POST'])
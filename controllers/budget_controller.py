@@ -7,12 +7,25 @@ Description:
     Input/output validation and error handling.
 """
 
-from flask import Flask, request, jsonify
-from models.budgetmodel import BudgetModel
+import csv
+import io
+import json
+from flask import Flask, Response, request, jsonify
+from models.budgetmodel import BudgetModel, FORECAST_WINDOW_DAYS
+from models.budgetimport import StatementImporter, DEFAULT_CATEGORY
+from controllers.auth_middleware import require_auth, current_user_id
 
 app = Flask(__name__)
+require_auth(app)
 budget_model = BudgetModel()
 
+def _owns_transaction(transaction_id):
+    # Other users' transactions answer 404, as if they did not exist
+    return budget_model.transaction_owner(transaction_id) == current_user_id()
+
+def _owns_goal(goal_id):
+    return budget_model.goal_owner(goal_id) == current_user_id()
+
 @app.route('/transactions', methods=['POST'])
 def add_transaction():
     data = request.get_json()
@@ -22,11 +35,37 @@ def add_transaction():
     trans_type = data.get('type')
     if not name or amount is None or not category or trans_type not in ('expense', 'income'):
         return jsonify(success=False, error='Missing or invalid fields'), 400
-    transaction_id = budget_model.add_transaction(name, amount, category, trans_type)
+    try:
+        transaction_id = budget_model.add_transaction(name, amount, category, trans_type, current_user_id())
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
     return jsonify(success=True, transactionId=transaction_id), 201
 
+@app.route('/transactions/import', methods=['POST'])
+def import_statement():
+    # Accepts a multipart upload ("file") or the statement as the raw request body
+    upload = request.files.get('file')
+    fmt = request.args.get('format')
+    if upload is not None:
+        fmt = fmt or ('ofx' if (upload.filename or '').lower().endswith(('.ofx', '.qfx')) else 'csv')
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    else:
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    try:
+        summary = StatementImporter(budget_model).import_stream(
+            stream,
+            fmt or 'csv',
+            user_id=current_user_id(),
+            default_category=request.args.get('defaultCategory', DEFAULT_CATEGORY)
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify(success=False, error=str(e)), 400
+    return jsonify(success=True, **summary), 200
+
 @app.route('/transactions/<int:transaction_id>', methods=['PUT'])
 def update_transaction(transaction_id):
+    if not _owns_transaction(transaction_id):
+        return jsonify(success=False, error='Transaction not found'), 404
     data = request.get_json()
     fields = {k: data[k] for k in ['name', 'amount', 'category', 'type'] if k in data}
     if not fields:
@@ -38,35 +77,109 @@ def update_transaction(transaction_id):
 
 @app.route('/transactions/<int:transaction_id>', methods=['GET'])
 def view_transaction(transaction_id):
-    result = budget_model.get_transaction(transaction_id)
-    if not result:
+    if not _owns_transaction(transaction_id):
         return jsonify(success=False, error='Transaction not found'), 404
+    result = budget_model.get_transaction(transaction_id)
     return jsonify(success=True, transaction=result), 200
 
 @app.route('/transactions', methods=['GET'])
 def list_transactions():
-    transactions = budget_model.list_transactions()
-    return jsonify(success=True, transactions=transactions), 200
+    fields = request.args.get('fields')
+    try:
+        transactions, next_cursor = budget_model.list_transactions(
+            user_id=current_user_id(),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            start_date=request.args.get('startDate'),
+            end_date=request.args.get('endDate'),
+            trans_type=request.args.get('type'),
+            category=request.args.get('category'),
+            fields=fields.split(',') if fields else None
+        )
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+    return jsonify(success=True, transactions=transactions, nextCursor=next_cursor), 200
 
 @app.route('/transactions/<int:transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
+    if not _owns_transaction(transaction_id):
+        return jsonify(success=False, error='Transaction not found'), 404
     budget_model.delete_transaction(transaction_id)
     return jsonify(success=True), 200
 
 @app.route('/analytics', methods=['GET'])
 def analytics():
-    trans_type = request.args.get('type')
-    category = request.args.get('category')
-    summary = budget_model.analytics(trans_type, category)
+    try:
+        summary = budget_model.analytics(
+            request.args.get('type'),
+            request.args.get('category'),
+            start_date=request.args.get('startDate'),
+            end_date=request.args.get('endDate'),
+            user_id=current_user_id(),
+            include_distribution='distribution' in request.args.get('include', '').split(',')
+        )
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
     return jsonify(success=True, summary=summary), 200
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(success=True, cache=budget_model.cache_stats()), 200
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # header-only output for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _ndjson_chunks(columns, batches):
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+
+EXPORT_FORMATS = {
+    'csv': (_csv_chunks, 'text/csv'),
+    'ndjson': (_ndjson_chunks, 'application/x-ndjson'),
+}
+
+@app.route('/export/<dataset>', methods=['GET'])
+def export(dataset):
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify(success=False, error='Unsupported format'), 400
+    try:
+        columns, batches = budget_model.export(
+            dataset,
+            user_id=current_user_id(),
+            goal_id=request.args.get('goalId', type=int),
+            start_date=request.args.get('startDate'),
+            end_date=request.args.get('endDate'),
+            trans_type=request.args.get('type'),
+            category=request.args.get('category')
+        )
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+    encode, mimetype = EXPORT_FORMATS[fmt]
+    return Response(
+        encode(columns, batches),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={dataset}.{fmt}'}
+    )
+
 @app.route('/savings/goals', methods=['POST'])
 def create_savings_goal():
     data = request.get_json()
-    required = ['userId', 'name', 'targetAmount']
+    required = ['name', 'targetAmount']
     if not all(field in data and data[field] for field in required):
         return jsonify(success=False, error="Missing fields"), 400
     goal_id = budget_model.create_savings_goal(
-        data['userId'], data['name'], data['targetAmount'],
+        current_user_id(), data['name'], data['targetAmount'],
         data.get('deadline'), data.get('notes')
     )
     return jsonify(success=True, goalId=goal_id), 201
@@ -76,10 +189,22 @@ def list_goals(user_id):
     goals = budget_model.get_goals(user_id)
     return jsonify(success=True, goals=goals), 200
 
+@app.route('/savings/goals/<int:user_id>/forecast', methods=['GET'])
+def forecast_goals(user_id):
+    try:
+        forecasts = budget_model.forecast_goals(
+            user_id,
+            as_of=request.args.get('asOf'),
+            window_days=request.args.get('windowDays', FORECAST_WINDOW_DAYS, type=int)
+        )
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+    return jsonify(success=True, forecasts=forecasts), 200
+
 @app.route('/savings/goal/<int:goal_id>', methods=['GET'])
 def get_goal(goal_id):
     goal = budget_model.get_goal(goal_id)
-    if not goal:
+    if not goal or goal['userId'] != current_user_id():
         return jsonify(success=False, error="Goal not found"), 404
     return jsonify(success=True, goal=goal), 200
 
@@ -89,19 +214,33 @@ def contribute_to_goal():
     try:
         amt = float(data['amount'])
         new_amt = budget_model.contribute_to_goal(
-            data['goalId'], data['userId'], amt, data.get('direction', 'deposit')
+            data['goalId'], current_user_id(), amt, data.get('direction', 'deposit')
         )
         return jsonify(success=True, newAmount=new_amt), 200
     except Exception as e:
         return jsonify(success=False, error=str(e)), 400
 
+@app.route('/savings/contribute/batch', methods=['POST'])
+def contribute_batch():
+    data = request.get_json()
+    contributions = data.get('contributions') if isinstance(data, dict) else None
+    if not isinstance(contributions, list) or not all(isinstance(c, dict) for c in contributions):
+        return jsonify(success=False, error="contributions must be a list of objects"), 400
+    # Every contribution is made as the signed-in user, whatever userId an item names
+    results = budget_model.contribute_many([{**c, 'userId': current_user_id()} for c in contributions])
+    return jsonify(success=True, results=results), 200
+
 @app.route('/savings/goal/<int:goal_id>/transactions', methods=['GET'])
 def list_goal_transactions(goal_id):
+    if not _owns_goal(goal_id):
+        return jsonify(success=False, error="Goal not found"), 404
     txs = budget_model.list_goal_transactions(goal_id)
     return jsonify(success=True, transactions=txs), 200
 
 @app.route('/savings/goal/<int:goal_id>', methods=['DELETE'])
 def delete_goal(goal_id):
+    if not _owns_goal(goal_id):
+        return jsonify(success=False, error="Goal not found"), 404
     budget_model.delete_goal(goal_id)
     return jsonify(success=True), 200
 
@@ -7,18 +7,29 @@ Description:
     Routes call HabitModel for logic and DB access.
 """
 
+from datetime import datetime
 from flask import Flask, request, jsonify
 from models.habitmodel import HabitModel
+from database import completion_calendar as calendar
+from controllers.auth_middleware import require_auth, current_user_id
 
 app = Flask(__name__)
+require_auth(app)
 habit_model = HabitModel()
 
+def _owns_habit(habit_id):
+    # Other users' habits answer 404, as if they did not exist
+    return habit_model.habit_owner(habit_id) == current_user_id()
+
+def _habit_not_found():
+    return jsonify({'success': False, 'error': 'Habit not found'}), 404
+
 @app.route('/habits', methods=['POST'])
 def create_habit():
     data = request.get_json()
     try:
         habit_id = habit_model.create_habit(
-            user_id=data.get('userId'),
+            user_id=current_user_id(),
             habit_name=data.get('habitName'),
             description=data.get('description'),
             category=data.get('category'),
@@ -35,11 +46,25 @@ def get_habits():
     user_id = request.args.get('userId')
     if not user_id:
         return jsonify({'success': False, 'error': 'userId required'}), 400
-    habits = habit_model.get_habits(user_id)
+    include_streaks = 'streaks' in request.args.get('include', '').split(',')
+    habits = habit_model.get_habits(user_id, include_streaks=include_streaks)
     return jsonify({'success': True, 'habits': habits}), 200
 
+@app.route('/habits/analytics', methods=['GET'])
+def habit_analytics():
+    user_id = request.args.get('userId', type=int)
+    if user_id is None:
+        return jsonify({'success': False, 'error': 'userId required'}), 400
+    try:
+        analytics = habit_model.analytics(user_id, as_of=request.args.get('asOf'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'analytics': analytics}), 200
+
 @app.route('/habits/<int:habit_id>', methods=['PUT'])
 def update_habit(habit_id):
+    if not _owns_habit(habit_id):
+        return _habit_not_found()
     data = request.get_json()
     try:
         habit_model.update_habit(habit_id, **data)
@@ -49,20 +74,68 @@ def update_habit(habit_id):
 
 @app.route('/habits/<int:habit_id>', methods=['DELETE'])
 def delete_habit(habit_id):
+    if not _owns_habit(habit_id):
+        return _habit_not_found()
     habit_model.delete_habit(habit_id)
     return jsonify({'success': True}), 200
 
 @app.route('/habits/<int:habit_id>/check-in', methods=['POST'])
 def habit_check_in(habit_id):
+    if not _owns_habit(habit_id):
+        return _habit_not_found()
     success = habit_model.habit_check_in(habit_id)
     if not success:
         return jsonify({'success': False, 'error': 'Already checked in today'}), 400
     return jsonify({'success': True}), 201
 
+@app.route('/habits/check-ins', methods=['POST'])
+def habit_check_in_many():
+    # Bulk and backfilled check-ins, e.g. an offline client syncing a week at once
+    data = request.get_json(silent=True)
+    check_ins = data.get('checkIns') if isinstance(data, dict) else None
+    if not isinstance(check_ins, list) or not all(isinstance(item, dict) for item in check_ins):
+        return jsonify({'success': False, 'error': 'checkIns must be a list of objects'}), 400
+    try:
+        results, streaks = habit_model.check_in_many(check_ins, current_user_id())
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'results': results,
+        'streaks': [{'habitId': habit_id, **info} for habit_id, info in sorted(streaks.items())]
+    }), 200
+
 @app.route('/habits/<int:habit_id>/streak', methods=['GET'])
 def habit_streak(habit_id):
-    streak = habit_model.habit_streak(habit_id)
-    return jsonify({'success': True, 'streak': streak}), 200
+    if not _owns_habit(habit_id):
+        return _habit_not_found()
+    info = habit_model.streak_info(habit_id)
+    if info is None:
+        return jsonify({'success': True, 'streak': 0, 'longestStreak': 0, 'lastCompletionDate': None}), 200
+    return jsonify({
+        'success': True,
+        'streak': info['currentStreak'],
+        'longestStreak': info['longestStreak'],
+        'lastCompletionDate': info['lastCompletionDate']
+    }), 200
+
+@app.route('/habits/<int:habit_id>/calendar', methods=['GET'])
+def habit_calendar(habit_id):
+    if not _owns_habit(habit_id):
+        return _habit_not_found()
+    # One year of completions as a base64 day bitmap: day d (0 = Jan 1) is bit d % 8 of byte d // 8
+    year = request.args.get('year', datetime.utcnow().year, type=int)
+    if not 1 <= year <= 9999:
+        return jsonify({'success': False, 'error': 'Invalid year'}), 400
+    bitmap = habit_model.completion_calendar(habit_id, year)
+    return jsonify({
+        'success': True,
+        'habitId': habit_id,
+        'year': year,
+        'days': calendar.days_in_year(year),
+        'completedDays': calendar.count_days(bitmap),
+        'bitmap': calendar.encode(bitmap)
+    }), 200
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
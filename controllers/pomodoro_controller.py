@@ -9,9 +9,10 @@ Description:
 
 from flask import Flask, request, jsonify
 from models.pomodoromodel import PomodoroModel
-import sqlite3
+from controllers.auth_middleware import require_auth
 
 app = Flask(__name__)
+require_auth(app)
 pomodoro_model = PomodoroModel()
 
 @app.route("/pomodoro/session", methods=["POST"])
@@ -39,11 +40,10 @@ def create_pomodoro_session():
 
 @app.route("/pomodoro/streak/<int:user_id>", methods=["GET"])
 def get_streak(user_id):
-    conn = sqlite3.connect("arcadia.db")
-    cur = conn.cursor()
-    cur.execute("SELECT streak FROM user WHERE userId=?", (user_id,))
-    row = cur.fetchone()
-    conn.close()
+    with pomodoro_model._get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT streak FROM user WHERE userId=?", (user_id,))
+        row = cur.fetchone()
     if row:
         return jsonify({"userId": user_id, "streak": row[0]}), 200
     else:
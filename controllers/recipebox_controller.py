@@ -9,8 +9,10 @@ Description:
 
 from flask import Flask, request, jsonify
 from models.recipeboxmodel import RecipeBoxModel
+from controllers.auth_middleware import require_auth
 
 app = Flask(__name__)
+require_auth(app)
 recipe_model = RecipeBoxModel()
 
 @app.route('/recipes', methods=['POST'])
@@ -10,9 +10,10 @@ Description:
 
 from flask import Flask, request, jsonify
 from models.studysessionmodel import StudySessionModel
-import sqlite3
+from controllers.auth_middleware import require_auth
 
 app = Flask(__name__)
+require_auth(app)
 session_model = StudySessionModel()
 
 @app.route('/study/session', methods=['POST'])
@@ -33,12 +34,10 @@ def log_study_session():
 
 @app.route('/study/sessions/<int:user_id>', methods=['GET'])
 def view_study_sessions(user_id):
-    conn = sqlite3.connect("arcadia.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM study_sessions WHERE userId=? ORDER BY sessionId DESC", (user_id,))
-    colnames = [desc[0] for desc in cursor.description]
-    sessions = [dict(zip(colnames, row)) for row in cursor.fetchall()]
-    conn.close()
+    with session_model._get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM study_sessions WHERE userId=? ORDER BY sessionId DESC", (user_id,))
+        sessions = [dict(row) for row in cursor.fetchall()]
     return jsonify({'success': True, 'sessions': sessions}), 200
 
 if __name__ == '__main__':
@@ -9,8 +9,10 @@ Description:
 
 from flask import Flask, request, jsonify
 from models.taskmodel import TaskModel
+from controllers.auth_middleware import require_auth
 
 app = Flask(__name__)
+require_auth(app)
 task_model = TaskModel()
 
 @app.route('/tasks', methods=['POST'])
@@ -5,5 +5,8 @@ Last Modified: November 5, 2025
 """
 
 from .db_manager import DatabaseManager
+from .storage_profile import STORAGE_PROFILES, get_profile, apply_storage_profile
+from .connection_pool import ConnectionPool, PoolTimeout, get_pool, close_pool, close_all_pools
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'STORAGE_PROFILES', 'get_profile', 'apply_storage_profile',
+           'ConnectionPool', 'PoolTimeout', 'get_pool', 'close_pool', 'close_all_pools']
@@ -0,0 +1,77 @@
+"""
+Completion Calendar for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Per-year day bitmaps of habit completions behind heatmaps and completion rates
+Last Modified: October 18, 2026
+
+habit_calendar holds one row per (habit, year). Bit d of the year's bitmap is set when
+the habit has a completion on day d of that year (0 is January 1st). SQLite integers are
+64 bits, so the 366 bits are stored as WORDS INTEGER columns: word k holds days 64k to
+64k + 63. A word with bit 63 set reads as negative, which SQLite's bitwise operators
+do not mind. Python joins the words into one int for bit operations, and the API sends
+it as CALENDAR_BYTES little-endian bytes (day d is bit d % 8 of byte d // 8).
+"""
+
+import base64
+from datetime import date, timedelta
+
+WORD_BITS = 64
+WORDS = 6
+WORD_COLUMNS = [f'w{k}' for k in range(WORDS)]
+CALENDAR_BYTES = 46  # 366 bits
+
+_WORD_MASK = (1 << WORD_BITS) - 1
+
+
+def year_sql(day):
+    """SQL for the year of a 'YYYY-MM-DD' expression, NULL if it is not a date."""
+    return f"CAST(strftime('%Y', {day}) AS INTEGER)"
+
+
+def day_index_sql(day):
+    """SQL for the 0-based day of the year of a 'YYYY-MM-DD' expression."""
+    return f"(CAST(strftime('%j', {day}) AS INTEGER) - 1)"
+
+
+def word_mask_sql(k, index):
+    """SQL for the bit a day index sets in word k: 0 unless the day falls in that word."""
+    return f"(CASE WHEN {index} / {WORD_BITS} = {k} THEN 1 << ({index} % {WORD_BITS}) ELSE 0 END)"
+
+
+def join_words(words):
+    """Bitmap (a non-negative int) from the stored words w0..w5."""
+    bitmap = 0
+    for k, word in enumerate(words):
+        bitmap |= ((word or 0) & _WORD_MASK) << (WORD_BITS * k)
+    return bitmap
+
+
+def days_in_year(year):
+    return date(year, 12, 31).timetuple().tm_yday
+
+
+def day_index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def range_mask(first, last):
+    """Bits first..last (day indexes, inclusive) set."""
+    return ((1 << (last - first + 1)) - 1) << first if last >= first else 0
+
+
+def count_days(bitmap):
+    return bin(bitmap).count('1')
+
+
+def completion_dates(bitmap, year):
+    """The dates whose bits are set, in order."""
+    start = date(year, 1, 1)
+    return [start + timedelta(days=d) for d in range(days_in_year(year)) if bitmap >> d & 1]
+
+
+def encode(bitmap):
+    return base64.b64encode(bitmap.to_bytes(CALENDAR_BYTES, 'little')).decode('ascii')
+
+
+def decode(payload):
+    return int.from_bytes(base64.b64decode(payload), 'little')
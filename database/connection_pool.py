@@ -0,0 +1,232 @@
+"""
+Connection Pool for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Shares a bounded set of SQLite connections between models and threads
+Last Modified: October 18, 2026
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from .storage_profile import apply_storage_profile
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 10
+DEFAULT_CACHED_STATEMENTS = 256
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-aware pool of SQLite connections for one database file.
+
+    Connections are opened lazily up to max_size, configured with the
+    storage profile, and handed back to the pool after use instead of
+    being closed. A thread that checks out a connection while it already
+    holds one gets the same connection back, so nested model calls never
+    deadlock waiting on the pool.
+    """
+
+    def __init__(self, db_path, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 cached_statements=DEFAULT_CACHED_STATEMENTS,
+                 health_check_interval=HEALTH_CHECK_INTERVAL, profile=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.health_check_interval = health_check_interval
+        self.profile = profile
+        self._idle = deque()  # (connection, last_used)
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._connect_hooks = []
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+
+    def add_connect_hook(self, hook):
+        """Run hook(conn) on every new connection, and on idle ones right away."""
+        with self._cond:
+            self._connect_hooks.append(hook)
+            for conn, _ in self._idle:
+                hook(conn)
+
+    def _create(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        apply_storage_profile(conn, self.profile)
+        for hook in self._connect_hooks:
+            hook(conn)
+        self.created += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used):
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self.discarded += 1
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for a free slot."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                while self._idle:
+                    conn, last_used = self._idle.pop()
+                    if self._is_healthy(conn, last_used):
+                        self.checkouts += 1
+                        return conn
+                    self._discard(conn)
+                    self._size -= 1
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"Timed out waiting for a connection to {self.db_path}")
+                self._cond.wait(remaining)
+        try:
+            conn = self._create()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self.checkouts += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back anything left uncommitted."""
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            broken = True
+        with self._cond:
+            if broken or self._closed:
+                self._discard(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, row_factory=None):
+        """
+        Context manager yielding a pooled connection.
+
+        Mirrors `with sqlite3.connect(...) as conn`: the outermost block
+        commits on success and rolls back on error, then returns the
+        connection to the pool.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            previous = held.row_factory
+            held.row_factory = row_factory
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+                held.row_factory = previous
+            return
+
+        conn = self.acquire()
+        conn.row_factory = row_factory
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self.release(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'created': self.created,
+                'discarded': self.discarded,
+                'checkouts': self.checkouts,
+            }
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self._size -= 1
+            self._cond.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_path):
+    return db_path if db_path == ':memory:' else os.path.abspath(db_path)
+
+
+def get_pool(db_path, **kwargs):
+    """Return the shared pool for db_path, creating it on first use."""
+    key = _pool_key(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_pool(db_path):
+    with _pools_lock:
+        pool = _pools.pop(_pool_key(db_path), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
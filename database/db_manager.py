@@ -7,17 +7,20 @@ Last Modified: November 5, 2025
 
 import sqlite3
 from datetime import datetime
+from .storage_profile import apply_storage_profile
 
 class DatabaseManager:
     """Manages SQLite database connections and operations for Arcadia Planner"""
-    def __init__(self, db_path='arcadia.db'):
+    def __init__(self, db_path='arcadia.db', profile=None):
         self.db_path = db_path
+        self.profile = profile
         self.connection = None
         self.cursor = None
 
     def connect(self):
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            self.connection = sqlite3.connect(self.db_path, timeout=10)
+            apply_storage_profile(self.connection, self.profile)
             self.connection.row_factory = sqlite3.Row  # Dict-style results
             self.cursor = self.connection.cursor()
             print(f"✓ Connected to database: {self.db_path}")
@@ -105,6 +108,22 @@ class DatabaseManager:
             print(f"✗ Error creating tables: {e}")
             return False
 
+    def run_migrations(self, target=None, dry_run=False):
+        """Apply pending schema migrations. Returns the list of migrations applied."""
+        from .migrations import MigrationRunner, MigrationError
+        if not self.connection:
+            print("✗ Error: No database connection. Call connect() first.")
+            return None
+        try:
+            applied = MigrationRunner(self.connection).migrate(target=target, dry_run=dry_run)
+            for migration in applied:
+                verb = "Pending" if dry_run else "✓ Applied migration"
+                print(f"{verb} v{migration.version}: {migration.description}")
+            return applied
+        except MigrationError as e:
+            print(f"✗ {e}")
+            return None
+
     def verify_tables(self):
         try:
             required_tables = ['users', 'tasks', 'user_currency']
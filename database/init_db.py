@@ -27,10 +27,10 @@ def initialize_database():
         print("✗ Failed to connect to database. Exiting.")
         sys.exit(1)
     
-    # Step 2: Create all tables
-    print("\nStep 2: Creating database tables...")
-    if not db.create_tables():
-        print("✗ Failed to create tables. Exiting.")
+    # Step 2: Create all tables and indexes through the migration runner
+    print("\nStep 2: Applying schema migrations...")
+    if db.run_migrations() is None:
+        print("✗ Failed to apply migrations. Exiting.")
         db.disconnect()
         sys.exit(1)
     
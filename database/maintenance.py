@@ -0,0 +1,215 @@
+"""
+Maintenance Commands for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Rebuilds derived data (budget rollups, amount sketches, habit streaks and calendars) from source rows
+         and sweeps expired tokens
+Last Modified: October 18, 2026
+
+Usage:
+    python -m database.maintenance rebuild-rollups [--db arcadia.db]
+    python -m database.maintenance rebuild-sketches [--db arcadia.db]
+    python -m database.maintenance rebuild-streaks [--db arcadia.db]
+    python -m database.maintenance rebuild-calendars [--db arcadia.db]
+    python -m database.maintenance sweep-tokens [--db arcadia.db]
+"""
+
+import argparse
+import sys
+import time
+
+from .completion_calendar import WORD_COLUMNS, year_sql, day_index_sql, word_mask_sql
+
+# Rollup buckets: period name -> length of the timestamp prefix that identifies the bucket
+ROLLUP_PERIODS = {'day': 10, 'month': 7}
+
+# amount_buckets lookup used by the sketch triggers and rebuild
+AMOUNT_BUCKET_OF = 'SELECT bucket FROM amount_buckets WHERE upperBound >= {amount} ORDER BY upperBound LIMIT 1'
+
+
+def rebuild_budget_rollups(conn):
+    """Regenerate budget_rollups from transactions. Returns the number of buckets written."""
+    conn.execute('DELETE FROM budget_rollups')
+    written = 0
+    for period, prefix in ROLLUP_PERIODS.items():
+        cur = conn.execute(f'''
+            INSERT INTO budget_rollups (period, periodStart, userId, type, category, total, count, minAmount, maxAmount)
+            SELECT '{period}', IFNULL(substr(timestamp, 1, {prefix}), 'unknown'), IFNULL(userId, 0), type, category,
+                   SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+            FROM transactions
+            GROUP BY 2, 3, 4, 5
+        ''')
+        written += cur.rowcount
+    return written
+
+
+def rebuild_budget_sketches(conn):
+    """Regenerate budget_sketches from transactions. Returns the number of sketch rows written."""
+    conn.execute('DELETE FROM budget_sketches')
+    bucket_of = AMOUNT_BUCKET_OF.format(amount='t.amount')
+    written = 0
+    for period, prefix in ROLLUP_PERIODS.items():
+        cur = conn.execute(f'''
+            INSERT INTO budget_sketches (period, periodStart, userId, type, category, bucket, count)
+            SELECT '{period}', IFNULL(substr(t.timestamp, 1, {prefix}), 'unknown'), IFNULL(t.userId, 0),
+                   t.type, t.category, ({bucket_of}), COUNT(*)
+            FROM transactions t
+            GROUP BY 2, 3, 4, 5, 6
+        ''')
+        written += cur.rowcount
+    return written
+
+
+# Runs of consecutive completion days for one habit (gaps and islands: day number minus
+# row number is constant within a run). No CTE, so it can be used inside triggers.
+HABIT_RUNS = '''(SELECT MAX(day) AS lastDay, COUNT(*) AS length FROM (
+        SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS grp
+        FROM (SELECT DISTINCT completionDate AS day FROM habit_completions WHERE habitId = {habit})
+    ) GROUP BY grp)'''
+
+
+def habit_streak_values(habit):
+    """SELECT yielding (currentStreak, longestStreak, lastCompletionDate) for habit id expression `habit`."""
+    runs = HABIT_RUNS.format(habit=habit)
+    return f'''SELECT IFNULL((SELECT length FROM {runs} ORDER BY lastDay DESC LIMIT 1), 0),
+                      IFNULL((SELECT MAX(length) FROM {runs}), 0),
+                      (SELECT MAX(completionDate) FROM habit_completions WHERE habitId = {habit})'''
+
+
+def habit_streaks_query(habit_filter='1'):
+    """
+    SELECT yielding (habitId, currentStreak, longestStreak, lastCompletionDate) for every habit
+    matching habit_filter (an expression over habits h) in one pass over habit_completions.
+    Gaps and islands: consecutive days of a habit share julianday(day) minus their row number.
+    """
+    return f'''
+        WITH days AS (
+            SELECT DISTINCT c.habitId, c.completionDate AS day
+            FROM habits h JOIN habit_completions c ON c.habitId = h.habitId
+            WHERE {habit_filter}
+        ), runs AS (
+            SELECT habitId, MAX(day) AS lastDay, COUNT(*) AS length
+            FROM (SELECT habitId, day,
+                         julianday(day) - ROW_NUMBER() OVER (PARTITION BY habitId ORDER BY day) AS grp
+                  FROM days)
+            GROUP BY habitId, grp
+        ), ranked AS (
+            SELECT habitId, lastDay, length,
+                   MAX(length) OVER (PARTITION BY habitId) AS longest,
+                   ROW_NUMBER() OVER (PARTITION BY habitId ORDER BY lastDay DESC) AS latest
+            FROM runs
+        )
+        SELECT habitId, length AS currentStreak, longest AS longestStreak, lastDay AS lastCompletionDate
+        FROM ranked WHERE latest = 1
+        UNION ALL
+        SELECT h.habitId, 0, 0, NULL FROM habits h
+        WHERE {habit_filter} AND NOT EXISTS (SELECT 1 FROM habit_completions c WHERE c.habitId = h.habitId)'''
+
+
+def rebuild_habit_streaks(conn, user_id=None):
+    """
+    Recompute the stored streak columns of every habit (or one user's habits) in a single
+    pass. Returns the number of habits updated.
+    """
+    habit_filter, params = ('h.userId = ?', (user_id, user_id)) if user_id is not None else ('1', ())
+    cur = conn.execute(f'''
+        UPDATE habits SET (currentStreak, longestStreak, lastCompletionDate) =
+            (s.currentStreak, s.longestStreak, s.lastCompletionDate)
+        FROM ({habit_streaks_query(habit_filter)}) AS s
+        WHERE habits.habitId = s.habitId
+    ''', params)
+    return cur.rowcount
+
+
+def rebuild_habit_calendars(conn):
+    """Recompute habit_calendar from habit_completions. Returns the number of rows written."""
+    conn.execute('DELETE FROM habit_calendar')
+    # Distinct days, so each bit is summed once
+    words = ', '.join(f'SUM({word_mask_sql(k, "dayIndex")})' for k in range(len(WORD_COLUMNS)))
+    cur = conn.execute(f'''
+        INSERT INTO habit_calendar (habitId, year, {', '.join(WORD_COLUMNS)})
+        SELECT habitId, year, {words}
+        FROM (SELECT DISTINCT habitId, {year_sql('completionDate')} AS year,
+                     {day_index_sql('completionDate')} AS dayIndex
+              FROM habit_completions)
+        WHERE year IS NOT NULL
+        GROUP BY habitId, year
+    ''')
+    return cur.rowcount
+
+
+# (table, condition) pairs deleted by sweep_expired_tokens; each condition is an index range
+TOKEN_SWEEPS = [
+    ('auth_tokens', 'expiresEpoch < :now'),
+    ('password_reset_tokens', 'expiresEpoch < :now'),
+    ('password_reset_tokens', 'used = 1'),
+    ('auth_token_denylist', 'expiresEpoch < :now'),
+    ('auth_rate_limits', 'fullAt < :now'),
+]
+SWEEP_BATCH_SIZE = 500
+
+
+def sweep_expired_tokens(conn, now=None, batch_size=SWEEP_BATCH_SIZE, pause=0.0):
+    """
+    Delete expired auth and password reset tokens, used reset tokens, deny-list
+    entries whose tokens have all expired and rate-limit buckets that have refilled.
+    Each batch of at most batch_size rows is its own transaction, so the write lock is
+    held only briefly, with pause seconds between batches. Returns {table: rows deleted}.
+    """
+    params = {'now': int(time.time()) if now is None else now, 'batch': batch_size}
+    reclaimed = {}
+    for table, condition in TOKEN_SWEEPS:
+        reclaimed.setdefault(table, 0)
+        while True:
+            deleted = conn.execute(f'''
+                DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT :batch)
+            ''', params).rowcount
+            conn.commit()
+            reclaimed[table] += deleted
+            if deleted < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return reclaimed
+
+
+COMMANDS = {
+    'rebuild-rollups': ('Rebuild budget rollups from transactions', rebuild_budget_rollups, 'buckets written'),
+    'rebuild-sketches': ('Rebuild budget amount sketches from transactions', rebuild_budget_sketches, 'rows written'),
+    'rebuild-streaks': ('Rebuild habit streaks from completions', rebuild_habit_streaks, 'habits updated'),
+    'rebuild-calendars': ('Rebuild habit completion calendars', rebuild_habit_calendars, 'rows written'),
+    'sweep-tokens': ('Sweep expired and used tokens', sweep_expired_tokens, 'rows reclaimed'),
+}
+
+
+def main(argv=None):
+    from .db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Arcadia Planner maintenance commands.')
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    parser.add_argument('--db', default='arcadia.db', help='database file (default: arcadia.db)')
+    args = parser.parse_args(argv)
+
+    description, fn, unit = COMMANDS[args.command]
+    db = DatabaseManager(args.db)
+    if not db.connect():
+        return 1
+    try:
+        result = fn(db.connection)
+        db.connection.commit()
+        detail = ''
+        if isinstance(result, dict):
+            # Per-table counts
+            detail = f" ({', '.join(f'{name}: {n}' for name, n in result.items())})"
+            result = sum(result.values())
+        print(f"✓ {description}: {result} {unit}{detail}")
+        return 0
+    except Exception as e:
+        db.connection.rollback()
+        print(f"✗ {description} failed: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
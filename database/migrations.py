@@ -0,0 +1,717 @@
+"""
+Schema Migrations for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Versioned, ordered up-migrations for arcadia.db tracked in a schema_version table
+Last Modified: October 18, 2026
+
+Usage:
+    python -m database.migrations [--db arcadia.db] [--status] [--dry-run] [--target N]
+
+To change the schema, append a Migration with the next version number to
+MIGRATIONS. Never edit or reorder a migration that has already shipped.
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from .maintenance import (ROLLUP_PERIODS, AMOUNT_BUCKET_OF, rebuild_budget_rollups, rebuild_budget_sketches,
+                          habit_streak_values, rebuild_habit_streaks, rebuild_habit_calendars)
+from .quantile_sketch import bucket_bounds
+from .completion_calendar import WORD_COLUMNS, year_sql, day_index_sql, word_mask_sql
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    """
+    One schema step. Each step is either a SQL string or a callable
+    taking the connection, for changes that need to inspect the schema first.
+    """
+    def __init__(self, version, description, steps):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+    def describe_steps(self):
+        for step in self.steps:
+            if callable(step):
+                yield getattr(step, 'description', step.__name__)
+            else:
+                yield ' '.join(step.split())
+
+
+def column_exists(conn, table, column):
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def add_column(table, column, declaration):
+    """Migration step that adds a column unless an older manual ALTER already did."""
+    def step(conn):
+        if not column_exists(conn, table, column):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    step.description = f"ALTER TABLE {table} ADD COLUMN {column} {declaration}"
+    return step
+
+
+BASELINE_SCHEMA = [
+    # users is the desktop app's account table (src/controllers/auth_manager.py)
+    '''CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(40) UNIQUE NOT NULL,
+        password VARCHAR(64) NOT NULL,
+        points INTEGER DEFAULT 0,
+        xp INTEGER DEFAULT 0,
+        glitter INTEGER DEFAULT 0,
+        daily_goal INTEGER DEFAULT 10,
+        avatar_id INTEGER DEFAULT 1,
+        streak INTEGER DEFAULT 0,
+        last_login DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS "user" (
+        userId INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(40) UNIQUE NOT NULL,
+        password BLOB NOT NULL,
+        xp INTEGER DEFAULT 0,
+        glitter INTEGER DEFAULT 0,
+        streak INTEGER DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS user_currency (
+        user_id INTEGER PRIMARY KEY,
+        xp INTEGER DEFAULT 0,
+        glitter INTEGER DEFAULT 0,
+        level INTEGER DEFAULT 1,
+        streak_days INTEGER DEFAULT 0,
+        last_login DATETIME,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS auth_tokens (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        expires_at DATETIME NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES user(id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS password_reset_tokens (
+        token TEXT PRIMARY KEY NOT NULL,
+        user_id INTEGER NOT NULL,
+        expires_at TEXT NOT NULL,
+        used INTEGER DEFAULT 0,
+        FOREIGN KEY(user_id) REFERENCES user(userId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS tasks (
+        taskId INTEGER PRIMARY KEY AUTOINCREMENT,
+        userId INTEGER NOT NULL,
+        category TEXT,
+        colorShade INTEGER,
+        title TEXT NOT NULL,
+        description TEXT,
+        dueDate TEXT,
+        doDate TEXT,
+        url TEXT,
+        orderIndex INTEGER,
+        FOREIGN KEY(userId) REFERENCES user(id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS habits (
+        habitId INTEGER PRIMARY KEY AUTOINCREMENT,
+        userId INTEGER NOT NULL,
+        habitName TEXT NOT NULL,
+        description TEXT,
+        category TEXT,
+        frequency TEXT,
+        startDate TEXT,
+        colorShade INTEGER,
+        created_at TEXT DEFAULT (DATETIME('now')),
+        FOREIGN KEY(userId) REFERENCES user(userId),
+        UNIQUE(userId, habitName)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS habit_completions (
+        completionId INTEGER PRIMARY KEY AUTOINCREMENT,
+        habitId INTEGER NOT NULL,
+        completionDate TEXT NOT NULL,
+        FOREIGN KEY(habitId) REFERENCES habits(habitId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS categories (
+        categoryId INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS subcategories (
+        subcategoryId INTEGER PRIMARY KEY AUTOINCREMENT,
+        categoryId INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        FOREIGN KEY (categoryId) REFERENCES categories(categoryId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS stickers (
+        stickerId INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        imageURL TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS recipes (
+        recipeId INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        instructions TEXT,
+        categoryId INTEGER,
+        subcategoryId INTEGER,
+        stickerId INTEGER,
+        measurement REAL,
+        createdAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updatedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(categoryId) REFERENCES categories(categoryId),
+        FOREIGN KEY(subcategoryId) REFERENCES subcategories(subcategoryId),
+        FOREIGN KEY(stickerId) REFERENCES stickers(stickerId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS recipe_stickers (
+        recipeId INTEGER NOT NULL,
+        stickerId INTEGER NOT NULL,
+        FOREIGN KEY (recipeId) REFERENCES recipes(recipeId),
+        FOREIGN KEY (stickerId) REFERENCES stickers(stickerId),
+        PRIMARY KEY (recipeId, stickerId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS transactions (
+        transactionId INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        type TEXT NOT NULL CHECK(type IN ('expense', 'income')),
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS savings_goals (
+        goalId INTEGER PRIMARY KEY AUTOINCREMENT,
+        userId INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        targetAmount REAL NOT NULL,
+        currentAmount REAL DEFAULT 0,
+        createdAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+        deadline DATE,
+        notes TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS savings_transactions (
+        transactionId INTEGER PRIMARY KEY AUTOINCREMENT,
+        goalId INTEGER NOT NULL,
+        userId INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        direction TEXT CHECK(direction IN ('deposit', 'withdrawal')),
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(goalId) REFERENCES savings_goals(goalId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS store_items (
+        itemId INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(50) NOT NULL,
+        description TEXT,
+        rarity VARCHAR(20),
+        glitterCost INTEGER NOT NULL,
+        appearance VARCHAR(255),
+        available INTEGER DEFAULT 1
+    )''',
+    '''CREATE TABLE IF NOT EXISTS user_inventory (
+        inventoryId INTEGER PRIMARY KEY AUTOINCREMENT,
+        userId INTEGER NOT NULL,
+        itemId INTEGER NOT NULL,
+        FOREIGN KEY(userId) REFERENCES users(userId),
+        FOREIGN KEY(itemId) REFERENCES store_items(itemId)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS study_sessions (
+        sessionId INTEGER PRIMARY KEY AUTOINCREMENT,
+        userId INTEGER NOT NULL,
+        startTime DATETIME NOT NULL,
+        endTime DATETIME NOT NULL,
+        duration INTEGER NOT NULL,
+        streakTimer INTEGER DEFAULT 0,
+        xpEarned INTEGER DEFAULT 0,
+        pomodoroSetting VARCHAR(20),
+        FOREIGN KEY(userId) REFERENCES user(userId)
+    )''',
+]
+
+# auth_tokens(token) is already covered by its PRIMARY KEY index
+HOT_QUERY_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_habit_completions_habit_date ON habit_completions(habitId, completionDate)',
+    'CREATE INDEX IF NOT EXISTS idx_study_sessions_user_end ON study_sessions(userId, endTime)',
+    'CREATE INDEX IF NOT EXISTS idx_tasks_user_order ON tasks(userId, orderIndex)',
+    'CREATE INDEX IF NOT EXISTS idx_savings_goals_user ON savings_goals(userId)',
+    'CREATE INDEX IF NOT EXISTS idx_savings_transactions_goal_time ON savings_transactions(goalId, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_auth_tokens_user ON auth_tokens(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_user_inventory_user_item ON user_inventory(userId, itemId)',
+    'CREATE INDEX IF NOT EXISTS idx_transactions_category_type ON transactions(category, type)',
+    'CREATE INDEX IF NOT EXISTS idx_recipes_category_sub ON recipes(categoryId, subcategoryId)',
+]
+
+# Lets budget analytics filter per user and answer GROUP BY category from the index alone
+BUDGET_ANALYTICS = [
+    add_column('transactions', 'userId', 'INTEGER'),
+    'CREATE INDEX IF NOT EXISTS idx_transactions_user_time ON transactions(userId, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_transactions_category_type_amount ON transactions(category, type, amount)',
+    'DROP INDEX IF EXISTS idx_transactions_category_type',
+]
+
+def _rollup_add(row):
+    """Trigger statements that add transaction `row` (NEW/OLD) to its day and month buckets."""
+    return [f'''
+        INSERT INTO budget_rollups (period, periodStart, userId, type, category, total, count, minAmount, maxAmount)
+        VALUES ('{period}', IFNULL(substr({row}.timestamp, 1, {prefix}), 'unknown'), IFNULL({row}.userId, 0),
+                {row}.type, {row}.category, {row}.amount, 1, {row}.amount, {row}.amount)
+        ON CONFLICT(period, periodStart, userId, type, category) DO UPDATE SET
+            total = total + excluded.total,
+            count = count + 1,
+            minAmount = MIN(minAmount, excluded.minAmount),
+            maxAmount = MAX(maxAmount, excluded.maxAmount);'''
+        for period, prefix in ROLLUP_PERIODS.items()]
+
+
+def _rollup_remove(row):
+    """
+    Trigger statements that take transaction `row` out of its buckets.
+    MIN/MAX are only recomputed (from the indexed bucket range) when the row was an extreme.
+    Undated rows share the 'unknown' bucket and NULL users share user 0, as in the bucket key.
+    """
+    statements = []
+    for period, prefix in ROLLUP_PERIODS.items():
+        bucket = f"IFNULL(substr({row}.timestamp, 1, {prefix}), 'unknown')"
+        key = (f"period = '{period}' AND periodStart = {bucket} AND userId = IFNULL({row}.userId, 0) "
+               f"AND type = {row}.type AND category = {row}.category")
+        start = bucket if period == 'day' else f"{bucket} || '-01'"
+        span = "'+1 day'" if period == 'day' else "'+1 month'"
+        in_bucket = (f"(timestamp IS NULL AND {row}.timestamp IS NULL "
+                     f"OR timestamp >= {start} AND timestamp < date({start}, {span}))")
+        source = (f"FROM transactions WHERE IFNULL(userId, 0) = IFNULL({row}.userId, 0) AND type = {row}.type "
+                  f"AND category = {row}.category AND {in_bucket}")
+        statements += [
+            f"UPDATE budget_rollups SET total = total - {row}.amount, count = count - 1 WHERE {key};",
+            f"DELETE FROM budget_rollups WHERE {key} AND count <= 0;",
+            f'''UPDATE budget_rollups SET
+                minAmount = (SELECT MIN(amount) {source}),
+                maxAmount = (SELECT MAX(amount) {source})
+             WHERE {key} AND ({row}.amount <= minAmount OR {row}.amount >= maxAmount);''',
+        ]
+    return statements
+
+
+def _trigger(name, event, body, table='transactions'):
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON {table} BEGIN {' '.join(body)} END"
+
+
+# Per user/type/category/day and month aggregates, kept in step with transactions by
+# triggers so every writer (models, imports, manual SQL) updates them in the same transaction
+BUDGET_ROLLUPS = [
+    '''CREATE TABLE IF NOT EXISTS budget_rollups (
+        period TEXT NOT NULL CHECK(period IN ('day', 'month')),
+        periodStart TEXT NOT NULL,
+        userId INTEGER NOT NULL DEFAULT 0,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        minAmount REAL,
+        maxAmount REAL,
+        PRIMARY KEY (period, periodStart, userId, type, category)
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS idx_budget_rollups_user ON budget_rollups(userId, period, periodStart)',
+    _trigger('trg_transactions_rollup_insert', 'AFTER INSERT', _rollup_add('NEW')),
+    _trigger('trg_transactions_rollup_delete', 'AFTER DELETE', _rollup_remove('OLD')),
+    _trigger('trg_transactions_rollup_update', 'AFTER UPDATE OF amount, category, type, userId, timestamp',
+             _rollup_remove('OLD') + _rollup_add('NEW')),
+    rebuild_budget_rollups,
+]
+
+# Keyset pagination of transaction listings (newest first) when no user filter applies;
+# per-user pages walk idx_transactions_user_time
+TRANSACTION_PAGING = [
+    'CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions(timestamp)',
+]
+
+# Per-user savings history exports, oldest first
+SAVINGS_EXPORT = [
+    'CREATE INDEX IF NOT EXISTS idx_savings_transactions_user_time ON savings_transactions(userId, timestamp)',
+]
+
+# Statement imports remember a hash of each row so re-importing a file skips what is already there
+STATEMENT_IMPORT = [
+    add_column('transactions', 'contentHash', 'TEXT'),
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_content_hash ON transactions(contentHash) '
+    'WHERE contentHash IS NOT NULL',
+]
+
+def _fill_amount_buckets(conn):
+    conn.execute('DELETE FROM amount_buckets')
+    conn.executemany('INSERT INTO amount_buckets (bucket, lowerBound, upperBound, value) VALUES (?, ?, ?, ?)',
+                     bucket_bounds())
+
+
+def _sketch_key(row, period, prefix):
+    return (f"period = '{period}' AND periodStart = IFNULL(substr({row}.timestamp, 1, {prefix}), 'unknown') "
+            f"AND userId = IFNULL({row}.userId, 0) AND type = {row}.type AND category = {row}.category "
+            f"AND bucket = ({AMOUNT_BUCKET_OF.format(amount=f'{row}.amount')})")
+
+
+def _sketch_add(row):
+    """Trigger statements that count transaction `row` in its day and month sketches."""
+    bucket_of = AMOUNT_BUCKET_OF.format(amount=f'{row}.amount')
+    return [f'''
+        INSERT INTO budget_sketches (period, periodStart, userId, type, category, bucket, count)
+        VALUES ('{period}', IFNULL(substr({row}.timestamp, 1, {prefix}), 'unknown'), IFNULL({row}.userId, 0),
+                {row}.type, {row}.category, ({bucket_of}), 1)
+        ON CONFLICT(period, periodStart, userId, type, category, bucket) DO UPDATE SET count = count + 1;'''
+        for period, prefix in ROLLUP_PERIODS.items()]
+
+
+def _sketch_remove(row):
+    statements = []
+    for period, prefix in ROLLUP_PERIODS.items():
+        key = _sketch_key(row, period, prefix)
+        statements += [
+            f"UPDATE budget_sketches SET count = count - 1 WHERE {key};",
+            f"DELETE FROM budget_sketches WHERE {key} AND count <= 0;",
+        ]
+    return statements
+
+
+# Mergeable amount sketches (see database/quantile_sketch.py) next to the rollups, for
+# approximate median/p90 and histograms; same bucket keys, same trigger maintenance
+BUDGET_SKETCHES = [
+    '''CREATE TABLE IF NOT EXISTS amount_buckets (
+        bucket INTEGER PRIMARY KEY,
+        lowerBound REAL,
+        upperBound REAL NOT NULL UNIQUE,
+        value REAL NOT NULL
+    )''',
+    _fill_amount_buckets,
+    '''CREATE TABLE IF NOT EXISTS budget_sketches (
+        period TEXT NOT NULL CHECK(period IN ('day', 'month')),
+        periodStart TEXT NOT NULL,
+        userId INTEGER NOT NULL DEFAULT 0,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, periodStart, userId, type, category, bucket)
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS idx_budget_sketches_user ON budget_sketches(userId, period, periodStart)',
+    _trigger('trg_transactions_sketch_insert', 'AFTER INSERT', _sketch_add('NEW')),
+    _trigger('trg_transactions_sketch_delete', 'AFTER DELETE', _sketch_remove('OLD')),
+    _trigger('trg_transactions_sketch_update', 'AFTER UPDATE OF amount, category, type, userId, timestamp',
+             _sketch_remove('OLD') + _sketch_add('NEW')),
+    rebuild_budget_sketches,
+]
+
+def _streak_recompute(habit, condition='1'):
+    return (f"UPDATE habits SET (currentStreak, longestStreak, lastCompletionDate) = ({habit_streak_values(habit)}) "
+            f"WHERE habitId = {habit} AND {condition};")
+
+
+# A check-in on or after the last completion extends or restarts the run in O(1); a
+# backfilled day can join runs, so it (like deletes and edits) recomputes that habit
+_STREAK_EXTENDS = "lastCompletionDate = date(NEW.completionDate, '-1 day')"
+_STREAK_CHECK_IN = [
+    f'''UPDATE habits SET
+            currentStreak = CASE WHEN {_STREAK_EXTENDS} THEN currentStreak + 1 ELSE 1 END,
+            longestStreak = MAX(longestStreak, CASE WHEN {_STREAK_EXTENDS} THEN currentStreak + 1 ELSE 1 END),
+            lastCompletionDate = NEW.completionDate
+        WHERE habitId = NEW.habitId AND (lastCompletionDate IS NULL OR NEW.completionDate > lastCompletionDate);''',
+    _streak_recompute('NEW.habitId', 'NEW.completionDate < lastCompletionDate'),
+]
+
+# Current/longest streak and last completion stored on the habit so reading a streak is O(1)
+HABIT_STREAKS = [
+    add_column('habits', 'currentStreak', 'INTEGER NOT NULL DEFAULT 0'),
+    add_column('habits', 'longestStreak', 'INTEGER NOT NULL DEFAULT 0'),
+    add_column('habits', 'lastCompletionDate', 'TEXT'),
+    _trigger('trg_habit_completions_streak_insert', 'AFTER INSERT', _STREAK_CHECK_IN, 'habit_completions'),
+    _trigger('trg_habit_completions_streak_delete', 'AFTER DELETE',
+             [_streak_recompute('OLD.habitId')], 'habit_completions'),
+    _trigger('trg_habit_completions_streak_update', 'AFTER UPDATE OF habitId, completionDate',
+             [_streak_recompute('OLD.habitId'), _streak_recompute('NEW.habitId')], 'habit_completions'),
+    rebuild_habit_streaks,
+]
+
+def _calendar_key(row):
+    return f"habitId = {row}.habitId AND year = {year_sql(f'{row}.completionDate')}"
+
+
+def _calendar_masks(row):
+    index = day_index_sql(f'{row}.completionDate')
+    return [(column, word_mask_sql(k, index)) for k, column in enumerate(WORD_COLUMNS)]
+
+
+def _calendar_set(row):
+    sets = ', '.join(f'{column} = {column} | {mask}' for column, mask in _calendar_masks(row))
+    return [
+        f"INSERT OR IGNORE INTO habit_calendar (habitId, year) "
+        f"VALUES ({row}.habitId, {year_sql(f'{row}.completionDate')});",
+        f"UPDATE habit_calendar SET {sets} WHERE {_calendar_key(row)};",
+    ]
+
+
+def _calendar_clear(row):
+    # Only once no other completion of the habit remains on that day
+    sets = ', '.join(f'{column} = {column} & ~{mask}' for column, mask in _calendar_masks(row))
+    empty = ' AND '.join(f'{column} = 0' for column in WORD_COLUMNS)
+    return [
+        f'''UPDATE habit_calendar SET {sets} WHERE {_calendar_key(row)} AND NOT EXISTS (
+                SELECT 1 FROM habit_completions WHERE habitId = {row}.habitId
+                AND completionDate = {row}.completionDate);''',
+        f"DELETE FROM habit_calendar WHERE {_calendar_key(row)} AND {empty};",
+    ]
+
+
+# One bitmap of completed days per habit and year, so calendars and windowed
+# completion rates are bit operations on a row instead of scans of completions
+HABIT_CALENDAR = [
+    f'''CREATE TABLE IF NOT EXISTS habit_calendar (
+        habitId INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        {', '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in WORD_COLUMNS)},
+        PRIMARY KEY (habitId, year)
+    ) WITHOUT ROWID''',
+    _trigger('trg_habit_completions_calendar_insert', 'AFTER INSERT', _calendar_set('NEW'), 'habit_completions'),
+    _trigger('trg_habit_completions_calendar_delete', 'AFTER DELETE', _calendar_clear('OLD'), 'habit_completions'),
+    _trigger('trg_habit_completions_calendar_update', 'AFTER UPDATE OF habitId, completionDate',
+             _calendar_clear('OLD') + _calendar_set('NEW'), 'habit_completions'),
+    rebuild_habit_calendars,
+]
+
+# One completion per habit and day, so check-ins (single or bulk) are idempotent
+# INSERT OR IGNOREs. The old plain index is replaced by a unique one of the same name.
+HABIT_CHECK_IN_UNIQUE = [
+    '''DELETE FROM habit_completions WHERE completionId NOT IN (
+        SELECT MIN(completionId) FROM habit_completions GROUP BY habitId, completionDate
+    )''',
+    'DROP INDEX IF EXISTS idx_habit_completions_habit_date',
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_completions_habit_date ON habit_completions(habitId, completionDate)',
+]
+
+# Deleting a token that has not expired yet (logout, a new login, manual SQL) is logged so
+# every worker process can drop it from its token cache; expired tokens are rejected anyway
+TOKEN_REVOCATIONS = [
+    '''CREATE TABLE IF NOT EXISTS auth_token_revocations (
+        revocationId INTEGER PRIMARY KEY AUTOINCREMENT,
+        token TEXT NOT NULL,
+        userId INTEGER NOT NULL,
+        revokedAt REAL NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_auth_token_revocations_time ON auth_token_revocations(revokedAt)',
+    _trigger('trg_auth_tokens_revoke', "AFTER DELETE", [
+        "INSERT INTO auth_token_revocations (token, userId, revokedAt)",
+        "SELECT OLD.token, OLD.user_id, (julianday('now') - 2440587.5) * 86400.0",
+        "WHERE OLD.expires_at > datetime('now');",
+    ], 'auth_tokens'),
+]
+
+
+def _epoch_sql(expression):
+    return f"CAST(strftime('%s', {expression}) AS INTEGER)"
+
+
+def _expiry_epoch(table):
+    """expiresEpoch column, backfill, index and the triggers that fill it for rows written without it."""
+    fill = f"UPDATE {table} SET expiresEpoch = {_epoch_sql('NEW.expires_at')} WHERE rowid = NEW.rowid"
+    return [
+        add_column(table, 'expiresEpoch', 'INTEGER'),
+        f"UPDATE {table} SET expiresEpoch = {_epoch_sql('expires_at')}",
+        f'CREATE INDEX IF NOT EXISTS idx_{table}_expiry ON {table}(expiresEpoch)',
+        _trigger(f'trg_{table}_expiry_insert', 'AFTER INSERT', [fill + ' AND NEW.expiresEpoch IS NULL;'], table),
+        _trigger(f'trg_{table}_expiry_update', 'AFTER UPDATE OF expires_at', [fill + ';'], table),
+    ]
+
+
+# Lets the token sweeper delete expired rows with index range deletes
+TOKEN_EXPIRY = _expiry_epoch('auth_tokens') + _expiry_epoch('password_reset_tokens') + [
+    'CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_used ON password_reset_tokens(used) WHERE used = 1',
+]
+
+# Signing keys and revocations for signed session tokens (models/signedtokens.py)
+SIGNED_TOKENS = [
+    '''CREATE TABLE IF NOT EXISTS auth_signing_keys (
+        keyId INTEGER PRIMARY KEY AUTOINCREMENT,
+        secret BLOB NOT NULL,
+        createdAt INTEGER NOT NULL,
+        retiredAt INTEGER
+    )''',
+    # tokenId set: one logged-out token; tokenId NULL: the user's tokens issued before issuedBefore (ms)
+    '''CREATE TABLE IF NOT EXISTS auth_token_denylist (
+        entryId INTEGER PRIMARY KEY AUTOINCREMENT,
+        tokenId TEXT,
+        userId INTEGER NOT NULL,
+        issuedBefore INTEGER,
+        expiresEpoch INTEGER NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_auth_token_denylist_expiry ON auth_token_denylist(expiresEpoch)',
+]
+
+# Token buckets shared by every worker when ARCADIA_RATE_LIMIT=sqlite (models/ratelimiter.py).
+# fullAt is when the bucket will have refilled; after that the row says nothing a missing
+# row would not, so the token sweeper deletes it
+AUTH_RATE_LIMITS = [
+    '''CREATE TABLE IF NOT EXISTS auth_rate_limits (
+        bucketKey TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updatedAt REAL NOT NULL,
+        fullAt REAL NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_auth_rate_limits_full ON auth_rate_limits(fullAt)',
+]
+
+def _change_log(scope, row, unless=None):
+    """Trigger statement logging a change to `row`'s user in `scope` (skipped when `unless` holds)."""
+    return [
+        "INSERT INTO budget_changes (scope, userId, changedAt)",
+        f"SELECT '{scope}', IFNULL({row}.userId, 0), (julianday('now') - 2440587.5) * 86400.0",
+        f"WHERE NOT ({unless});" if unless else ";",
+    ]
+
+
+# Changes to transactions and savings goals per user, written by triggers so writes from any
+# process (or raw SQL) are seen; BudgetModel polls it by changeSeq to drop stale cached
+# analytics and goals, and prunes rows older than CHANGE_RETENTION on its writes
+_SAME_USER = 'IFNULL(OLD.userId, 0) = IFNULL(NEW.userId, 0)'
+BUDGET_CHANGES = [
+    '''CREATE TABLE IF NOT EXISTS budget_changes (
+        changeSeq INTEGER PRIMARY KEY AUTOINCREMENT,
+        scope TEXT NOT NULL CHECK(scope IN ('transactions', 'goals')),
+        userId INTEGER NOT NULL,
+        changedAt REAL NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_budget_changes_time ON budget_changes(changedAt)',
+    _trigger('trg_transactions_changes_insert', 'AFTER INSERT', _change_log('transactions', 'NEW')),
+    _trigger('trg_transactions_changes_delete', 'AFTER DELETE', _change_log('transactions', 'OLD')),
+    _trigger('trg_transactions_changes_update', 'AFTER UPDATE OF amount, category, type, userId, timestamp',
+             _change_log('transactions', 'NEW') + _change_log('transactions', 'OLD', _SAME_USER)),
+    _trigger('trg_savings_goals_changes_insert', 'AFTER INSERT', _change_log('goals', 'NEW'), 'savings_goals'),
+    _trigger('trg_savings_goals_changes_delete', 'AFTER DELETE', _change_log('goals', 'OLD'), 'savings_goals'),
+    _trigger('trg_savings_goals_changes_update', 'AFTER UPDATE',
+             _change_log('goals', 'NEW') + _change_log('goals', 'OLD', _SAME_USER), 'savings_goals'),
+]
+
+# Re-create the rollup triggers so removing an extreme row recomputes MIN/MAX for undated
+# rows and NULL users too, and repair buckets left with NULL extremes
+ROLLUP_EXTREMES_FIX = [
+    'DROP TRIGGER IF EXISTS trg_transactions_rollup_delete',
+    'DROP TRIGGER IF EXISTS trg_transactions_rollup_update',
+    _trigger('trg_transactions_rollup_delete', 'AFTER DELETE', _rollup_remove('OLD')),
+    _trigger('trg_transactions_rollup_update', 'AFTER UPDATE OF amount, category, type, userId, timestamp',
+             _rollup_remove('OLD') + _rollup_add('NEW')),
+    rebuild_budget_rollups,
+]
+
+MIGRATIONS = [
+    Migration(1, 'Baseline schema for all modules', BASELINE_SCHEMA),
+    Migration(2, 'Composite indexes for hot queries', HOT_QUERY_INDEXES),
+    Migration(3, 'Per-user transactions and covering index for budget analytics', BUDGET_ANALYTICS),
+    Migration(4, 'Budget rollup tables maintained by triggers', BUDGET_ROLLUPS),
+    Migration(5, 'Timestamp index for paginated transaction listings', TRANSACTION_PAGING),
+    Migration(6, 'Per-user index for savings history exports', SAVINGS_EXPORT),
+    Migration(7, 'Content hashes for de-duplicating statement imports', STATEMENT_IMPORT),
+    Migration(8, 'Amount sketches for approximate percentiles and histograms', BUDGET_SKETCHES),
+    Migration(9, 'Stored habit streaks maintained by triggers', HABIT_STREAKS),
+    Migration(10, 'Per-year habit completion bitmaps maintained by triggers', HABIT_CALENDAR),
+    Migration(11, 'Unique habit completion per day for idempotent check-ins', HABIT_CHECK_IN_UNIQUE),
+    Migration(12, 'Token revocation log for cross-process token cache invalidation', TOKEN_REVOCATIONS),
+    Migration(13, 'Indexed epoch expiry for sweeping expired tokens', TOKEN_EXPIRY),
+    Migration(14, 'Signing keys and deny-list for signed session tokens', SIGNED_TOKENS),
+    Migration(15, 'Persisted token buckets for login and registration rate limits', AUTH_RATE_LIMITS),
+    Migration(16, 'Change log for cross-process budget cache invalidation', BUDGET_CHANGES),
+    Migration(17, 'Rollup triggers recompute min/max for undated rows', ROLLUP_EXTREMES_FIX),
+]
+
+
+class MigrationRunner:
+    """Applies pending MIGRATIONS to a connection, one transaction per version."""
+
+    def __init__(self, conn, migrations=None):
+        self.conn = conn
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        versions = [m.version for m in self.migrations]
+        if len(set(versions)) != len(versions):
+            raise MigrationError("Duplicate migration version")
+
+    def _ensure_version_table(self):
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    def current_version(self):
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'"
+        ).fetchone()
+        if not exists:
+            return 0
+        row = self.conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    def pending(self, target=None):
+        current = self.current_version()
+        return [m for m in self.migrations
+                if m.version > current and (target is None or m.version <= target)]
+
+    def migrate(self, target=None, dry_run=False):
+        """
+        Apply pending migrations up to target (default: latest).
+        Returns the migrations that were (or, with dry_run, would be) applied.
+        """
+        todo = self.pending(target)
+        if dry_run:
+            return todo
+        self._ensure_version_table()
+        for migration in todo:
+            try:
+                self.conn.execute('BEGIN IMMEDIATE')
+                for step in migration.steps:
+                    if callable(step):
+                        step(self.conn)
+                    else:
+                        self.conn.execute(step)
+                self.conn.execute(
+                    'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                    (migration.version, migration.description)
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                raise MigrationError(f"Migration {migration.version} ({migration.description}) failed: {e}")
+        return todo
+
+
+def main(argv=None):
+    from .db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Apply Arcadia Planner schema migrations.')
+    parser.add_argument('--db', default='arcadia.db', help='database file (default: arcadia.db)')
+    parser.add_argument('--dry-run', action='store_true', help='show pending migrations without applying them')
+    parser.add_argument('--status', action='store_true', help='show the current schema version and exit')
+    parser.add_argument('--target', type=int, default=None, help='stop after this version')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    if not db.connect():
+        return 1
+    try:
+        runner = MigrationRunner(db.connection)
+        print(f"Current schema version: {runner.current_version()}")
+        if args.status:
+            return 0
+        todo = runner.migrate(target=args.target, dry_run=args.dry_run)
+        if not todo:
+            print("✓ Schema is up to date")
+            return 0
+        for migration in todo:
+            verb = "Would apply" if args.dry_run else "✓ Applied"
+            print(f"{verb} v{migration.version}: {migration.description}")
+            if args.dry_run:
+                for sql in migration.describe_steps():
+                    print(f"    {sql}")
+        return 0
+    except MigrationError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
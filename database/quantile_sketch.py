@@ -0,0 +1,83 @@
+"""
+Quantile Sketch for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Log-bucketed amount sketch (DDSketch-style) behind approximate median/p90 and histograms
+Last Modified: October 18, 2026
+
+Every positive amount falls in the bucket with lower < amount <= upper, where the
+upper bounds are MIN_AMOUNT * GAMMA ** k plus the histogram edges (so histogram bins
+are exact). No bucket is wider than upper / lower = GAMMA, so reporting a bucket by its
+representative value is within RELATIVE_ACCURACY of any amount in it, and quantiles
+read from bucket counts have that relative error. Bucket 0 holds amounts <= 0.
+
+The bucket bounds are fixed, so sketches are merged by adding counts per bucket:
+budget_sketches stores one count per (rollup bucket, amount bucket) and any
+date range, user or category selection is a GROUP BY over it.
+"""
+
+import math
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_AMOUNT = 0.01
+MAX_AMOUNT = 1e9
+
+# Histogram bins are (edge, next edge]; the first also holds 0 and the last is open-ended
+HISTOGRAM_EDGES = [0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def bucket_bounds():
+    """Rows (bucket, lowerBound, upperBound, value) for the amount_buckets lookup table."""
+    steps = math.ceil(math.log(MAX_AMOUNT / MIN_AMOUNT) / math.log(GAMMA))
+    uppers = sorted({MIN_AMOUNT * GAMMA ** k for k in range(steps + 1)} |
+                    {float(edge) for edge in HISTOGRAM_EDGES if edge > 0})
+    rows = [(0, None, 0.0, 0.0), (1, 0.0, uppers[0], uppers[0])]
+    for lower, upper in zip(uppers, uppers[1:]):
+        # Minimises the worst relative error over (lower, upper]
+        rows.append((len(rows), lower, upper, 2 * lower * upper / (lower + upper)))
+    # Catch-all for anything above MAX_AMOUNT
+    rows.append((len(rows), uppers[-1], float('inf'), uppers[-1]))
+    return rows
+
+
+class AmountSketch:
+    """Counts per amount bucket, fed in bucket order from budget_sketches."""
+
+    def __init__(self):
+        # One entry per non-empty bucket, in ascending bucket order
+        self.uppers = []
+        self.values = []
+        self.counts = []
+        self.total = 0
+
+    def add(self, upper, value, count):
+        self.uppers.append(upper)
+        self.values.append(value)
+        self.counts.append(count)
+        self.total += count
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not self.total:
+            return None
+        rank = q * (self.total - 1)
+        seen = 0
+        for value, count in zip(self.values, self.counts):
+            seen += count
+            if seen > rank:
+                return round(value, 2)
+        return round(self.values[-1], 2)
+
+    def histogram(self, edges=HISTOGRAM_EDGES):
+        """
+        Counts per (min, max] bin; 'max' is None for the last, open bin. Exact when every
+        edge is a bucket bound, as HISTOGRAM_EDGES are.
+        """
+        bins = [{'min': low, 'max': high, 'count': 0}
+                for low, high in zip(edges, list(edges[1:]) + [None])]
+        index = 0
+        for upper, count in zip(self.uppers, self.counts):
+            while bins[index]['max'] is not None and upper > bins[index]['max']:
+                index += 1
+            bins[index]['count'] += count
+        return bins
@@ -0,0 +1,367 @@
+"""
+Query Plan Audit for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Runs every model against a seeded scratch database, captures the SQL they issue,
+         and checks each statement with EXPLAIN QUERY PLAN for table scans and temp sorts.
+Last Modified: October 18, 2026
+
+Usage:
+    python -m database.query_audit [--json] [--all]
+
+Exits with status 1 when a statement issued by a HOT scenario scans a table,
+so index regressions fail the build instead of showing up as slow requests, and
+when any scenario raises, since the SQL it did not get to run goes unaudited.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from .connection_pool import get_pool, close_pool
+from .migrations import MigrationRunner, add_column, column_exists
+
+SKIP_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'PRAGMA', 'SAVEPOINT', 'RELEASE', '--', 'CREATE', 'EXPLAIN')
+SCAN_RE = re.compile(r'^SCAN (\w+)')
+# CTEs and subqueries the plan builds itself; scanning one is not a table scan
+DERIVED_RE = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\w+)')
+TEMP_BTREE_RE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT|[A-Z ]+)')
+WHERE_COLUMN_RE = re.compile(r'(\w+)\s*(?:=|<|>|<=|>=|\bIN\b|\bBETWEEN\b)', re.IGNORECASE)
+
+
+class QueryCapture:
+    """Trace callback that tags every statement with the scenario currently running."""
+
+    def __init__(self):
+        self.label = None
+        self.statements = []  # (label, sql)
+        self._seen = set()
+
+    def __call__(self, sql):
+        if self.label is None:
+            return
+        sql = ' '.join(sql.split())
+        if sql.upper().startswith(SKIP_PREFIXES):
+            return
+        key = (self.label, sql)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.statements.append(key)
+
+    def traced_connect(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.set_trace_callback(self)
+        return conn
+
+
+def explain(conn, sql):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def analyze_plan(sql, plan):
+    """Return (scans, temp_sorts, suggestions) found in a query plan."""
+    scans = []
+    temp_sorts = []
+    derived = {m.group(1) for m in map(DERIVED_RE.match, plan) if m}
+    for detail in plan:
+        match = SCAN_RE.match(detail)
+        if match and not detail.startswith('SCAN CONSTANT ROW') and match.group(1) not in derived:
+            scans.append(detail)
+        sort = TEMP_BTREE_RE.search(detail)
+        if sort:
+            temp_sorts.append(detail)
+    suggestions = []
+    if scans and ' WHERE ' in sql.upper():
+        where = re.split(r'\bWHERE\b', sql, maxsplit=1, flags=re.IGNORECASE)[1]
+        where = re.split(r'\b(ORDER BY|GROUP BY|LIMIT)\b', where, maxsplit=1, flags=re.IGNORECASE)[0]
+        columns = []
+        for col in WHERE_COLUMN_RE.findall(where):
+            if col.upper() not in ('AND', 'OR', 'NOT') and col not in columns:
+                columns.append(col)
+        for detail in scans:
+            table = SCAN_RE.match(detail).group(1)
+            if columns:
+                suggestions.append(f"CREATE INDEX ON {table}({', '.join(columns)})")
+    return scans, temp_sorts, suggestions
+
+
+def seed(db_path):
+    """Fill the scratch database with enough rows that the planner behaves like production."""
+    now = datetime.utcnow()
+    with sqlite3.connect(db_path) as db:
+        c = db.cursor()
+        c.executemany('INSERT INTO user (userId, username, password, xp, glitter) VALUES (?, ?, ?, 0, 500)',
+                      [(i, f'audit_user_{i}', b'x') for i in range(1, 51)])
+        c.executemany('INSERT INTO users (username, password) VALUES (?, ?)',
+                      [(f'desk_user_{i}', 'x') for i in range(1, 51)])
+        c.executemany('INSERT INTO tasks (userId, title, orderIndex) VALUES (?, ?, ?)',
+                      [(i % 50 + 1, f'task {i}', i) for i in range(500)])
+        # The desktop TaskManager (src/controllers/task_manager.py) reads completion and XP
+        # columns no migration creates; add them so its statements run and get audited
+        add_column('tasks', 'completed', 'INTEGER DEFAULT 0')(db)
+        add_column('tasks', 'xpReward', 'INTEGER DEFAULT 50')(db)
+        c.executemany('INSERT INTO habits (userId, habitName) VALUES (?, ?)',
+                      [(i % 50 + 1, f'habit {i}') for i in range(200)])
+        c.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                      [(i % 200 + 1, (now - timedelta(days=i // 200)).strftime('%Y-%m-%d')) for i in range(2000)])
+        c.executemany('INSERT INTO transactions (name, amount, category, type, timestamp) VALUES (?, ?, ?, ?, ?)',
+                      [(f'tx {i}', float(i % 90 + 1), f'cat{i % 12}', 'expense' if i % 3 else 'income',
+                        (now - timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S')) for i in range(1000)])
+        if column_exists(db, 'transactions', 'userId'):
+            c.execute('UPDATE transactions SET userId = transactionId % 50 + 1')
+        c.executemany('INSERT INTO savings_goals (userId, name, targetAmount, currentAmount) VALUES (?, ?, ?, 100)',
+                      [(i % 50 + 1, f'goal {i}', 500.0) for i in range(100)])
+        c.executemany('INSERT INTO savings_transactions (goalId, userId, amount, direction) VALUES (?, ?, ?, ?)',
+                      [(i % 100 + 1, i % 50 + 1, 5.0, 'deposit') for i in range(1000)])
+        c.executemany('INSERT INTO store_items (name, glitterCost, available) VALUES (?, ?, 1)',
+                      [(f'item {i}', 10) for i in range(60)])
+        c.executemany('INSERT INTO user_inventory (userId, itemId) VALUES (?, ?)',
+                      [(i % 50 + 1, i % 60 + 1) for i in range(300)])
+        c.executemany('INSERT INTO recipes (title, categoryId, subcategoryId) VALUES (?, ?, ?)',
+                      [(f'recipe {i}', i % 8 + 1, i % 20 + 1) for i in range(300)])
+        c.executemany('INSERT INTO study_sessions (userId, startTime, endTime, duration, streakTimer) VALUES (?, ?, ?, 25, 1)',
+                      [(i % 50 + 1,
+                        (now - timedelta(hours=i, minutes=25)).strftime('%Y-%m-%d %H:%M:%S'),
+                        (now - timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S')) for i in range(1000)])
+        c.executemany('INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, ?)',
+                      [(f'audit-token-{i}', i % 50 + 1, (now + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'))
+                       for i in range(500)])
+        c.executemany('INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, ?)',
+                      [(f'audit-expired-{i}', i % 50 + 1, (now - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'))
+                       for i in range(100)])
+        db.commit()
+        db.execute('ANALYZE')
+
+
+def build_scenarios(db_path, capture):
+    """
+    Return (label, hot, callable) triples exercising each model method once.
+    Imports live here so the tool can report a module that fails to import.
+    """
+    from models.taskmodel import TaskModel
+    from models.habitmodel import HabitModel
+    from models.budgetmodel import BudgetModel
+    from models.budgetimport import StatementImporter
+    from models.recipeboxmodel import RecipeBoxModel
+    from models.avatarstoremodel import AvatarStoreModel
+    from models.pomodoromodel import PomodoroModel
+    from models.studysessionmodel import StudySessionModel
+    from models.authmanager import AuthManager
+    from models.tokensweeper import TokenSweeper
+    from models.ratelimiter import RateLimiter, RateLimited
+    from src.controllers.task_manager import TaskManager
+    from src.controllers.auth_manager import AuthManager as DesktopAuthManager
+
+    tasks = TaskModel(db_path)
+    habits = HabitModel(db_path)
+    budget = BudgetModel(db_path)
+    recipes = RecipeBoxModel(db_path)
+    store = AvatarStoreModel(db_path)
+    pomodoro = PomodoroModel(db_path)
+    study = StudySessionModel(db_path)
+    auth = AuthManager(db_path)
+    desktop_tasks = TaskManager(db_path)
+    desktop_tasks._connect = lambda: capture.traced_connect(db_path)
+
+    def desktop_auth():
+        manager = DesktopAuthManager(db_path)
+        manager.db.connection.set_trace_callback(capture)
+        manager.create_user('audit_desktop', 'Audit#pass1')
+        manager.login_user('audit_desktop', 'Audit#pass1')
+        manager.get_user(1)
+        manager.close()
+
+    now = datetime.utcnow()
+    session_end = (now + timedelta(minutes=30)).strftime('%Y-%m-%d %H:%M:%S')
+    session_start = (now + timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S')
+
+    def auth_flow():
+        auth.register_user('audit_login', 'pw')
+        token = auth.login('audit_login', 'pw')
+        auth.validate_token(token)
+        auth.logout(token)
+
+    # Key loads and rotation read the whole of auth_signing_keys, a handful of rows
+    signed_auth = AuthManager(db_path, token_kind='signed')
+
+    def signed_auth_flow():
+        token = signed_auth.login('audit_login', 'pw')
+        signed_auth.validate_token(token)
+        signed_auth.logout(token)
+
+    limits = {'ip': '2/60', 'username': '2/60'}
+    limiters = [RateLimiter(db_path, mode='sqlite', limits=limits) for _ in range(2)]
+
+    def rate_limit_flow():
+        # One worker takes both attempts from the shared buckets, the other is refused by them
+        for limiter in (limiters[0], limiters[0], limiters[1]):
+            try:
+                limiter.check('10.0.0.1', 'audit_login')
+            except RateLimited:
+                pass
+
+    def reset_flow():
+        token = auth.create_password_reset_token('audit_user_1')
+        auth.validate_password_reset_token(token)
+        auth.mark_token_used(token)
+
+    return [
+        ('TaskModel.create_task', False, lambda: tasks.create_task(userId=1, title='audit', orderIndex=999)),
+        ('TaskModel.get_tasks', True, lambda: tasks.get_tasks(1)),
+        ('TaskModel.update_task', True, lambda: tasks.update_task(1, title='audited')),
+        ('TaskModel.reorder_tasks', True, lambda: tasks.reorder_tasks([{'taskId': 1, 'orderIndex': 5}])),
+        ('TaskModel.delete_task', True, lambda: tasks.delete_task(2)),
+        ('HabitModel.get_habits', True, lambda: habits.get_habits(1)),
+        ('HabitModel.get_habits(streaks)', True, lambda: habits.get_habits(1, include_streaks=True)),
+        ('HabitModel.compute_streaks', False, lambda: habits.compute_streaks(1)),
+        ('HabitModel.completion_calendar', True, lambda: habits.completion_calendar(1, now.year)),
+        ('HabitModel.completion_rate', True, lambda: habits.completion_rate(1, 90)),
+        ('HabitModel.analytics', True, lambda: habits.analytics(1)),
+        ('HabitModel.habit_check_in', True, lambda: habits.habit_check_in(1)),
+        ('HabitModel.habit_streak', True, lambda: habits.habit_streak(1)),
+        ('HabitModel.check_in_many', True, lambda: habits.check_in_many(
+            [{'habitId': 1, 'date': (now - timedelta(days=d)).strftime('%Y-%m-%d')} for d in range(7)])),
+        ('HabitModel.update_habit', True, lambda: habits.update_habit(1, description='audited')),
+        ('HabitModel.delete_habit', True, lambda: habits.delete_habit(3)),
+        ('BudgetModel.add_transaction', False, lambda: budget.add_transaction('audit', 5.0, 'cat1', 'expense')),
+        ('BudgetModel.get_transaction', True, lambda: budget.get_transaction(1)),
+        ('BudgetModel.update_transaction', True, lambda: budget.update_transaction(1, amount=6.0)),
+        ('BudgetModel.list_transactions', True, lambda: budget.list_transactions(
+            cursor=budget.encode_cursor(now.strftime('%Y-%m-%d %H:%M:%S'), 500))),
+        ('BudgetModel.list_transactions(user)', True, lambda: budget.list_transactions(
+            user_id=1, cursor=budget.encode_cursor(now.strftime('%Y-%m-%d %H:%M:%S'), 500))),
+        ('BudgetModel.export(transactions)', True, lambda: list(budget.export('transactions', user_id=1)[1])),
+        ('BudgetModel.export(savings)', True, lambda: list(budget.export('savings', user_id=1)[1])),
+        ('StatementImporter.import_stream', True, lambda: StatementImporter(budget).import_stream(
+            io.StringIO('date,name,amount\n2025-11-01,audit import,-3.00\n'), 'csv', user_id=1)),
+        ('BudgetModel.analytics', False, lambda: budget.analytics('expense', 'cat1')),
+        ('BudgetModel.analytics(distribution)', False, lambda: budget.analytics(user_id=1, include_distribution=True)),
+        ('BudgetModel.get_goals', True, lambda: budget.get_goals(1)),
+        ('BudgetModel.contribute_to_goal', True, lambda: budget.contribute_to_goal(1, 1, 10.0)),
+        ('BudgetModel.forecast_goals', True, lambda: budget.forecast_goals(1)),
+        ('BudgetModel.list_goal_transactions', True, lambda: budget.list_goal_transactions(1)),
+        ('BudgetModel.delete_goal', True, lambda: budget.delete_goal(2)),
+        ('BudgetModel.delete_transaction', True, lambda: budget.delete_transaction(3)),
+        ('RecipeBoxModel.get_recipe', True, lambda: recipes.get_recipe(1)),
+        ('RecipeBoxModel.filter_recipes', False, lambda: recipes.filter_recipes(categoryId=2, subcategoryId=3)),
+        ('AvatarStoreModel.purchase_item', True, lambda: store.purchase_item(1, 59)),
+        ('AvatarStoreModel.get_user_inventory', True, lambda: store.get_user_inventory(1)),
+        ('PomodoroModel.log_study_session', True,
+         lambda: pomodoro.log_study_session(2, session_start, session_end, '25/5')),
+        ('StudySessionModel.log_session', True,
+         lambda: study.log_session(3, session_start, session_end, '25/5')),
+        ('AuthManager.login/validate/logout', True, auth_flow),
+        ('AuthManager.password_reset', True, reset_flow),
+        ('AuthManager signed tokens', False, signed_auth_flow),
+        ('RateLimiter.check(sqlite)', True, rate_limit_flow),
+        ('TokenSweeper.sweep', True, lambda: TokenSweeper(db_path, pause=0).sweep()),
+        ('TaskManager.get_tasks', True, lambda: desktop_tasks.get_tasks(1, {'category': 'x'})),
+        ('TaskManager.delete_task', True, lambda: desktop_tasks.delete_task(4)),
+        ('AuthManager (desktop)', True, desktop_auth),
+    ]
+
+
+def run_audit():
+    """Run every scenario and return a list of findings, one per captured statement."""
+    tmp = tempfile.mkdtemp(prefix='arcadia-audit-')
+    db_path = os.path.join(tmp, 'audit.db')
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    seed(db_path)
+
+    capture = QueryCapture()
+    get_pool(db_path).add_connect_hook(lambda conn: conn.set_trace_callback(capture))
+    results = []
+    hot_labels = set()
+    errors = {}
+    try:
+        for label, hot, fn in build_scenarios(db_path, capture):
+            if hot:
+                hot_labels.add(label)
+            capture.label = label
+            try:
+                fn()
+            except Exception as e:
+                errors[label] = str(e)
+            finally:
+                capture.label = None
+
+        with sqlite3.connect(db_path) as db:
+            for label, sql in capture.statements:
+                try:
+                    plan = explain(db, sql)
+                except sqlite3.Error as e:
+                    results.append({'label': label, 'sql': sql, 'hot': label in hot_labels,
+                                    'plan': [], 'scans': [], 'temp_sorts': [], 'suggestions': [],
+                                    'error': str(e)})
+                    continue
+                scans, temp_sorts, suggestions = analyze_plan(sql, plan)
+                results.append({'label': label, 'sql': sql, 'hot': label in hot_labels, 'plan': plan,
+                                'scans': scans, 'temp_sorts': temp_sorts, 'suggestions': suggestions,
+                                'error': None})
+    finally:
+        close_pool(db_path)
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+    return results, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EXPLAIN QUERY PLAN audit of all model SQL.')
+    parser.add_argument('--json', action='store_true', help='print findings as JSON')
+    parser.add_argument('--all', action='store_true', help='also list statements with clean plans')
+    args = parser.parse_args(argv)
+
+    results, errors = run_audit()
+    regressions = [r for r in results if r['hot'] and r['scans']]
+
+    if args.json:
+        print(json.dumps({'results': results, 'scenario_errors': errors,
+                          'hot_scan_regressions': len(regressions)}, indent=2))
+        return 1 if regressions or errors else 0
+
+    print("\n=== QUERY PLAN AUDIT ===")
+    for r in results:
+        flagged = r['scans'] or r['temp_sorts'] or r['error']
+        if not flagged and not args.all:
+            continue
+        if r['error']:
+            marker = "✗ ERROR"
+        elif r['scans']:
+            marker = "✗ SCAN " if r['hot'] else "! SCAN "
+        elif r['temp_sorts']:
+            marker = "! SORT "
+        else:
+            marker = "✓ OK   "
+        print(f"{marker} [{r['label']}]{' (hot)' if r['hot'] else ''}")
+        print(f"    {r['sql'][:160]}")
+        for detail in r['plan']:
+            print(f"      - {detail}")
+        for suggestion in r['suggestions']:
+            print(f"      suggest: {suggestion}")
+        if r['error']:
+            print(f"      error: {r['error']}")
+    if errors:
+        print("\nScenarios that raised (their SQL up to the failure is still audited):")
+        for label, message in errors.items():
+            print(f"  {label}: {message}")
+    scans = sum(1 for r in results if r['scans'])
+    sorts = sum(1 for r in results if r['temp_sorts'])
+    print(f"\n{len(results)} statements, {scans} with table scans, {sorts} with temp B-tree sorts")
+    if regressions:
+        print(f"✗ {len(regressions)} hot statement(s) scan a table")
+    else:
+        print("✓ No hot query scans a table")
+    if errors:
+        print(f"✗ {len(errors)} scenario(s) raised")
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Storage Profiles for Arcadia Planner
+Author: Allyson Taylor
+Purpose: Named PRAGMA settings (journal mode, sync level, caches) applied to every connection
+Last Modified: October 18, 2026
+"""
+
+import os
+import sqlite3
+
+PROFILE_ENV_VAR = 'ARCADIA_DB_PROFILE'
+DEFAULT_PROFILE = 'balanced'
+
+# cache_size is negative so SQLite reads it as KiB instead of pages
+STORAGE_PROFILES = {
+    # Every commit is fsynced; survives power loss. Use for the production file on slow disks.
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 15000,
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+    },
+    # WAL + NORMAL only fsyncs at checkpoints; a crash can lose the last commits but never corrupts.
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,
+        'cache_size': -32000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # No fsync and an in-memory rollback journal. Only for scratch, test and benchmark databases.
+    'fast-ephemeral': {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+# busy_timeout goes first so a journal_mode switch waits on other writers instead of failing
+PRAGMA_ORDER = ['busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store']
+
+
+def get_profile(name=None, **overrides):
+    """
+    Return the PRAGMA settings for a named profile.
+    The name defaults to $ARCADIA_DB_PROFILE, then 'balanced'. Keyword
+    arguments override single settings (e.g. cache_size=-2000).
+    """
+    name = name or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{name}'. Choose from: {', '.join(STORAGE_PROFILES)}")
+    unknown = set(overrides) - set(PRAGMA_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown storage settings: {', '.join(sorted(unknown))}")
+    settings = dict(STORAGE_PROFILES[name])
+    settings.update(overrides)
+    return settings
+
+
+def apply_storage_profile(conn, profile=None):
+    """
+    Apply a storage profile to an open connection.
+    profile may be a profile name, a settings dict from get_profile(), or
+    None for the configured default. Returns the journal mode in effect.
+    """
+    settings = profile if isinstance(profile, dict) else get_profile(profile)
+    journal_mode = None
+    for pragma in PRAGMA_ORDER:
+        if pragma not in settings:
+            continue
+        value = settings[pragma]
+        if pragma == 'journal_mode':
+            try:
+                journal_mode = conn.execute(f"PRAGMA journal_mode={value}").fetchone()[0]
+            except sqlite3.OperationalError:
+                # Another connection holds the file open; the persisted mode stays in effect
+                journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        else:
+            conn.execute(f"PRAGMA {pragma}={value}")
+    return journal_mode
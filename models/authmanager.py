@@ -6,44 +6,102 @@ Description:
     Authentication backend logic for registration, login,
     password verification, and token sessions.
     Handles user and token database management.
+    bcrypt runs in the shared bounded pool (models/hashpool.py), not on the
+    request thread; a full pool raises HashPoolBusy.
+    Expiry is read from the indexed expiresEpoch columns (migration v13), which
+    models/tokensweeper.py also uses to delete expired rows.
+    Validated tokens are cached for up to TOKEN_CACHE_TTL seconds, never past
+    their own expiry. logout() and login() drop the affected entries at once.
+    In 'shared' mode other processes see those deletes through the
+    auth_token_revocations log (migration v12) within TOKEN_SYNC_INTERVAL.
+    With token kind 'signed', login() issues HMAC-signed tokens instead
+    (models/signedtokens.py) that validate without a query. Both kinds are
+    accepted whichever one is configured.
+    Failures are logged through the queued JSON error log (models/errorlog.py).
+
+Configuration (environment):
+    ARCADIA_TOKEN_CACHE     'shared' (default, safe with several worker processes),
+                            'local' (single process only) or 'off'
+    ARCADIA_TOKEN_KIND      'opaque' (default, rows in auth_tokens) or 'signed'
 """
 
+import os
 import sqlite3
-import bcrypt
+import threading
+import time
+from calendar import timegm
+from models.basemodel import BaseModel
+from models.cache import LRUCache, MISS
+from models.errorlog import configure_logging
+from models.hashpool import get_hash_pool, HashPoolBusy
+from models.signedtokens import SignedTokens
 import secrets
 import logging
 from datetime import datetime, timedelta
 
-logging.basicConfig(filename='logs/errors.log', level=logging.ERROR)
+# Errors go through a queue to logs/errors.log, so failed logins never wait on a file write
+configure_logging()
 DB_PATH = 'arcadia.db'
 
+TOKEN_CACHE_ENV_VAR = 'ARCADIA_TOKEN_CACHE'
+TOKEN_CACHE_MODES = ('shared', 'local', 'off')
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 10000
+# Seconds between polls of auth_token_revocations in 'shared' mode
+TOKEN_SYNC_INTERVAL = 1.0
+TOKEN_KIND_ENV_VAR = 'ARCADIA_TOKEN_KIND'
+TOKEN_KINDS = ('opaque', 'signed')
+SESSION_LIFETIME = timedelta(hours=1)
+REMEMBER_ME_LIFETIME = timedelta(days=14)
+
 class AuthError(Exception):
     pass
 
-class AuthManager:
-    def __init__(self, db_path=DB_PATH):
-        self.db_path = db_path
+class AuthManager(BaseModel):
+    row_factory = None
 
-    def _get_conn(self):
-        return sqlite3.connect(self.db_path, timeout=10)
+    def __init__(self, db_path=DB_PATH, token_cache=None, token_cache_mode=None, token_kind=None):
+        self.db_path = db_path
+        token_kind = token_kind or os.environ.get(TOKEN_KIND_ENV_VAR, 'opaque')
+        if token_kind not in TOKEN_KINDS:
+            raise ValueError(f"{TOKEN_KIND_ENV_VAR} must be one of {', '.join(TOKEN_KINDS)}")
+        self.token_kind = token_kind
+        self.signed_tokens = SignedTokens(db_path, max_lifetime=REMEMBER_ME_LIFETIME.total_seconds())
+        mode = token_cache_mode or os.environ.get(TOKEN_CACHE_ENV_VAR, 'shared')
+        if mode not in TOKEN_CACHE_MODES:
+            raise ValueError(f"{TOKEN_CACHE_ENV_VAR} must be one of {', '.join(TOKEN_CACHE_MODES)}")
+        self.token_cache_mode = mode
+        # token -> (user_id, expiry as epoch seconds)
+        self.token_cache = token_cache if token_cache is not None else LRUCache(
+            max_entries=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+        # Revocations must outlive every cache entry that could still hold the token
+        self.revocation_retention = 2 * (self.token_cache.ttl or TOKEN_CACHE_TTL) + TOKEN_SYNC_INTERVAL
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._last_revocation = None
+        self.revocations_seen = 0
 
     def hash_password(self, plain_pw):
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(plain_pw.encode(), salt)
+        return get_hash_pool().hash(plain_pw.encode())
 
     def verify_password(self, plain_pw, hashed_pw):
         try:
-            return bcrypt.checkpw(plain_pw.encode(), hashed_pw)
+            return get_hash_pool().verify(plain_pw.encode(), hashed_pw)
+        except HashPoolBusy:
+            raise
         except Exception:
             return False
 
     def register_user(self, username, password):
         try:
+            # Hashed before checking out a connection, so waiting on the hash pool never holds one
+            hashed_pw = self.hash_password(password)
             with self._get_conn() as conn:
                 c = conn.cursor()
-                hashed_pw = self.hash_password(password)
                 c.execute('INSERT INTO user (username, password) VALUES (?, ?)', (username, hashed_pw))
                 conn.commit()
+        except HashPoolBusy:
+            raise
         except Exception as e:
             logging.error(f'Registration failed: {e}')
             raise AuthError(f'Registration failed: {e}')
@@ -53,55 +111,119 @@ class AuthManager:
         Returns session token if successful.
         """
         try:
+            with self._get_conn() as conn:
+                row = conn.execute('SELECT userId, password FROM user WHERE username=?', (username,)).fetchone()
+            if not row:
+                raise AuthError('Invalid credentials.')
+            user_id, hashed_pw = row
+            # The connection goes back to the pool before bcrypt, so a login storm queued on the
+            # hash pool cannot starve validate_token() and the other services of connections
+            if not self.verify_password(password, hashed_pw):
+                raise AuthError('Invalid credentials.')
+            token = secrets.token_urlsafe(32)
+            expires = datetime.utcnow() + (REMEMBER_ME_LIFETIME if remember_me else SESSION_LIFETIME)
             with self._get_conn() as conn:
                 c = conn.cursor()
-                c.execute('SELECT userId, password FROM user WHERE username=?', (username,))
-                row = c.fetchone()
-                if not row:
-                    raise AuthError('Invalid credentials.')
-                user_id, hashed_pw = row
-                if not self.verify_password(password, hashed_pw):
-                    raise AuthError('Invalid credentials.')
-                token = secrets.token_urlsafe(32)
-                expires = datetime.utcnow() + (timedelta(days=14) if remember_me else timedelta(hours=1))
                 c.execute('DELETE FROM auth_tokens WHERE user_id=?', (user_id,))
-                c.execute('INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, ?)',
-                          (token, user_id, expires.strftime('%Y-%m-%d %H:%M:%S')))
+                if self.token_kind == 'opaque':
+                    c.execute('INSERT INTO auth_tokens (token, user_id, expires_at, expiresEpoch) VALUES (?, ?, ?, ?)',
+                              (token, user_id, expires.strftime('%Y-%m-%d %H:%M:%S'), timegm(expires.timetuple())))
+                self._prune_revocations(c)
                 conn.commit()
-                return token
+            self.token_cache.invalidate_entries(lambda key, value: value[0] == user_id)
+            if self.token_kind == 'signed':
+                # Also ends the user's earlier signed sessions
+                token = self.signed_tokens.issue(user_id, timegm(expires.timetuple()))
+            return token
+        except HashPoolBusy:
+            raise
         except Exception as e:
             logging.error(f'Login failed: {e}')
             raise AuthError(f'Login failed: {e}')
 
     def validate_token(self, token):
         try:
+            if self.signed_tokens.owns(token):
+                return self.signed_tokens.verify(token)
+            if self.token_cache_mode != 'off':
+                self._sync_token_cache()
+                cached = self.token_cache.get(token)
+                # An entry past the token's expiry falls through to the delete below
+                if cached is not MISS and time.time() <= cached[1]:
+                    return cached[0]
+            generation = self.token_cache.generation
             with self._get_conn() as conn:
                 c = conn.cursor()
-                c.execute('SELECT user_id, expires_at FROM auth_tokens WHERE token=?', (token,))
+                c.execute('SELECT user_id, expiresEpoch FROM auth_tokens WHERE token=?', (token,))
                 row = c.fetchone()
                 if not row:
                     raise AuthError('Invalid or expired token.')
-                user_id, expires = row
-                expires_dt = datetime.strptime(expires, '%Y-%m-%d %H:%M:%S')
-                if datetime.utcnow() > expires_dt:
+                user_id, expires_at = row
+                if time.time() > expires_at:
                     c.execute('DELETE FROM auth_tokens WHERE token=?', (token,))
                     conn.commit()
                     raise AuthError('Token expired.')
-                return user_id
+            if self.token_cache_mode != 'off':
+                ttl = min(self.token_cache.ttl or TOKEN_CACHE_TTL, expires_at - time.time())
+                self.token_cache.put(token, (user_id, expires_at), generation, ttl=ttl)
+            return user_id
         except Exception as e:
             logging.error(f'Token validation failed: {e}')
             raise AuthError(f'Token validation failed: {e}')
 
     def logout(self, token):
         try:
+            if self.signed_tokens.owns(token):
+                self.signed_tokens.revoke(token)
+                return
             with self._get_conn() as conn:
                 c = conn.cursor()
                 c.execute('DELETE FROM auth_tokens WHERE token=?', (token,))
+                self._prune_revocations(c)
                 conn.commit()
+            self.token_cache.invalidate(lambda key: key == token)
         except Exception as e:
             logging.error(f'Logout failed: {e}')
             raise AuthError(f'Logout failed: {e}')
-       
+
+    def _prune_revocations(self, c):
+        c.execute('DELETE FROM auth_token_revocations WHERE revokedAt < ?',
+                  (time.time() - self.revocation_retention,))
+
+    def _sync_token_cache(self):
+        """In 'shared' mode, drop tokens other processes deleted since the last poll."""
+        if self.token_cache_mode != 'shared' or time.monotonic() - self._last_sync < TOKEN_SYNC_INTERVAL:
+            return
+        with self._sync_lock:
+            if time.monotonic() - self._last_sync < TOKEN_SYNC_INTERVAL:
+                return
+            with self._get_conn() as conn:
+                c = conn.cursor()
+                if self._last_revocation is None:
+                    # Nothing was cached before the first poll, so earlier revocations do not matter
+                    c.execute('SELECT COALESCE(MAX(revocationId), 0) FROM auth_token_revocations')
+                    self._last_revocation = c.fetchone()[0]
+                    rows = []
+                else:
+                    c.execute('SELECT revocationId, token FROM auth_token_revocations WHERE revocationId > ? '
+                              'ORDER BY revocationId', (self._last_revocation,))
+                    rows = c.fetchall()
+            if rows:
+                self._last_revocation = rows[-1][0]
+                self.revocations_seen += len(rows)
+                revoked = {row[1] for row in rows}
+                self.token_cache.invalidate(lambda key: key in revoked)
+            self._last_sync = time.monotonic()
+
+    def token_cache_stats(self):
+        stats = self.token_cache.stats()
+        stats['mode'] = self.token_cache_mode
+        stats['ttl'] = self.token_cache.ttl
+        stats['revocationsSeen'] = self.revocations_seen
+        stats['tokenKind'] = self.token_kind
+        stats['signedTokens'] = self.signed_tokens.stats()
+        return stats
+
 
     def create_password_reset_token(self, username, expires_in_minutes=60):
         """Generate and store a password reset token for the given user."""
@@ -113,11 +235,11 @@ class AuthManager:
                 raise AuthError("User not found.")
             user_id = row[0]
             token = secrets.token_urlsafe(32)
-            expires_at = (datetime.utcnow() + timedelta(minutes=expires_in_minutes)).strftime('%Y-%m-%d %H:%M:%S')
+            expires = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
             c.execute("""
-                INSERT INTO password_reset_tokens (token, user_id, expires_at, used)
-                VALUES (?, ?, ?, 0)
-            """, (token, user_id, expires_at))
+                INSERT INTO password_reset_tokens (token, user_id, expires_at, expiresEpoch, used)
+                VALUES (?, ?, ?, ?, 0)
+            """, (token, user_id, expires.strftime('%Y-%m-%d %H:%M:%S'), timegm(expires.timetuple())))
             conn.commit()
             return token
 
@@ -126,7 +248,7 @@ class AuthManager:
         with self._get_conn() as conn:
             c = conn.cursor()
             c.execute("""
-                SELECT user_id, expires_at, used FROM password_reset_tokens WHERE token=?
+                SELECT user_id, expiresEpoch, used FROM password_reset_tokens WHERE token=?
             """, (token,))
             row = c.fetchone()
             if not row:
@@ -134,8 +256,7 @@ class AuthManager:
             user_id, expires_at, used = row
             if used:
                 raise AuthError("Reset token already used.")
-            expires_dt = datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S')
-            if datetime.utcnow() > expires_dt:
+            if time.time() > expires_at:
                 raise AuthError("Reset token expired.")
             return user_id
 
@@ -8,18 +8,14 @@ Description:
 """
 
 import sqlite3
+from models.basemodel import BaseModel
 
 DB_PATH = "arcadia.db"
 
-class AvatarStoreModel:
+class AvatarStoreModel(BaseModel):
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
 
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
     def get_user_glitter(self, user_id:int) -> int:
         with self._get_conn() as conn:
             cur = conn.cursor()
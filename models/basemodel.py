@@ -0,0 +1,28 @@
+"""
+File: basemodel.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Shared base class for backend models.
+    Hands out pooled connections to arcadia.db instead of opening a new one per call.
+"""
+
+import sqlite3
+from database.connection_pool import get_pool
+
+DB_PATH = 'arcadia.db'
+
+class BaseModel:
+    # Models that unpack plain tuples override this with None
+    row_factory = sqlite3.Row
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    @property
+    def pool(self):
+        return get_pool(self.db_path)
+
+    def _get_conn(self):
+        """Use as `with self._get_conn() as conn:`; commits on success, rolls back on error."""
+        return self.pool.connection(row_factory=self.row_factory)
@@ -0,0 +1,254 @@
+"""
+File: budgetimport.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Bulk bank-statement import for the Budget module.
+    Streams CSV or OFX statements record by record, validates each row with
+    BudgetModel.validate_transaction, skips rows already imported (by content hash)
+    and inserts the rest with executemany, one transaction per batch.
+
+Usage:
+    python -m models.budgetimport statement.csv --user 1 [--format ofx] [--category Imported] [--db arcadia.db]
+"""
+
+import argparse
+import csv
+import hashlib
+import re
+import sys
+from datetime import datetime
+from models.budgetmodel import BudgetModel, DB_PATH
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+DEFAULT_CATEGORY = 'Uncategorized'
+DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y', '%Y%m%d', '%Y%m%d%H%M%S']
+
+# Accepted CSV header names (case-insensitive) for each field
+CSV_COLUMNS = {
+    'date': ('date', 'posted', 'transaction date'),
+    'name': ('name', 'description', 'payee', 'memo'),
+    'amount': ('amount',),
+    'category': ('category',),
+    'type': ('type',),
+    'fitid': ('id', 'fitid', 'reference'),
+}
+
+OFX_TAG = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+
+def parse_timestamp(value):
+    value = (value or '').strip()
+    # OFX dates may carry fractional seconds and a timezone: 20251120120000.000[-5:EST]
+    value = value.split('[')[0].split('.')[0]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def parse_amount(value):
+    try:
+        return float(str(value).replace(',', '').replace('$', '').strip())
+    except ValueError:
+        raise ValueError(f"Invalid amount: {value!r}")
+
+
+def read_csv(stream):
+    """Yield (line number, raw record or ValueError) for each data row of a CSV statement."""
+    reader = csv.DictReader(stream)
+    try:
+        fieldnames = reader.fieldnames
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV header: {e}")
+    headers = {(h or '').strip().lower(): h for h in (fieldnames or [])}
+    mapping = {}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in headers:
+                mapping[field] = headers[name]
+                break
+    missing = [f for f in ('date', 'name', 'amount') if f not in mapping]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    while True:
+        # A malformed row is reported in its place (as a ValueError) and reading goes on
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # DictReader only updates its own line_num after a good row
+            yield reader.reader.line_num, ValueError(f"Malformed CSV row: {e}")
+            continue
+        yield reader.line_num, {field: row.get(column) for field, column in mapping.items()}
+
+
+def read_ofx(stream):
+    """Yield (line number, raw record) for each <STMTTRN> block of an OFX/QFX statement."""
+    record = None
+    start = 0
+    for line_no, line in enumerate(stream, 1):
+        upper = line.upper()
+        if '<STMTTRN>' in upper:
+            record, start = {}, line_no
+        if record is not None:
+            for tag, value in OFX_TAG.findall(line):
+                record.setdefault(tag.upper(), value.strip())
+        if '</STMTTRN>' in upper and record is not None:
+            yield start, {
+                'date': record.get('DTPOSTED'),
+                'name': record.get('NAME') or record.get('MEMO'),
+                'amount': record.get('TRNAMT'),
+                'fitid': record.get('FITID'),
+            }
+            record = None
+
+
+READERS = {'csv': read_csv, 'ofx': read_ofx}
+
+
+def normalize(raw, default_category=DEFAULT_CATEGORY):
+    """
+    Turn a raw statement record into (name, amount, category, type, timestamp, fitid).
+    Without a type column the sign decides: negative amounts are expenses.
+    """
+    timestamp = parse_timestamp(raw.get('date'))
+    amount = parse_amount(raw.get('amount'))
+    trans_type = (raw.get('type') or '').strip().lower() or None
+    if trans_type is None:
+        trans_type = 'expense' if amount < 0 else 'income'
+        amount = abs(amount)
+    name = (raw.get('name') or '').strip()
+    category = (raw.get('category') or '').strip() or default_category
+    return name, round(amount, 2), category, trans_type, timestamp, (raw.get('fitid') or '').strip() or None
+
+
+def content_hash(user_id, name, amount, trans_type, timestamp, fitid=None, occurrence=1):
+    """
+    Identity of a statement row: the bank's FITID when given, otherwise its contents and
+    which of the file's identical rows it is (two same-day coffees are two transactions).
+    """
+    if fitid:
+        key = f"fitid|{user_id}|{fitid}"
+    else:
+        key = f"{user_id}|{timestamp}|{name}|{amount:.2f}|{trans_type}"
+        # The first occurrence keeps the hash it had before occurrences were counted
+        if occurrence > 1:
+            key += f"|{occurrence}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class StatementImporter:
+    def __init__(self, model=None, batch_size=IMPORT_BATCH_SIZE):
+        self.model = model or BudgetModel()
+        self.batch_size = batch_size
+
+    def import_stream(self, stream, fmt='csv', user_id=None, default_category=DEFAULT_CATEGORY):
+        """
+        Import a statement from a text stream. Bad rows are reported, not fatal.
+        Batches are committed as they fill, so a stream that cannot be read to the end
+        (bad encoding, dropped upload) keeps what was imported before it failed and
+        reports the read error with complete=False.
+        Returns {'imported', 'duplicates', 'errorCount', 'errors': [{'line', 'error'}], 'complete'}.
+        """
+        if fmt not in READERS:
+            raise ValueError("Unsupported statement format")
+        summary = {'imported': 0, 'duplicates': 0, 'errorCount': 0, 'errors': [], 'complete': True}
+        batch = []
+        occurrences = {}  # rows without a FITID -> how many identical ones the file had so far
+        records = READERS[fmt](stream)
+        line_no = 0
+        while True:
+            try:
+                line_no, raw = next(records)
+            except StopIteration:
+                break
+            except (UnicodeDecodeError, OSError) as e:
+                summary['errorCount'] += 1
+                summary['errors'].append({'line': line_no + 1, 'error': f"Could not read the statement: {e}"})
+                summary['complete'] = False
+                break
+            try:
+                if isinstance(raw, ValueError):
+                    raise raw
+                name, amount, category, trans_type, timestamp, fitid = normalize(raw, default_category)
+                self.model.validate_transaction(name, amount, category, trans_type)
+            except ValueError as e:
+                summary['errorCount'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line_no, 'error': str(e)})
+                continue
+            occurrence = 1
+            if not fitid:
+                row_key = (timestamp, name, amount, trans_type)
+                occurrence = occurrences[row_key] = occurrences.get(row_key, 0) + 1
+            digest = content_hash(user_id, name, amount, trans_type, timestamp, fitid, occurrence)
+            batch.append((name, amount, category, trans_type, user_id, timestamp, digest))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, summary)
+                batch = []
+        if batch:
+            self._flush(batch, summary)
+        return summary
+
+    def _flush(self, batch, summary):
+        """Insert one batch in a single transaction, skipping rows whose hash already exists."""
+        with self.model._get_conn() as conn:
+            since = self.model.begin_changes(conn.cursor())
+            placeholders = ', '.join('?' * len(batch))
+            existing = {row[0] for row in conn.execute(
+                f'SELECT contentHash FROM transactions WHERE contentHash IN ({placeholders})',
+                [row[-1] for row in batch])}
+            fresh = []
+            for row in batch:
+                if row[-1] in existing:
+                    summary['duplicates'] += 1
+                else:
+                    existing.add(row[-1])
+                    fresh.append(row)
+            # rowcount counts the rows actually inserted (not the rollup triggers' writes), so a
+            # row another import inserted since the SELECT is counted as the duplicate it is
+            inserted = conn.executemany(
+                '''INSERT OR IGNORE INTO transactions (name, amount, category, type, userId, timestamp, contentHash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                fresh
+            ).rowcount
+            self.model.note_changes(conn.cursor(), since)
+            conn.commit()
+        self.model.invalidate_transactions((user_id, trans_type, category, timestamp)
+                                           for _, _, category, trans_type, user_id, timestamp, _ in fresh)
+        summary['imported'] += inserted
+        summary['duplicates'] += len(fresh) - inserted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import a bank statement into Arcadia Planner.')
+    parser.add_argument('path', help='statement file')
+    parser.add_argument('--format', choices=sorted(READERS), help='statement format (default: from file extension)')
+    parser.add_argument('--user', type=int, help='userId the transactions belong to')
+    parser.add_argument('--category', default=DEFAULT_CATEGORY, help='category for rows without one')
+    parser.add_argument('--db', default=DB_PATH, help='database file (default: arcadia.db)')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('ofx' if args.path.lower().endswith(('.ofx', '.qfx')) else 'csv')
+    importer = StatementImporter(BudgetModel(args.db))
+    try:
+        with open(args.path, newline='', encoding='utf-8-sig') as stream:
+            summary = importer.import_stream(stream, fmt, args.user, args.category)
+    except (OSError, ValueError) as e:
+        print(f"✗ Import failed: {e}")
+        return 1
+    mark = '✓' if summary['complete'] else '✗'
+    print(f"{mark} Imported {summary['imported']} transactions "
+          f"({summary['duplicates']} duplicates skipped, {summary['errorCount']} rows rejected)")
+    for error in summary['errors']:
+        print(f"  line {error['line']}: {error['error']}")
+    return 0 if summary['complete'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
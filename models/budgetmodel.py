@@ -5,33 +5,99 @@ Date: 2025-11-20
 Description:
     Core backend logic for Budget module.
     Handles CRUD operations for transactions and analytics calculations (sum, average, by category) using arcadia.db.
+    Analytics read the budget_rollups buckets (per user, type, category, day and month)
+    that triggers keep in step with transactions; percentiles and histograms come from
+    the budget_sketches stored alongside them.
+    Transaction listings are keyset-paginated on (timestamp, transactionId), newest first.
+    Exports stream rows in fetchmany batches so memory stays flat for any table size.
+    Savings forecasts for all of a user's goals are projected in a single query.
+    analytics() and get_goals() results are cached per instance; every write path here
+    invalidates exactly the entries its rows can change. Writes from other processes or
+    raw SQL are picked up from the budget_changes log (migration v16) within CACHE_SYNC_INTERVAL.
 """
 
+import base64
+import bisect
+import json
+import math
 import sqlite3
+import threading
+import time
+from datetime import datetime
+from models.basemodel import BaseModel
+from models.cache import LRUCache, MISS
+from database.maintenance import rebuild_budget_rollups, rebuild_budget_sketches
+from database.quantile_sketch import AmountSketch
 
 DB_PATH = 'arcadia.db'
 
-class BudgetModel:
-    def __init__(self, db_path=DB_PATH):
+TRANSACTION_FIELDS = ['transactionId', 'name', 'amount', 'category', 'type', 'timestamp', 'userId']
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SAVINGS_TRANSACTION_FIELDS = ['transactionId', 'goalId', 'userId', 'amount', 'direction', 'timestamp']
+EXPORT_DATASETS = {
+    'transactions': ('transactions', TRANSACTION_FIELDS),
+    'savings': ('savings_transactions', SAVINGS_TRANSACTION_FIELDS),
+}
+EXPORT_BATCH_SIZE = 500
+FORECAST_WINDOW_DAYS = 90
+# Seconds between polls of budget_changes for writes made outside this model
+CACHE_SYNC_INTERVAL = 1.0
+# Seconds budget_changes rows are kept; a model that polls less often than this drops its whole cache
+CHANGE_RETENTION = 60.0
+# Changes read per poll; past this the whole cache is dropped instead
+SYNC_MAX_CHANGES = 10000
+
+class BudgetModel(BaseModel):
+    def __init__(self, db_path=DB_PATH, cache=None):
         self.db_path = db_path
+        self.cache = cache if cache is not None else LRUCache()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._last_change = None
+        # (after, upto] changeSeq ranges logged by this model's own writes, which it has invalidated already
+        self._own_ranges = []
+        self._own_lock = threading.Lock()
+        self.changes_seen = 0
+
+    def parse_date(self, date_str):
+        try:
+            return datetime.strptime(date_str, '%Y-%m-%d').date()
+        except Exception:
+            return None
 
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def validate_transaction(self, name, amount, category, trans_type):
+        """Rules every new transaction must pass (single adds and statement imports)."""
+        if not name:
+            raise ValueError("Invalid transaction data: name is required")
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            raise ValueError("Invalid transaction data: amount must be a number")
+        # SQLite stores NaN as NULL, which the NOT NULL amount column rejects
+        if not math.isfinite(amount):
+            raise ValueError("Invalid transaction data: amount must be finite")
+        if amount < 0:
+            raise ValueError("Invalid transaction data: amount must not be negative")
+        if not category:
+            raise ValueError("Invalid transaction data: category is required")
+        if trans_type not in ('expense', 'income'):
+            raise ValueError("Invalid transaction data: type must be expense or income")
 
-    def add_transaction(self, name, amount, category, trans_type):
-        if not name or amount is None or not category or trans_type not in ('expense', 'income') or amount < 0:
-            raise ValueError("Invalid transaction data")
+    def add_transaction(self, name, amount, category, trans_type, user_id=None):
+        self.validate_transaction(name, amount, category, trans_type)
         with self._get_conn() as conn:
             c = conn.cursor()
+            since = self.begin_changes(c)
             c.execute(
-                'INSERT INTO transactions (name, amount, category, type) VALUES (?, ?, ?, ?)',
-                (name, amount, category, trans_type)
+                'INSERT INTO transactions (name, amount, category, type, userId) VALUES (?, ?, ?, ?, ?)',
+                (name, amount, category, trans_type, user_id)
             )
             transaction_id = c.lastrowid
+            changed = self._transaction_keys(c, [transaction_id])
+            self.note_changes(c, since)
             conn.commit()
-            return transaction_id
+        self.invalidate_transactions(changed)
+        return transaction_id
 
 
     def update_transaction(self, transaction_id, **fields):
@@ -46,10 +112,15 @@ class BudgetModel:
         values.append(transaction_id)
         with self._get_conn() as conn:
             c = conn.cursor()
+            since = self.begin_changes(c)
+            changed = self._transaction_keys(c, [transaction_id])
             c.execute(
                 f'UPDATE transactions SET {", ".join(updates)} WHERE transactionId=?', values
             )
+            changed += self._transaction_keys(c, [transaction_id])
+            self.note_changes(c, since)
             conn.commit()
+        self.invalidate_transactions(changed)
         return True
 
     def get_transaction(self, transaction_id):
@@ -65,71 +136,403 @@ class BudgetModel:
         keys = ['transactionId', 'name', 'amount', 'category', 'type', 'timestamp']
         return dict(zip(keys, row))
 
-    def list_transactions(self):
+    def transaction_owner(self, transaction_id):
+        """userId of a transaction, or None if it does not exist or has no owner."""
+        with self._get_conn() as conn:
+            row = conn.execute('SELECT userId FROM transactions WHERE transactionId=?', (transaction_id,)).fetchone()
+        return row[0] if row else None
+
+    def encode_cursor(self, timestamp, transaction_id):
+        """Opaque page cursor pointing just past (timestamp, transactionId); timestamp may be None."""
+        raw = json.dumps([timestamp, transaction_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            timestamp, transaction_id = json.loads(raw)
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not (timestamp is None or isinstance(timestamp, str)) or not isinstance(transaction_id, int):
+            raise ValueError("Invalid cursor")
+        return timestamp, transaction_id
+
+    def _list_filters(self, user_id=None, start_date=None, end_date=None, trans_type=None, category=None, after=None):
+        filters = []
+        params = []
+        if trans_type and trans_type not in ('expense', 'income'):
+            raise ValueError("Invalid transaction type")
+        if user_id is not None:
+            filters.append("userId=?")
+            params.append(user_id)
+        if start_date:
+            if self.parse_date(start_date) is None:
+                raise ValueError("Invalid startDate format")
+            filters.append("timestamp >= ?")
+            params.append(start_date)
+        if end_date:
+            if self.parse_date(end_date) is None:
+                raise ValueError("Invalid endDate format")
+            filters.append("timestamp < date(?, '+1 day')")
+            params.append(end_date)
+        if trans_type:
+            filters.append("type=?")
+            params.append(trans_type)
+        if category:
+            filters.append("category=?")
+            params.append(category)
+        if after:
+            timestamp, transaction_id = after
+            if timestamp is None:
+                # Rows without a timestamp sort after every dated row, by transactionId
+                filters.append("timestamp IS NULL AND transactionId < ?")
+                params.append(transaction_id)
+            else:
+                # Row-value comparison lets SQLite seek the (userId, timestamp) / (timestamp) index;
+                # it is never true for a NULL timestamp, so those rows are read separately
+                filters.append("(timestamp, transactionId) < (?, ?)")
+                params.extend(after)
+        return (" WHERE " + " AND ".join(filters)) if filters else "", params
+
+    def list_transactions(self, user_id=None, limit=DEFAULT_PAGE_SIZE, cursor=None, start_date=None,
+                          end_date=None, trans_type=None, category=None, fields=None):
+        """
+        One page of transactions, newest first. Returns (transactions, next_cursor);
+        next_cursor is None on the last page. fields limits the returned columns.
+        """
+        fields = list(fields) if fields else TRANSACTION_FIELDS[:6]
+        unknown = [f for f in fields if f not in TRANSACTION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if limit is None:
+            limit = DEFAULT_PAGE_SIZE
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("Invalid limit")
+        limit = min(limit, MAX_PAGE_SIZE)
+        position = self.decode_cursor(cursor) if cursor else None
+        where, params = self._list_filters(user_id, start_date, end_date, trans_type, category, position)
+        # The sort key is always selected so the next cursor can be built from the last row
+        columns = ['timestamp', 'transactionId'] + fields
+        query = (f'SELECT {", ".join(columns)} FROM transactions{{where}} '
+                 f'ORDER BY timestamp DESC, transactionId DESC LIMIT ?')
         with self._get_conn() as conn:
             c = conn.cursor()
-            c.execute(
-                'SELECT transactionId, name, amount, category, type, timestamp FROM transactions'
-            )
+            c.execute(query.format(where=where), params + [limit + 1])
             rows = c.fetchall()
-        keys = ['transactionId', 'name', 'amount', 'category', 'type', 'timestamp']
-        return [dict(zip(keys, row)) for row in rows]
+            if len(rows) <= limit and position and position[0] is not None and not (start_date or end_date):
+                # Past the last dated row: continue with the undated ones (NULL sorts last)
+                where, params = self._list_filters(user_id, start_date, end_date, trans_type, category)
+                where += (" AND " if where else " WHERE ") + "timestamp IS NULL"
+                c.execute(query.format(where=where), params + [limit + 1 - len(rows)])
+                rows += c.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1][0], rows[-1][1])
+        return [dict(zip(fields, row[2:])) for row in rows], next_cursor
+
+    def export(self, dataset, user_id=None, goal_id=None, start_date=None, end_date=None,
+               trans_type=None, category=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Oldest-first export of 'transactions' or 'savings' (savings_transactions).
+        Filters are validated up front; returns (columns, batches) where batches is a
+        generator of row-tuple lists read with fetchmany(batch_size).
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError("Unknown export dataset")
+        table, columns = EXPORT_DATASETS[dataset]
+        if dataset == 'transactions':
+            if goal_id is not None:
+                raise ValueError("goalId only applies to savings exports")
+            where, params = self._list_filters(user_id, start_date, end_date, trans_type, category)
+        else:
+            if trans_type or category:
+                raise ValueError("type and category only apply to transaction exports")
+            where, params = self._list_filters(user_id, start_date, end_date)
+            if goal_id is not None:
+                where += (" AND " if where else " WHERE ") + "goalId=?"
+                params.append(goal_id)
+        query = (f'SELECT {", ".join(columns)} FROM {table}{where} '
+                 f'ORDER BY timestamp, transactionId')
+        return columns, self._stream(query, params, batch_size)
+
+    def _stream(self, query, params, batch_size):
+        # A dedicated connection rather than _get_conn(): the generator is suspended between
+        # batches and must not lend its connection to other work on this thread
+        conn = self.pool.acquire()
+        try:
+            c = conn.execute(query, params)
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            self.pool.release(conn)
 
     def delete_transaction(self, transaction_id):
         with self._get_conn() as conn:
             c = conn.cursor()
+            since = self.begin_changes(c)
+            changed = self._transaction_keys(c, [transaction_id])
             c.execute('DELETE FROM transactions WHERE transactionId=?', (transaction_id,))
+            self.note_changes(c, since)
             conn.commit()
+        self.invalidate_transactions(changed)
         return True
 
-    def analytics(self, trans_type=None, category=None):
-        query = 'SELECT amount, category, type FROM transactions'
+    def _transaction_keys(self, c, transaction_ids):
+        """(userId, type, category, timestamp) of the given transactions, for cache invalidation."""
+        placeholders = ', '.join('?' * len(transaction_ids))
+        c.execute(
+            f'SELECT userId, type, category, timestamp FROM transactions WHERE transactionId IN ({placeholders})',
+            list(transaction_ids)
+        )
+        return [tuple(row) for row in c.fetchall()]
+
+    def _analytics_key_matches(self, key, row):
+        """Whether a transaction (userId, type, category, timestamp) falls inside a cached analytics query."""
+        user_id, trans_type, category, start_date, end_date = key[1:6]
+        row_user, row_type, row_category, timestamp = row
+        day = (timestamp or '')[:10]
+        return ((user_id is None or user_id == row_user)
+                and (not trans_type or trans_type == row_type)
+                and (not category or category == row_category)
+                and (not start_date or not day or day >= start_date)
+                and (not end_date or not day or day <= end_date))
+
+    def invalidate_transactions(self, rows):
+        """Drop cached analytics that any of the changed transaction rows contribute to."""
+        rows = list(rows)
+        if rows:
+            self.cache.invalidate(lambda key: key[0] == 'analytics' and
+                                  any(self._analytics_key_matches(key, row) for row in rows))
+
+    def invalidate_goals(self, user_ids):
+        user_ids = set(user_ids)
+        if user_ids:
+            self.cache.invalidate(lambda key: key[0] == 'goals' and key[1] in user_ids)
+
+    def begin_changes(self, c):
+        """
+        Start the write transaction, taking the write lock now, and return the last changeSeq
+        logged before it: every budget_changes row up to the commit is then this model's own.
+        """
+        if not c.connection.in_transaction:
+            c.execute('BEGIN IMMEDIATE')
+        return self._last_change_seq(c)
+
+    def note_changes(self, c, since):
+        """
+        From inside the write transaction, record the changes logged since begin_changes() as
+        this model's own, so the next poll does not invalidate them a second time. Also prunes
+        log rows older than CHANGE_RETENTION.
+        """
+        upto = self._last_change_seq(c)
+        if upto > since:
+            with self._own_lock:
+                self._own_ranges.append((since, upto))
+        # The newest row is always kept, so MAX(changeSeq) never goes back
+        c.execute('DELETE FROM budget_changes WHERE changedAt < ? AND changeSeq < ?',
+                  (time.time() - CHANGE_RETENTION, upto))
+
+    def _last_change_seq(self, c):
+        c.execute('SELECT COALESCE(MAX(changeSeq), 0) FROM budget_changes')
+        return c.fetchone()[0]
+
+    def _is_own_change(self, seq):
+        with self._own_lock:
+            index = bisect.bisect_left(self._own_ranges, (seq,)) - 1
+            return index >= 0 and seq <= self._own_ranges[index][1]
+
+    def _sync_cache(self):
+        """
+        Every CACHE_SYNC_INTERVAL, drop the cached analytics and goals of users with a change
+        logged outside this model's own writes (another process, raw SQL) since the last poll.
+        """
+        if time.monotonic() - self._last_sync < CACHE_SYNC_INTERVAL:
+            return
+        with self._sync_lock:
+            if time.monotonic() - self._last_sync < CACHE_SYNC_INTERVAL:
+                return
+            with self._get_conn() as conn:
+                c = conn.cursor()
+                top = self._last_change_seq(c)
+                rows = []
+                if self._last_change is not None and top > self._last_change:
+                    c.execute('SELECT changeSeq, scope, userId FROM budget_changes '
+                              'WHERE changeSeq > ? AND changeSeq <= ? ORDER BY changeSeq LIMIT ?',
+                              (self._last_change, top, SYNC_MAX_CHANGES + 1))
+                    rows = c.fetchall()
+            # Nothing was cached before the first poll, so earlier changes do not matter
+            if self._last_change is not None and top > self._last_change:
+                if len(rows) > SYNC_MAX_CHANGES or not rows or rows[0][0] != self._last_change + 1:
+                    # Changes pruned before this poll saw them (or too many to sort through):
+                    # which users they touched is unknown, so drop everything
+                    self.changes_seen += top - self._last_change
+                    self.cache.invalidate(lambda key: key[0] in ('analytics', 'goals'))
+                else:
+                    foreign = [(scope, user_id) for seq, scope, user_id in rows if not self._is_own_change(seq)]
+                    self.changes_seen += len(foreign)
+                    changed = set(foreign)
+                    users = {user_id for scope, user_id in changed if scope == 'transactions'}
+                    if users:
+                        # A userId-less entry covers every user; rows without a userId are counted as user 0
+                        self.cache.invalidate(lambda key: key[0] == 'analytics' and (key[1] is None or key[1] in users))
+                    self.invalidate_goals(user_id for scope, user_id in changed if scope == 'goals')
+            self._last_change = top
+            with self._own_lock:
+                self._own_ranges = [r for r in self._own_ranges if r[1] > top]
+            self._last_sync = time.monotonic()
+
+    def cache_stats(self):
+        stats = self.cache.stats()
+        stats['changesSeen'] = self.changes_seen
+        return stats
+
+    def _analytics_filters(self, trans_type=None, category=None, start_date=None, end_date=None, user_id=None):
+        """
+        Pick the rollup buckets for a request and build their WHERE clause.
+        Date ranges (inclusive YYYY-MM-DD) read day buckets, leaving out transactions without
+        a timestamp; otherwise month buckets are summed.
+        """
+        if trans_type and trans_type not in ('expense', 'income'):
+            raise ValueError("Invalid transaction type")
         filters = []
         params = []
+        if start_date or end_date:
+            # Rows without a timestamp roll up to 'unknown', which sorts after every date
+            filters.append("period='day' AND periodStart <> 'unknown'")
+        else:
+            filters.append("period='month'")
+        if start_date:
+            if self.parse_date(start_date) is None:
+                raise ValueError("Invalid startDate format")
+            filters.append("periodStart >= ?")
+            params.append(start_date)
+        if end_date:
+            if self.parse_date(end_date) is None:
+                raise ValueError("Invalid endDate format")
+            filters.append("periodStart <= ?")
+            params.append(end_date)
         if trans_type:
             filters.append("type=?")
             params.append(trans_type)
         if category:
             filters.append("category=?")
             params.append(category)
-        if filters:
-            query += " WHERE " + " AND ".join(filters)
+        if user_id is not None:
+            filters.append("userId=?")
+            params.append(user_id)
+        return " WHERE " + " AND ".join(filters), params
+
+    def analytics(self, trans_type=None, category=None, start_date=None, end_date=None, user_id=None,
+                  include_distribution=False):
+        """
+        Sum, average and per-category totals. With include_distribution, the summary and each
+        category also get an approximate median, p90 and histogram from budget_sketches.
+        """
+        key = ('analytics', user_id, trans_type or None, category or None, start_date or None, end_date or None,
+               bool(include_distribution))
+        self._sync_cache()
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            return cached
+        generation = self.cache.generation
+        summary = self._analytics(trans_type, category, start_date, end_date, user_id, include_distribution)
+        self.cache.put(key, summary, generation)
+        return summary
+
+    def _analytics(self, trans_type, category, start_date, end_date, user_id, include_distribution):
+        # budget_rollups is kept current by triggers on transactions, so this reads
+        # O(categories x buckets) rows no matter how many transactions exist
+        where, params = self._analytics_filters(trans_type, category, start_date, end_date, user_id)
+        query = f'SELECT category, SUM(total), SUM(count) FROM budget_rollups{where} GROUP BY category'
         with self._get_conn() as conn:
             c = conn.cursor()
             c.execute(query, params)
             rows = c.fetchall()
-        amounts = [r[0] for r in rows]
-        if not amounts:
+            if rows and include_distribution:
+                sketches = self._sketches(c, where, params)
+        if not rows:
             return None
+        total = 0
+        count = 0
+        by_category = {}
+        for cat, cat_sum, cat_count in rows:
+            by_category[cat] = {'sum': cat_sum, 'count': cat_count}
+            total += cat_sum
+            count += cat_count
         summary = {
-            'sum': sum(amounts),
-            'average': sum(amounts) / len(amounts),
-            'by_category': {}
+            'sum': total,
+            'average': total / count,
+            'by_category': by_category
         }
-        for amt, cat, typ in rows:
-            if cat not in summary['by_category']:
-                summary['by_category'][cat] = {'sum': 0, 'count': 0}
-            summary['by_category'][cat]['sum'] += amt
-            summary['by_category'][cat]['count'] += 1
+        if include_distribution:
+            for cat, sketch in sketches.items():
+                target = summary if cat is None else by_category[cat]
+                target['median'] = sketch.quantile(0.5)
+                target['p90'] = sketch.quantile(0.9)
+                target['histogram'] = sketch.histogram()
         return summary
 
+    def _sketches(self, c, where, params):
+        """
+        Merge the selected budget_sketches rows into one AmountSketch per category plus an
+        overall one (key None), in a single pass ordered by amount bucket.
+        The filter columns only exist on budget_sketches, so `where` applies unqualified.
+        """
+        c.execute(
+            f'''SELECT s.category, b.upperBound, b.value, SUM(s.count)
+                FROM budget_sketches s JOIN amount_buckets b ON b.bucket = s.bucket
+                {where}
+                GROUP BY s.category, s.bucket
+                ORDER BY s.bucket''',
+            params
+        )
+        sketches = {None: AmountSketch()}
+        for cat, upper, value, count in c:
+            if cat not in sketches:
+                sketches[cat] = AmountSketch()
+            sketches[cat].add(upper, value, count)
+            sketches[None].add(upper, value, count)
+        return sketches
+
+    def rebuild_rollups(self):
+        """Regenerate budget_rollups from transactions; returns the number of buckets."""
+        with self._get_conn() as conn:
+            written = rebuild_budget_rollups(conn)
+            rebuild_budget_sketches(conn)
+        self.cache.invalidate(lambda key: key[0] == 'analytics')
+        return written
+
     def create_savings_goal(self, user_id, name, target_amount, deadline=None, notes=None):
         with self._get_conn() as conn:
             c = conn.cursor()
+            since = self.begin_changes(c)
             c.execute(
                 '''INSERT INTO savings_goals (userId, name, targetAmount, deadline, notes)
                    VALUES (?, ?, ?, ?, ?)''',
                 (user_id, name, target_amount, deadline, notes)
             )
+            self.note_changes(c, since)
             conn.commit()
-            return c.lastrowid
+        self.invalidate_goals([user_id])
+        return c.lastrowid
 
     def get_goals(self, user_id):
+        key = ('goals', user_id)
+        self._sync_cache()
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            return cached
+        generation = self.cache.generation
         with self._get_conn() as conn:
             c = conn.cursor()
             c.execute('SELECT * FROM savings_goals WHERE userId=?', (user_id,))
-            rows = c.fetchall()
-            return [dict(row) for row in rows]
+            goals = [dict(row) for row in c.fetchall()]
+        self.cache.put(key, goals, generation)
+        return goals
 
     def get_goal(self, goal_id):
         with self._get_conn() as conn:
@@ -138,29 +541,149 @@ class BudgetModel:
             row = c.fetchone()
             return dict(row) if row else None
 
-    def contribute_to_goal(self, goal_id, user_id, amount, direction='deposit'):
+    def goal_owner(self, goal_id):
+        """userId of a savings goal, or None if it does not exist."""
+        with self._get_conn() as conn:
+            row = conn.execute('SELECT userId FROM savings_goals WHERE goalId=?', (goal_id,)).fetchone()
+        return row[0] if row else None
+
+    def _apply_contribution(self, c, goal_id, user_id, amount, direction):
+        """
+        Move amount in or out of a goal with one conditional UPDATE, so concurrent
+        contributions never lose updates and a withdrawal can never overdraw.
+        Runs inside the caller's write transaction, which also gets the ledger row.
+        """
         if direction not in ('deposit', 'withdrawal'):
             raise ValueError("Invalid direction")
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount) \
+                or amount <= 0:
+            raise ValueError("Invalid amount")
+        # Checked before the UPDATE: the ledger row needs it (NOT NULL)
+        if isinstance(user_id, bool) or not isinstance(user_id, int):
+            raise ValueError("Invalid userId")
+        delta = amount if direction == 'deposit' else -amount
+        c.execute(
+            '''UPDATE savings_goals SET currentAmount = currentAmount + ?
+               WHERE goalId=? AND userId=? AND currentAmount + ? >= 0''',
+            (delta, goal_id, user_id, delta)
+        )
+        if c.rowcount == 0:
+            # Goals of other users are reported as missing
+            c.execute('SELECT 1 FROM savings_goals WHERE goalId=? AND userId=?', (goal_id, user_id))
+            if not c.fetchone():
+                raise ValueError("Goal not found")
+            raise ValueError("Insufficient savings")
+        # Add savings transaction record
+        c.execute(
+            '''INSERT INTO savings_transactions (goalId, userId, amount, direction)
+               VALUES (?, ?, ?, ?)''',
+            (goal_id, user_id, amount, direction)
+        )
+        c.execute('SELECT currentAmount, userId FROM savings_goals WHERE goalId=?', (goal_id,))
+        return tuple(c.fetchone())
+
+    def contribute_to_goal(self, goal_id, user_id, amount, direction='deposit'):
         with self._get_conn() as conn:
             c = conn.cursor()
-            # Update goal currentAmount
-            sign = 1 if direction == 'deposit' else -1
-            c.execute('SELECT currentAmount FROM savings_goals WHERE goalId=?', (goal_id,))
-            row = c.fetchone()
-            if not row:
-                raise ValueError("Goal not found")
-            new_amt = row[0] + sign * amount
-            if new_amt < 0:
-                raise ValueError("Insufficient savings")
-            c.execute('UPDATE savings_goals SET currentAmount=? WHERE goalId=?', (new_amt, goal_id))
-            # Add savings transaction record
-            c.execute(
-                '''INSERT INTO savings_transactions (goalId, userId, amount, direction)
-                   VALUES (?, ?, ?, ?)''',
-                (goal_id, user_id, amount, direction)
-            )
+            since = self.begin_changes(c)
+            new_amt, owner = self._apply_contribution(c, goal_id, user_id, amount, direction)
+            self.note_changes(c, since)
             conn.commit()
-            return new_amt
+        self.invalidate_goals([owner])
+        return new_amt
+
+    def contribute_many(self, contributions):
+        """
+        Apply a list of {'goalId', 'userId', 'amount', 'direction'} contributions in one
+        write transaction. Items are independent: each runs in its own savepoint, so one
+        that fails its checks or its writes is rolled back alone, reported and skipped.
+        Returns {'goalId', 'newAmount'} or {'goalId', 'error'} per item.
+        """
+        results = []
+        owners = set()
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            since = self.begin_changes(c)
+            for item in contributions:
+                goal_id = item.get('goalId')
+                c.execute('SAVEPOINT contribution')
+                try:
+                    new_amt, owner = self._apply_contribution(
+                        c, goal_id, item.get('userId'), item.get('amount'), item.get('direction', 'deposit')
+                    )
+                except (ValueError, sqlite3.Error) as e:
+                    c.execute('ROLLBACK TO contribution')
+                    results.append({'goalId': goal_id, 'error': str(e)})
+                else:
+                    owners.add(owner)
+                    results.append({'goalId': goal_id, 'newAmount': new_amt})
+                c.execute('RELEASE contribution')
+            self.note_changes(c, since)
+            conn.commit()
+        self.invalidate_goals(owners)
+        return results
+
+    def forecast_goals(self, user_id, as_of=None, window_days=FORECAST_WINDOW_DAYS):
+        """
+        Project every goal of a user in one statement: the savings rate over the last
+        window_days (or since the goal was created), the date targetAmount will be
+        reached at that rate, and the weekly rate needed to hit the deadline.
+        """
+        if as_of is not None and self.parse_date(as_of) is None:
+            raise ValueError("Invalid asOf format")
+        if isinstance(window_days, bool) or not isinstance(window_days, int) or window_days < 1:
+            raise ValueError("Invalid windowDays")
+        params = {'userId': user_id, 'asOf': as_of or 'now', 'window': f'-{window_days} days'}
+        query = '''
+            WITH history AS (
+                SELECT g.goalId,
+                       SUM(CASE t.direction WHEN 'deposit' THEN t.amount ELSE -t.amount END) AS net,
+                       MIN(t.timestamp) AS firstAt
+                FROM savings_goals g
+                JOIN savings_transactions t
+                  ON t.goalId = g.goalId AND t.timestamp >= datetime(:asOf, :window)
+                WHERE g.userId = :userId
+                GROUP BY g.goalId
+            ),
+            rates AS (
+                SELECT g.goalId, g.name, g.targetAmount, g.currentAmount, g.deadline,
+                       MAX(g.targetAmount - g.currentAmount, 0) AS remaining,
+                       IFNULL(h.net, 0) / MAX(1.0, julianday(:asOf) - MAX(
+                           julianday(:asOf, :window),
+                           IFNULL(julianday(IFNULL(g.createdAt, h.firstAt)), julianday(:asOf, :window))
+                       )) AS dailyRate,
+                       julianday(g.deadline) - julianday(date(:asOf)) AS daysLeft
+                FROM savings_goals g
+                LEFT JOIN history h ON h.goalId = g.goalId
+                WHERE g.userId = :userId
+            ),
+            projections AS (
+                SELECT *,
+                       CASE WHEN remaining = 0 THEN date(:asOf)
+                            WHEN dailyRate > 0 THEN date(:asOf, '+' || (remaining / dailyRate) || ' days')
+                       END AS projectedDate
+                FROM rates
+            )
+            SELECT goalId, name, targetAmount, currentAmount, deadline,
+                   MIN(1.0, currentAmount / targetAmount) AS progress,
+                   ROUND(dailyRate * 7, 2) AS weeklyRate,
+                   projectedDate,
+                   CASE WHEN deadline IS NULL OR daysLeft IS NULL THEN NULL
+                        WHEN remaining = 0 THEN 0
+                        WHEN daysLeft > 0 THEN ROUND(remaining * 7 / daysLeft, 2)
+                   END AS requiredWeeklyRate,
+                   deadline IS NOT NULL AND projectedDate IS NOT NULL AND projectedDate <= deadline AS onTrack
+            FROM projections
+            ORDER BY goalId
+        '''
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute(query, params)
+            rows = c.fetchall()
+        forecasts = [dict(row) for row in rows]
+        for forecast in forecasts:
+            forecast['onTrack'] = bool(forecast['onTrack'])
+        return forecasts
 
     def list_goal_transactions(self, goal_id):
         with self._get_conn() as conn:
@@ -172,6 +695,11 @@ class BudgetModel:
     def delete_goal(self, goal_id):
         with self._get_conn() as conn:
             c = conn.cursor()
+            since = self.begin_changes(c)
+            c.execute('SELECT userId FROM savings_goals WHERE goalId=?', (goal_id,))
+            owners = [row[0] for row in c.fetchall()]
             c.execute('DELETE FROM savings_transactions WHERE goalId=?', (goal_id,))
             c.execute('DELETE FROM savings_goals WHERE goalId=?', (goal_id,))
+            self.note_changes(c, since)
             conn.commit()
+        self.invalidate_goals(owners)
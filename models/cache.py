@@ -0,0 +1,123 @@
+"""
+File: cache.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Thread-safe in-process LRU cache for model read results.
+    Bounded by entry count and by approximate size in bytes; models invalidate
+    entries from their write paths by key predicate. Entries can also carry a
+    time to live. Keeps hit/miss counters.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# Returned by get() on a miss, since None is a cacheable result
+MISS = object()
+
+
+def approximate_size(value):
+    """Size of a JSON-serializable value as encoded; close enough for a memory bound."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class LRUCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Default time to live in seconds for put(); None keeps entries until evicted
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, monotonic deadline or None)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; see put()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+                self._bytes -= self._entries.pop(key)[1]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation=None, ttl=None):
+        """
+        Cache value under key, for ttl seconds (default: the cache's ttl). Pass the generation
+        read before computing value: if a write invalidated anything in the meantime the value
+        may be stale and is not stored.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic() + ttl if ttl is not None else None)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key satisfies predicate(key). Returns how many were dropped."""
+        return self.invalidate_entries(lambda key, value: predicate(key))
+
+    def invalidate_entries(self, predicate):
+        """Drop every entry for which predicate(key, value) holds. Returns how many were dropped."""
+        with self._lock:
+            self.generation += 1
+            stale = [key for key, entry in self._entries.items() if predicate(key, entry[0])]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,249 @@
+"""
+File: errorlog.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Non-blocking error log for the backend services.
+    configure_logging() puts a QueueHandler on the root logger, so logging.error()
+    on a request thread only builds the record and appends it to a bounded queue.
+    A QueueListener thread writes the records to a size-rotated file as one JSON
+    object per line. Identical errors (same logger, level and message) are sampled
+    before they are queued: the first SAMPLE_BURST per SAMPLE_WINDOW seconds are
+    kept and the rest only counted, and the next record written for that error
+    carries the count as "suppressed". When the queue is full records are dropped
+    and counted rather than waited on.
+
+Configuration (environment):
+    ARCADIA_LOG_FILE         log file (default: logs/errors.log; its directory is created on first write)
+    ARCADIA_LOG_LEVEL        lowest level logged (default: ERROR)
+    ARCADIA_LOG_MAX_BYTES    size at which the file is rotated (default: 10 MB)
+    ARCADIA_LOG_BACKUPS      rotated files kept (default: 5)
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+FILE_ENV_VAR = 'ARCADIA_LOG_FILE'
+LEVEL_ENV_VAR = 'ARCADIA_LOG_LEVEL'
+MAX_BYTES_ENV_VAR = 'ARCADIA_LOG_MAX_BYTES'
+BACKUPS_ENV_VAR = 'ARCADIA_LOG_BACKUPS'
+DEFAULT_FILE = os.path.join('logs', 'errors.log')
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+QUEUE_SIZE = 10000
+SAMPLE_WINDOW = 60.0
+SAMPLE_BURST = 5
+# Distinct errors tracked for sampling; past this the counts start over
+MAX_SAMPLE_KEYS = 1000
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, and exception/suppressed when present."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        # ASCII-only, so a line's length is its size in bytes
+        return json.dumps(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through the first burst of each identical error per window and counts the rest."""
+
+    def __init__(self, window=SAMPLE_WINDOW, burst=SAMPLE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._seen = {}  # (logger, level, message) -> [window start, passed, suppressed]
+        self.suppressed = 0
+
+    def filter(self, record):
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is None or now - seen[0] >= self.window:
+                if seen is None and len(self._seen) >= MAX_SAMPLE_KEYS:
+                    self._seen.clear()
+                pending = seen[2] if seen is not None else 0
+                self._seen[key] = [now, 1, 0]
+            elif seen[1] < self.burst:
+                seen[1] += 1
+                pending = 0
+            else:
+                seen[2] += 1
+                self.suppressed += 1
+                return False
+        record.suppressed = pending
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    def __init__(self, log_queue, max_size):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The usual record (an already formatted message, no traceback) is queued as is;
+        # the JSON is built on the listener thread
+        if not record.args and not record.exc_info:
+            return record
+        # Otherwise only what the listener needs crosses the queue, as in QueueHandler.prepare:
+        # the message with its arguments merged in and the traceback as text
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # queue.SimpleQueue has no maxsize; checking its length is still cheaper than a Queue's locks
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+
+class _RotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that leaves flushing to the listener, which flushes once the queue
+    is empty, and decides on rotation from a running byte count instead of formatting
+    every record twice and checking the file on disk.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        stream = super()._open()
+        self.size = stream.seek(0, os.SEEK_END)
+        return stream
+
+    def shouldRollover(self, record):
+        return self.maxBytes > 0 and self.stream is not None and self.size >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            line = self.format(record) + self.terminator
+            self.stream.write(line)
+            self.size += len(line)
+        except Exception:
+            self.handleError(record)
+
+
+class _QueueListener(QueueListener):
+    def dequeue(self, block):
+        # Records are written in batches: the file is flushed only when the queue runs dry
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            if not block:
+                raise
+        for handler in self.handlers:
+            handler.flush()
+        return self.queue.get()
+
+
+class LogPipeline:
+    def __init__(self, path, level, max_bytes, backups, queue_size=QUEUE_SIZE,
+                 window=SAMPLE_WINDOW, burst=SAMPLE_BURST):
+        self.path = os.path.abspath(path)
+        self.file_handler = _RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups,
+                                                 encoding='utf-8', delay=True)
+        self.file_handler.setFormatter(JsonFormatter())
+        self.sampler = SamplingFilter(window, burst)
+        self.handler = _QueueHandler(queue.SimpleQueue(), queue_size)
+        self.handler.setLevel(level)
+        self.handler.addFilter(self.sampler)
+        self.listener = _QueueListener(self.handler.queue, self.file_handler)
+        self.listener.start()
+        self.running = True
+
+    def flush(self):
+        """Wait until every queued record has been written; the listener is running afterwards."""
+        if not self.running:
+            self.listener.start()
+        # stop() queues a sentinel behind the pending records and joins the thread
+        self.listener.stop()
+        self.file_handler.flush()
+        self.listener.start()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.listener.stop()
+            self.running = False
+        self.file_handler.flush()
+
+    def stats(self):
+        return {
+            'file': self.path,
+            'queued': self.handler.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'suppressed': self.sampler.suppressed,
+        }
+
+
+def configure_logging(path=None, level=None, max_bytes=None, backups=None, **options):
+    """
+    Send root-logger records through the queue to the rotating JSON file. Called again it
+    keeps the running pipeline unless a setting is given, in which case it replaces it.
+    Returns the pipeline.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None and all(v is None for v in (path, level, max_bytes, backups)) and not options:
+            return _pipeline
+        if path is None:
+            path = os.environ.get(FILE_ENV_VAR, DEFAULT_FILE)
+        if level is None:
+            level = os.environ.get(LEVEL_ENV_VAR, 'ERROR').upper()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get(MAX_BYTES_ENV_VAR, DEFAULT_MAX_BYTES))
+        if backups is None:
+            backups = int(os.environ.get(BACKUPS_ENV_VAR, DEFAULT_BACKUPS))
+        pipeline = LogPipeline(path, level, max_bytes, backups, **options)
+        root = logging.getLogger()
+        if _pipeline is not None:
+            root.removeHandler(_pipeline.handler)
+            _pipeline.stop()
+        root.addHandler(pipeline.handler)
+        root.setLevel(pipeline.handler.level)
+        _pipeline = pipeline
+        return pipeline
+
+
+def logging_stats():
+    """Queue depth, dropped and suppressed record counts; None before configure_logging()."""
+    return _pipeline.stats() if _pipeline is not None else None
+
+
+@atexit.register
+def _flush_on_exit():
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -5,21 +5,33 @@ Date: 2025-11-20
 Description:
     Backend logic for Habit module handling CRUD operations,
     checkins, streak calculation.
+    Streaks (current, longest, last completion) are stored on the habit and kept
+    current by triggers on habit_completions, so reading one is a single-row lookup.
+    A user's habit list can carry all their streaks from the same query.
+    Completions are also kept as per-year day bitmaps (habit_calendar) for
+    calendars and windowed completion rates. Per-habit and per-category analytics
+    come from one aggregate query and are cached by the last completion id.
 """
 
 import sqlite3
+from models.basemodel import BaseModel
+from models.cache import LRUCache, MISS
+from database.maintenance import habit_streaks_query, rebuild_habit_streaks
+from database import completion_calendar as calendar
 from datetime import datetime, timedelta
 
 DB_PATH = 'arcadia.db'
+HABIT_FIELDS = ['habitId', 'userId', 'habitName', 'description', 'category',
+                'frequency', 'startDate', 'colorShade', 'created_at']
+STREAK_FIELDS = ['currentStreak', 'longestStreak', 'lastCompletionDate']
+MAX_CHECK_INS = 1000
+ANALYTICS_WINDOWS = (7, 30, 90)
+WEEKDAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
 
-class HabitModel:
-    def __init__(self, db_path=DB_PATH):
+class HabitModel(BaseModel):
+    def __init__(self, db_path=DB_PATH, cache=None):
         self.db_path = db_path
-
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
+        self.cache = cache if cache is not None else LRUCache()
 
     def parse_date(self, date_str):
         try:
@@ -45,7 +57,8 @@ class HabitModel:
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (user_id, habit_name, description, category, frequency, start_date, color_shade))
                 conn.commit()
-                return c.lastrowid
+            self.invalidate_analytics()
+            return c.lastrowid
         except sqlite3.IntegrityError as e:
             # Check for UNIQUE constraint error and give a helpful message
             if "UNIQUE" in str(e).upper():
@@ -53,12 +66,25 @@ class HabitModel:
             raise  # re-raise any other integrity error
 
 
-    def get_habits(self, user_id):
+    def get_habits(self, user_id, include_streaks=False):
+        """A user's habits; with include_streaks each also carries its stored streak fields."""
+        fields = HABIT_FIELDS + (STREAK_FIELDS if include_streaks else [])
         with self._get_conn() as conn:
             c = conn.cursor()
-            c.execute('SELECT * FROM habits WHERE userId=?', (user_id,))
+            c.execute(f'SELECT {", ".join(fields)} FROM habits WHERE userId=?', (user_id,))
             rows = c.fetchall()
-            return [dict(row) for row in rows]
+        habits = [dict(row) for row in rows]
+        if include_streaks:
+            yesterday = self._yesterday()
+            for habit in habits:
+                self._expire_streak(habit, yesterday)
+        return habits
+
+    def habit_owner(self, habit_id):
+        """userId of a habit, or None if it does not exist."""
+        with self._get_conn() as conn:
+            row = conn.execute('SELECT userId FROM habits WHERE habitId=?', (habit_id,)).fetchone()
+        return row[0] if row else None
 
     def update_habit(self, habit_id, **fields):
         allowed_keys = ['habitName', 'description', 'category', 'frequency', 'startDate', 'colorShade']
@@ -86,49 +112,272 @@ class HabitModel:
             c = conn.cursor()
             c.execute(f'UPDATE habits SET {", ".join(updates)} WHERE habitId=?', values)
             conn.commit()
+        self.invalidate_analytics()
 
     def delete_habit(self, habit_id):
         with self._get_conn() as conn:
             c = conn.cursor()
-            c.execute('DELETE FROM habit_completions WHERE habitId=?', (habit_id,))
+            # Habit and calendar first: the streak and calendar triggers then have no row to
+            # update per deleted completion
             c.execute('DELETE FROM habits WHERE habitId=?', (habit_id,))
+            c.execute('DELETE FROM habit_calendar WHERE habitId=?', (habit_id,))
+            c.execute('DELETE FROM habit_completions WHERE habitId=?', (habit_id,))
             conn.commit()
+        self.invalidate_analytics()
 
     def habit_check_in(self, habit_id):
+        """Record today's completion; the insert trigger extends the stored streak in O(1)."""
         today_str = datetime.utcnow().date().strftime('%Y-%m-%d')
         with self._get_conn() as conn:
             c = conn.cursor()
-            c.execute('SELECT COUNT(*) FROM habit_completions WHERE habitId=? AND completionDate=?',
+            # The unique (habitId, completionDate) index makes a second check-in today a no-op
+            c.execute('INSERT OR IGNORE INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
                       (habit_id, today_str))
-            count = c.fetchone()[0]
-            if count > 0:
-                return False  # already checked in today
-            c.execute('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)', (habit_id, today_str))
             conn.commit()
-        return True
+            return c.rowcount == 1
 
-    def habit_streak(self, habit_id):
+    def check_in_many(self, check_ins, user_id=None):
+        """
+        Record a list of {'habitId', 'date'} check-ins, backfilled days included, in one
+        transaction. Items are independent: each gets {'habitId', 'date', 'status'} with
+        status 'recorded' or 'duplicate', or {'habitId', 'date', 'error'}. With user_id,
+        habits of other users are rejected. Returns (results, {habitId: streak_info}) for
+        every habit checked in.
+        """
+        if len(check_ins) > MAX_CHECK_INS:
+            raise ValueError(f"At most {MAX_CHECK_INS} check-ins per request")
+        # Clients ahead of UTC may already be on tomorrow
+        latest = datetime.utcnow().date() + timedelta(days=1)
+        results = []
+        pending = []
+        habit_ids = list({item.get('habitId') for item in check_ins if isinstance(item.get('habitId'), int)})
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute(f'SELECT habitId, userId FROM habits WHERE habitId IN ({", ".join("?" * len(habit_ids))})',
+                      habit_ids)
+            owners = dict(c.fetchall())
+            for item in check_ins:
+                habit_id, day = item.get('habitId'), item.get('date')
+                result = {'habitId': habit_id, 'date': day}
+                parsed = self.parse_date(day) if isinstance(day, str) else None
+                if habit_id not in owners or (user_id is not None and owners[habit_id] != user_id):
+                    result['error'] = "Habit not found"
+                elif parsed is None:
+                    result['error'] = "Invalid date format"
+                elif parsed > latest:
+                    result['error'] = "Date is in the future"
+                else:
+                    pending.append((parsed.strftime('%Y-%m-%d'), habit_id, result))
+                results.append(result)
+            # Oldest first, so each habit's days arrive in order and the streak trigger
+            # takes its O(1) path instead of recomputing the habit for every backfilled day
+            for day, habit_id, result in sorted(pending, key=lambda p: p[:2]):
+                c.execute('INSERT OR IGNORE INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                          (habit_id, day))
+                result['status'] = 'recorded' if c.rowcount == 1 else 'duplicate'
+            conn.commit()
+        return results, self._stored_streaks({habit_id for _, habit_id, _ in pending})
+
+    def _stored_streaks(self, habit_ids):
+        habit_ids = list(habit_ids)
         with self._get_conn() as conn:
             c = conn.cursor()
-            c.execute('SELECT completionDate FROM habit_completions WHERE habitId=? ORDER BY completionDate DESC',
+            c.execute(f'SELECT habitId, {", ".join(STREAK_FIELDS)} FROM habits '
+                      f'WHERE habitId IN ({", ".join("?" * len(habit_ids))})', habit_ids)
+            rows = c.fetchall()
+        yesterday = self._yesterday()
+        return {row['habitId']: self._expire_streak({field: row[field] for field in STREAK_FIELDS}, yesterday)
+                for row in rows}
+
+    def streak_info(self, habit_id):
+        """
+        Stored streak of a habit: {'currentStreak', 'longestStreak', 'lastCompletionDate'},
+        or None if the habit does not exist. A run that did not reach today or yesterday
+        is broken, so its current streak reads as 0.
+        """
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute('SELECT currentStreak, longestStreak, lastCompletionDate FROM habits WHERE habitId=?',
                       (habit_id,))
+            row = c.fetchone()
+        if not row:
+            return None
+        return self._expire_streak(dict(row), self._yesterday())
+
+    def _yesterday(self):
+        return (datetime.utcnow().date() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def _expire_streak(self, info, yesterday):
+        if not info['lastCompletionDate'] or info['lastCompletionDate'] < yesterday:
+            info['currentStreak'] = 0
+        return info
+
+    def habit_streak(self, habit_id):
+        info = self.streak_info(habit_id)
+        return info['currentStreak'] if info else 0
+
+    def compute_streaks(self, user_id):
+        """
+        Streaks of all a user's habits recomputed from habit_completions in one query,
+        as {habitId: {'currentStreak', 'longestStreak', 'lastCompletionDate'}}.
+        """
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute(habit_streaks_query('h.userId = ?'), (user_id, user_id))
             rows = c.fetchall()
-        if not rows:
-            return 0
-        today = datetime.utcnow().date()
-        streak = 0
-        prev_date = None
-        for (date_str,) in rows:
-            d = datetime.strptime(date_str, '%Y-%m-%d').date()
-            if prev_date is None:
-                if d == today or d == today - timedelta(days=1):
-                    streak = 1
-                else:
-                    break
-            else:
-                if (prev_date - d).days == 1:
-                    streak += 1
-                else:
-                    break
-            prev_date = d
-        return streak
+        yesterday = self._yesterday()
+        return {row['habitId']: self._expire_streak({field: row[field] for field in STREAK_FIELDS}, yesterday)
+                for row in rows}
+
+    def _calendars(self, habit_id, first_year, last_year):
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute(f'SELECT year, {", ".join(calendar.WORD_COLUMNS)} FROM habit_calendar '
+                      'WHERE habitId=? AND year BETWEEN ? AND ?', (habit_id, first_year, last_year))
+            return {row[0]: calendar.join_words(row[1:]) for row in c.fetchall()}
+
+    def completion_calendar(self, habit_id, year):
+        """Bitmap of the habit's completed days in year (bit 0 is January 1st)."""
+        return self._calendars(habit_id, year, year).get(year, 0)
+
+    def completed_days(self, habit_id, start, end):
+        """Number of distinct days from start to end (dates, inclusive) with a completion."""
+        bitmaps = self._calendars(habit_id, start.year, end.year)
+        total = 0
+        for year, bitmap in bitmaps.items():
+            first = calendar.day_index(start) if year == start.year else 0
+            last = calendar.day_index(end) if year == end.year else calendar.days_in_year(year) - 1
+            total += calendar.count_days(bitmap & calendar.range_mask(first, last))
+        return total
+
+    def completion_rate(self, habit_id, window_days=30, end_date=None):
+        """Share of the window_days days ending at end_date (default today) with a completion."""
+        if not isinstance(window_days, int) or window_days < 1:
+            raise ValueError("Invalid window")
+        end = self.parse_date(end_date) if end_date else datetime.utcnow().date()
+        if end is None:
+            raise ValueError("Invalid date format")
+        start = end - timedelta(days=window_days - 1)
+        return self.completed_days(habit_id, start, end) / window_days
+
+    def analytics(self, user_id, as_of=None):
+        """
+        Completion rates over the last 7/30/90 days, best weekday and completion trend (last
+        90 days), and current/longest streak, per habit and per category. A new completion
+        gets a new completionId, so the cache key includes the highest one; writes through
+        this model that do not add a completion invalidate it.
+        """
+        if as_of is not None and self.parse_date(as_of) is None:
+            raise ValueError("Invalid asOf format")
+        as_of = as_of or datetime.utcnow().date().strftime('%Y-%m-%d')
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute('SELECT MAX(completionId) FROM habit_completions')
+            last_completion_id = c.fetchone()[0]
+        key = ('habit_analytics', user_id, as_of, last_completion_id)
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            return cached
+        generation = self.cache.generation
+        summary = self._analytics(user_id, as_of)
+        self.cache.put(key, summary, generation)
+        return summary
+
+    def invalidate_analytics(self):
+        self.cache.invalidate(lambda key: key[0] == 'habit_analytics')
+
+    def _analytics(self, user_id, as_of):
+        horizon = max(ANALYTICS_WINDOWS)
+        windows = ', '.join(f"COUNT(CASE WHEN c.completionDate > date(:asOf, '-{w} days') THEN 1 END) AS done{w}"
+                            for w in ANALYTICS_WINDOWS)
+        weekdays = ', '.join(f"COUNT(CASE WHEN strftime('%w', c.completionDate) = '{d}' THEN 1 END) AS wd{d}"
+                             for d in range(len(WEEKDAYS)))
+        # One pass over the user's completions in the longest window. A habit's history starts
+        # at its startDate (or creation), or at an earlier backfilled completion.
+        query = f'''
+            SELECT h.habitId, h.habitName, h.category, h.currentStreak, h.longestStreak, h.lastCompletionDate,
+                   julianday(:asOf) - julianday(COALESCE(MIN(date(COALESCE(h.startDate, h.created_at)),
+                                                             MIN(c.completionDate)),
+                                                         date(COALESCE(h.startDate, h.created_at, :asOf)))) + 1
+                       AS historyDays,
+                   {windows}, {weekdays},
+                   TOTAL(julianday(c.completionDate) - julianday(:asOf, '-{horizon - 1} days')) AS sumDay
+            FROM habits h
+            LEFT JOIN habit_completions c
+              ON c.habitId = h.habitId
+             AND c.completionDate > date(:asOf, '-{horizon} days') AND c.completionDate <= :asOf
+            WHERE h.userId = :userId
+            GROUP BY h.habitName  -- unique per user, and walks the (userId, habitName) index in order
+            ORDER BY h.habitName
+        '''
+        with self._get_conn() as conn:
+            c = conn.cursor()
+            c.execute(query, {'userId': user_id, 'asOf': as_of})
+            rows = c.fetchall()
+        # Streaks are the stored ones, current as of today like streak_info()
+        yesterday = self._yesterday()
+        habits = [self._habit_analytics(row, horizon, yesterday) for row in rows]
+        categories = {}
+        for habit in habits:
+            categories.setdefault(habit['category'], []).append(habit)
+        return {
+            'asOf': as_of,
+            'habits': [{k: v for k, v in habit.items() if not k.startswith('_')} for habit in habits],
+            'categories': [self._category_analytics(category, members)
+                           for category, members in sorted(categories.items(), key=lambda item: str(item[0]))]
+        }
+
+    def _habit_analytics(self, row, horizon, yesterday):
+        history = max(0, int(row['historyDays'] or 0))
+        done = {w: row[f'done{w}'] for w in ANALYTICS_WINDOWS}
+        days = {w: min(w, history) for w in ANALYTICS_WINDOWS}
+        weekday_counts = [row[f'wd{d}'] for d in range(len(WEEKDAYS))]
+        # Least-squares slope of completed (1) / missed (0) per day over the habit's last n
+        # days, from the count and the sum of day positions; scaled to change per week
+        n, count = days[horizon], done[horizon]
+        trend = None
+        if n >= 2:
+            sum_x = row['sumDay'] - count * (horizon - n)
+            mean_x = (n - 1) / 2
+            sxx = n * (n * n - 1) / 12
+            trend = round(7 * (sum_x - mean_x * count) / sxx, 4)
+        info = self._expire_streak({field: row[field] for field in STREAK_FIELDS}, yesterday)
+        return {
+            'habitId': row['habitId'],
+            'habitName': row['habitName'],
+            'category': row['category'],
+            'completionRate': {f'{w}d': round(done[w] / days[w], 4) if days[w] else None for w in ANALYTICS_WINDOWS},
+            'bestWeekday': self._best_weekday(weekday_counts),
+            'currentStreak': info['currentStreak'],
+            'longestStreak': info['longestStreak'],
+            'trend': trend,
+            '_done': done,
+            '_days': days,
+            '_weekdays': weekday_counts,
+        }
+
+    def _category_analytics(self, category, habits):
+        rates = {}
+        for w in ANALYTICS_WINDOWS:
+            days = sum(h['_days'][w] for h in habits)
+            rates[f'{w}d'] = round(sum(h['_done'][w] for h in habits) / days, 4) if days else None
+        trends = [h['trend'] for h in habits if h['trend'] is not None]
+        return {
+            'category': category,
+            'habits': len(habits),
+            'completionRate': rates,
+            'bestWeekday': self._best_weekday([sum(counts) for counts in zip(*(h['_weekdays'] for h in habits))]),
+            'longestStreak': max(h['longestStreak'] for h in habits),
+            'trend': round(sum(trends) / len(trends), 4) if trends else None,
+        }
+
+    def _best_weekday(self, counts):
+        best = max(range(len(WEEKDAYS)), key=lambda d: counts[d])
+        return WEEKDAYS[best] if counts[best] else None
+
+    def rebuild_streaks(self, user_id=None):
+        """Recompute stored streaks (all habits, or one user's) from habit_completions; returns habits updated."""
+        with self._get_conn() as conn:
+            updated = rebuild_habit_streaks(conn, user_id)
+        self.invalidate_analytics()
+        return updated
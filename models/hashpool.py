@@ -0,0 +1,187 @@
+"""
+File: hashpool.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Bounded worker pool for bcrypt hashing and verification.
+    bcrypt is deliberately slow, so running it on request threads lets a burst of
+    logins occupy every worker. Hashes run in a process pool instead. At most
+    workers + max_queue jobs are admitted; beyond that callers get HashPoolBusy
+    at once (a 503) instead of queueing without limit. Counts admitted, rejected
+    and failed jobs and times queue wait and hash time.
+
+Configuration (environment):
+    ARCADIA_HASH_WORKERS    worker processes (default: CPU count, at most 4; 0 hashes inline)
+    ARCADIA_HASH_QUEUE      jobs admitted beyond the workers (default: 4 per worker)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from multiprocessing import get_context
+import bcrypt
+
+WORKERS_ENV_VAR = 'ARCADIA_HASH_WORKERS'
+QUEUE_ENV_VAR = 'ARCADIA_HASH_QUEUE'
+DEFAULT_MAX_WORKERS = 4
+QUEUE_PER_WORKER = 4
+RESULT_TIMEOUT = 30
+
+
+class HashPoolBusy(Exception):
+    """Raised when the pool already holds its maximum number of jobs."""
+    pass
+
+
+def _run(op, password, hashed=None):
+    """Worker entry point: returns (result, wall-clock start, seconds spent hashing)."""
+    started = time.time()
+    if op == 'hash':
+        result = bcrypt.hashpw(password, bcrypt.gensalt())
+    else:
+        result = bcrypt.checkpw(password, hashed)
+    return result, started, time.time() - started
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def stats(self):
+        return {
+            'avgMs': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'maxMs': round(self.max * 1000, 2),
+        }
+
+
+class HashPool:
+    def __init__(self, workers=None, max_queue=None, timeout=RESULT_TIMEOUT):
+        if workers is None:
+            workers = int(os.environ.get(WORKERS_ENV_VAR, min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)))
+        if max_queue is None:
+            max_queue = int(os.environ.get(QUEUE_ENV_VAR, QUEUE_PER_WORKER * max(workers, 1)))
+        if workers < 0 or max_queue < 0:
+            raise ValueError("workers and max_queue must not be negative")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.capacity = max(workers, 1) + max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.in_flight = 0
+        self._queue_wait = _Timing()
+        self._hash_time = _Timing()
+
+    def _get_executor(self):
+        # Started on first use; spawned workers do not inherit the server's threads or sockets
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'))
+            return self._executor
+
+    def hash(self, password):
+        """bcrypt hash (bytes) of password (bytes) with a fresh salt."""
+        return self._submit('hash', password)
+
+    def verify(self, password, hashed):
+        """True if password (bytes) matches the bcrypt hash (bytes)."""
+        return self._submit('verify', password, hashed)
+
+    def _submit(self, op, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy("Too many password checks in progress, try again shortly")
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+        submitted = time.time()
+        abandoned = False
+        try:
+            if self.workers == 0:
+                result, started, seconds = _run(op, *args)
+            else:
+                future = self._get_executor().submit(_run, op, *args)
+                try:
+                    result, started, seconds = future.result(self.timeout)
+                except FutureTimeout:
+                    # The job still holds a worker or queue place: keep its slot until it is gone
+                    future.cancel()
+                    future.add_done_callback(lambda _: self._release())
+                    abandoned = True
+                    raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self._queue_wait.add(max(0.0, started - submitted))
+                self._hash_time.add(seconds)
+            return result
+        finally:
+            if not abandoned:
+                self._release()
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'inFlight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'queueWait': self._queue_wait.stats(),
+                'hashTime': self._hash_time.stats(),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_hash_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = HashPool()
+        return _default_pool
+
+
+def set_hash_pool(pool):
+    """Replace the process-wide pool (e.g. with a differently sized one); returns the old one."""
+    global _default_pool
+    with _default_lock:
+        old, _default_pool = _default_pool, pool
+        return old
+
+
+def shutdown_hash_pool():
+    old = set_hash_pool(None)
+    if old is not None:
+        old.shutdown()
@@ -9,6 +9,7 @@ Description:
 """
 
 import sqlite3
+from models.basemodel import BaseModel
 from datetime import datetime, timedelta
 
 DB_PATH = "arcadia.db"
@@ -19,15 +20,10 @@ ALLOWED_CONFIGS = {
 }
 MAX_STREAK = 5
 
-class PomodoroModel:
+class PomodoroModel(BaseModel):
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
 
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
     def is_valid_config(self, config: str) -> bool:
         return config in ALLOWED_CONFIGS
 
@@ -0,0 +1,209 @@
+"""
+File: ratelimiter.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Token-bucket rate limiter for login and registration.
+    Every attempt takes a token from the caller's IP bucket and from the
+    username's bucket; buckets refill at a steady rate up to their burst size.
+    check() runs before any bcrypt work and raises RateLimited (a 429) when a
+    bucket is empty, without charging the other one, so a credential-stuffing
+    burst costs a dictionary lookup per attempt instead of a hash.
+    Buckets live in memory, ordered by last use, so checks are O(1) and buckets
+    that have refilled are evicted from the front every EVICT_INTERVAL seconds.
+    In 'sqlite' mode the buckets are also kept in auth_rate_limits (migration
+    v15) so every worker process shares them; an attempt this worker's own
+    bucket already rejects is still answered from memory.
+
+Configuration (environment):
+    ARCADIA_RATE_LIMIT             memory, sqlite (shared by worker processes) or off (default: memory)
+    ARCADIA_RATE_LIMIT_IP          attempts per IP as <burst>/<seconds> (default: 20/60)
+    ARCADIA_RATE_LIMIT_USERNAME    attempts per username as <burst>/<seconds> (default: 5/60)
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from models.basemodel import BaseModel
+
+DB_PATH = 'arcadia.db'
+MODE_ENV_VAR = 'ARCADIA_RATE_LIMIT'
+MODES = ('memory', 'sqlite', 'off')
+# limit name -> (environment variable, default <burst>/<seconds>)
+LIMITS = {
+    'ip': ('ARCADIA_RATE_LIMIT_IP', '20/60'),
+    'username': ('ARCADIA_RATE_LIMIT_USERNAME', '5/60'),
+}
+# Seconds between evictions of refilled buckets
+EVICT_INTERVAL = 10.0
+# Buckets kept per limit; past this the least recently used is dropped (treated as full)
+MAX_BUCKETS = 100000
+
+# Takes a token only if the refilled bucket has one; rowcount 0 means the attempt is rejected
+TAKE_SQL = '''
+    INSERT INTO auth_rate_limits (bucketKey, tokens, updatedAt, fullAt)
+    VALUES (:key, :burst - 1, :now, :now + 1.0 / :rate)
+    ON CONFLICT(bucketKey) DO UPDATE SET
+        tokens = MIN(:burst, tokens + (:now - updatedAt) * :rate) - 1,
+        updatedAt = :now,
+        fullAt = :now + (:burst - MIN(:burst, tokens + (:now - updatedAt) * :rate) + 1) / :rate
+    WHERE MIN(:burst, tokens + (:now - updatedAt) * :rate) >= 1
+'''
+
+
+class RateLimited(Exception):
+    """Raised when an attempt finds its bucket empty; retry_after is the seconds until a token is back."""
+
+    def __init__(self, limit, retry_after):
+        super().__init__(f'Too many attempts. Try again in {math.ceil(retry_after)} seconds.')
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def parse_limit(value):
+    """'<burst>/<seconds>' -> (burst, tokens per second)."""
+    burst, _, seconds = str(value).partition('/')
+    burst, seconds = int(burst), float(seconds)
+    if burst < 1 or seconds <= 0:
+        raise ValueError(f'Invalid rate limit {value!r}; expected <burst>/<seconds>.')
+    return burst, burst / seconds
+
+
+class _Buckets:
+    """One limit's in-memory buckets: key -> [tokens, updated], least recently used first."""
+
+    def __init__(self, burst, rate, max_buckets):
+        self.burst = burst
+        self.rate = rate
+        self.max_buckets = max_buckets
+        # A bucket untouched this long has refilled and can be forgotten
+        self.idle_after = burst / rate
+        self.buckets = OrderedDict()
+        self.evicted = 0
+
+    def _refilled(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        return min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def wait(self, key, now):
+        """Seconds until key has a token; 0 if it has one now."""
+        tokens = self._refilled(key, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def set(self, key, tokens, now):
+        self.buckets[key] = [tokens, now]
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_buckets:
+            self.buckets.popitem(last=False)
+            self.evicted += 1
+
+    def take(self, key, now):
+        self.set(key, self._refilled(key, now) - 1, now)
+
+    def evict(self, now):
+        while self.buckets:
+            key, (_, updated) = next(iter(self.buckets.items()))
+            if now - updated < self.idle_after:
+                break
+            del self.buckets[key]
+            self.evicted += 1
+
+
+class RateLimiter(BaseModel):
+    row_factory = None
+
+    def __init__(self, db_path=DB_PATH, mode=None, limits=None, max_buckets=MAX_BUCKETS):
+        self.db_path = db_path
+        if mode is None:
+            mode = os.environ.get(MODE_ENV_VAR, 'memory')
+        if mode not in MODES:
+            raise ValueError(f'Unknown rate limit mode {mode!r}; expected one of {MODES}.')
+        self.mode = mode
+        limits = dict(limits or {})
+        self._limits = {}
+        for name, (env_var, default) in LIMITS.items():
+            burst, rate = parse_limit(limits.get(name) or os.environ.get(env_var, default))
+            self._limits[name] = _Buckets(burst, rate, max_buckets)
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+        self.allowed = 0
+        self.rejected = {name: 0 for name in LIMITS}
+        self.db_checks = 0
+
+    def check(self, ip, username=None):
+        """
+        Take one attempt from ip's and username's buckets; RateLimited if either is empty.
+        A rejected attempt is charged to neither bucket.
+        """
+        if self.mode == 'off':
+            return
+        keys = [('ip', f'ip:{ip}')]
+        if username:
+            keys.append(('username', f'user:{str(username).strip().lower()}'))
+        now = time.time()
+        with self._lock:
+            if time.monotonic() - self._last_evict >= EVICT_INTERVAL:
+                for buckets in self._limits.values():
+                    buckets.evict(now)
+                self._last_evict = time.monotonic()
+            # Every bucket is checked before any is charged, so a username that is locked out
+            # does not also drain its caller's IP bucket
+            for name, key in keys:
+                wait = self._limits[name].wait(key, now)
+                if wait:
+                    self.rejected[name] += 1
+                    raise RateLimited(name, wait)
+            if self.mode == 'memory':
+                for name, key in keys:
+                    self._limits[name].take(key, now)
+                self.allowed += 1
+                return
+        # This worker's buckets have tokens; other workers may have used the shared ones
+        self._take_shared(keys, now)
+        with self._lock:
+            self.allowed += 1
+
+    def _take_shared(self, keys, now):
+        """Take from every shared bucket in one savepoint, rolled back if any of them is empty."""
+        rejected = None
+        with self._get_conn() as conn:
+            conn.execute('SAVEPOINT rate_limit')
+            for name, key in keys:
+                limit = self._limits[name]
+                params = {'key': key, 'burst': limit.burst, 'rate': limit.rate, 'now': now}
+                if not conn.execute(TAKE_SQL, params).rowcount:
+                    conn.execute('ROLLBACK TO rate_limit')
+                    tokens, updated = conn.execute('SELECT tokens, updatedAt FROM auth_rate_limits '
+                                                   'WHERE bucketKey = ?', (key,)).fetchone()
+                    rejected = name, key, tokens, updated
+                    break
+            conn.execute('RELEASE rate_limit')
+        with self._lock:
+            self.db_checks += 1
+            if rejected is None:
+                for name, key in keys:
+                    self._limits[name].take(key, now)
+                return
+            name, key, tokens, updated = rejected
+            limit = self._limits[name]
+            # Mirror the shared bucket so this worker rejects the next attempts from memory
+            limit.set(key, min(limit.burst, tokens + (now - updated) * limit.rate), now)
+            wait = limit.wait(key, now)
+            self.rejected[name] += 1
+        raise RateLimited(name, wait)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'allowed': self.allowed,
+                'rejected': dict(self.rejected),
+                'dbChecks': self.db_checks,
+                'limits': {name: {'burst': limit.burst, 'perSecond': round(limit.rate, 4),
+                                  'buckets': len(limit.buckets), 'evicted': limit.evicted}
+                           for name, limit in self._limits.items()},
+            }
@@ -7,6 +7,7 @@ Description:
 """
 
 import sqlite3
+from models.basemodel import BaseModel
 from fractions import Fraction
 
 DB_PATH = 'arcadia.db'
@@ -18,13 +19,12 @@ def format_fraction(value):
     except Exception:
         return str(value)
 
-class RecipeBoxModel:
+class RecipeBoxModel(BaseModel):
+    row_factory = None
+
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
 
-    def _get_conn(self):
-        return sqlite3.connect(self.db_path, timeout=10)
-
     def add_recipe(self, title, instructions=None, categoryId=None, subcategoryId=None, stickerId=None, measurement=None):
         if not title or str(title).strip() == "":
             raise ValueError("Recipe title required")
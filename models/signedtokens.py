@@ -0,0 +1,265 @@
+"""
+File: signedtokens.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    HMAC-signed, self-describing session tokens that validate without a query.
+    A token reads s1.<userId>.<issuedMs>.<expiresEpoch>.<keyId>.<tokenId>.<signature>,
+    where the signature is HMAC-SHA256 of everything before it under signing key
+    keyId (auth_signing_keys, migration v14). The newest key signs and is replaced
+    every KEY_ROTATION seconds; a retired key still verifies until every token it
+    could have signed has expired.
+    Revocations live in auth_token_denylist: a row per logged-out token, or a
+    per-user cutoff ("issued before") written by every new login. Each process
+    keeps the unexpired entries in memory and polls for new rows at most once
+    every DENYLIST_SYNC_INTERVAL seconds.
+
+Configuration (environment):
+    ARCADIA_TOKEN_KEY_ROTATION    seconds a signing key signs new tokens (default: 7 days)
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from models.basemodel import BaseModel
+
+DB_PATH = 'arcadia.db'
+PREFIX = 's1.'
+KEY_ROTATION_ENV_VAR = 'ARCADIA_TOKEN_KEY_ROTATION'
+DEFAULT_KEY_ROTATION = 7 * 24 * 3600
+DENYLIST_SYNC_INTERVAL = 1.0
+# Only ids up to this far past the newest known key can be keys another process just created;
+# each such id reloads auth_signing_keys at most once per KEY_RELOAD_INTERVAL (and all of them
+# at most NEW_KEY_WINDOW times), so forged ids cannot turn validation into a query per request
+NEW_KEY_WINDOW = 2
+KEY_RELOAD_INTERVAL = 1.0
+# Seconds between sweeps of expired deny-list entries out of memory
+COMPACT_INTERVAL = 60.0
+
+
+def _sign(mac, body):
+    """Signature of body under mac, an HMAC already keyed with the signing secret."""
+    mac = mac.copy()
+    mac.update(body.encode())
+    return base64.urlsafe_b64encode(mac.digest()).rstrip(b'=').decode('ascii')
+
+
+def parse(token):
+    """(body, userId, issuedMs, expiresEpoch, keyId, tokenId, signature); ValueError if malformed."""
+    if not token.startswith(PREFIX):
+        raise ValueError('Not a signed token.')
+    body, signature = token.rsplit('.', 1)
+    user_id, issued_ms, expires_epoch, key_id, token_id = body[len(PREFIX):].split('.')
+    return body, int(user_id), int(issued_ms), int(expires_epoch), int(key_id), token_id, signature
+
+
+class SignedTokens(BaseModel):
+    row_factory = None
+
+    def __init__(self, db_path=DB_PATH, max_lifetime=14 * 24 * 3600, key_rotation=None):
+        self.db_path = db_path
+        # Longest lifetime of any token issued; bounds how long keys and cutoffs are kept
+        self.max_lifetime = int(max_lifetime)
+        if key_rotation is None:
+            key_rotation = int(os.environ.get(KEY_ROTATION_ENV_VAR, DEFAULT_KEY_ROTATION))
+        self.key_rotation = key_rotation
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._keys = {}  # keyId -> (keyed HMAC, createdAt, retiredAt or None)
+        self._keys_loaded = None
+        self._key_reloads = {}  # unknown keyId -> when it last caused a reload
+        self._denied_tokens = {}  # tokenId -> expiresEpoch
+        self._user_cutoffs = {}  # userId -> (issuedBefore ms, expiresEpoch)
+        self._last_entry = None
+        self._last_sync = 0.0
+        self._last_compact = time.monotonic()
+        self.verified = 0
+        self.rejected = 0
+
+    @staticmethod
+    def owns(token):
+        return isinstance(token, str) and token.startswith(PREFIX)
+
+    def issue(self, user_id, expires_epoch):
+        """
+        New token for user_id. Like an opaque login it ends the user's other sessions:
+        a cutoff revokes every signed token issued to them before this one.
+        """
+        issued_ms = int(time.time() * 1000)
+        cutoff_expires = int(time.time()) + self.max_lifetime
+        with self._get_conn() as conn:
+            key_id, mac = self._signing_key(conn)
+            conn.execute('INSERT INTO auth_token_denylist (userId, issuedBefore, expiresEpoch) VALUES (?, ?, ?)',
+                         (user_id, issued_ms, cutoff_expires))
+        with self._lock:
+            self._deny_user(user_id, issued_ms, cutoff_expires)
+        body = f"{PREFIX}{user_id}.{issued_ms}.{int(expires_epoch)}.{key_id}.{secrets.token_urlsafe(9)}"
+        return f"{body}.{_sign(mac, body)}"
+
+    def verify(self, token):
+        """userId of a valid token; ValueError naming the reason otherwise."""
+        try:
+            try:
+                body, user_id, issued_ms, expires_epoch, key_id, token_id, signature = parse(token)
+            except ValueError:
+                raise ValueError('Invalid or expired token.')
+            mac = self._verification_key(key_id)
+            if mac is None or not hmac.compare_digest(signature, _sign(mac, body)):
+                raise ValueError('Invalid or expired token.')
+            if time.time() > expires_epoch:
+                raise ValueError('Token expired.')
+            self._sync_denylist()
+            with self._lock:
+                cutoff = self._user_cutoffs.get(user_id)
+                if token_id in self._denied_tokens or (cutoff is not None and issued_ms < cutoff[0]):
+                    raise ValueError('Invalid or expired token.')
+                self.verified += 1
+            return user_id
+        except ValueError:
+            with self._lock:
+                self.rejected += 1
+            raise
+
+    def revoke(self, token):
+        """Deny-list one token until it expires. Tokens that are already invalid are ignored."""
+        try:
+            user_id = self.verify(token)
+        except ValueError:
+            return False
+        _, _, _, expires_epoch, _, token_id, _ = parse(token)
+        with self._get_conn() as conn:
+            conn.execute('INSERT INTO auth_token_denylist (tokenId, userId, expiresEpoch) VALUES (?, ?, ?)',
+                         (token_id, user_id, expires_epoch))
+        with self._lock:
+            self._denied_tokens[token_id] = expires_epoch
+        return True
+
+    def rotate_key(self, conn=None):
+        """Start signing with a fresh key; returns its id."""
+        if conn is None:
+            with self._get_conn() as conn:
+                return self.rotate_key(conn)
+        now = int(time.time())
+        key_id = conn.execute('INSERT INTO auth_signing_keys (secret, createdAt) VALUES (?, ?)',
+                              (secrets.token_bytes(32), now)).lastrowid
+        conn.execute('UPDATE auth_signing_keys SET retiredAt = ? WHERE keyId < ? AND retiredAt IS NULL',
+                     (now, key_id))
+        # Every token a key retired this long ago signed has expired
+        conn.execute('DELETE FROM auth_signing_keys WHERE keyId < ? AND retiredAt < ?',
+                     (key_id, now - self.max_lifetime))
+        self._load_keys(conn)
+        return key_id
+
+    def _load_keys(self, conn):
+        rows = conn.execute('SELECT keyId, secret, createdAt, retiredAt FROM auth_signing_keys').fetchall()
+        with self._lock:
+            self._keys = {key_id: (hmac.new(bytes(secret), digestmod=hashlib.sha256), created, retired)
+                          for key_id, secret, created, retired in rows}
+            self._keys_loaded = time.monotonic()
+
+    def _active_key(self):
+        with self._lock:
+            active = [key_id for key_id, key in self._keys.items() if key[2] is None]
+            if not active:
+                return None
+            key_id = max(active)
+            mac, created, _ = self._keys[key_id]
+        return (key_id, mac) if time.time() - created < self.key_rotation else None
+
+    def _signing_key(self, conn):
+        key = self._active_key()
+        if key is None:
+            # Another process may already have rotated
+            self._load_keys(conn)
+            key = self._active_key()
+        if key is None:
+            self.rotate_key(conn)
+            key = self._active_key()
+        return key
+
+    def _verification_key(self, key_id):
+        # _load_keys swaps in a whole new dict, so the common case needs no lock
+        key = self._keys.get(key_id)
+        if key is None:
+            with self._lock:
+                newest = max(self._keys, default=0)
+                now = time.monotonic()
+                self._key_reloads = {seen: when for seen, when in self._key_reloads.items()
+                                     if now - when < KEY_RELOAD_INTERVAL}
+                # At most NEW_KEY_WINDOW reloads per interval, whichever ids are sent
+                reload = self._keys_loaded is None or (
+                    newest < key_id <= newest + NEW_KEY_WINDOW
+                    and key_id not in self._key_reloads and len(self._key_reloads) < NEW_KEY_WINDOW)
+                if reload:
+                    self._key_reloads[key_id] = now
+        else:
+            reload = False
+        if reload:
+            with self._get_conn() as conn:
+                self._load_keys(conn)
+            with self._lock:
+                key = self._keys.get(key_id)
+        if key is None:
+            return None
+        mac, _, retired = key
+        if retired is not None and time.time() > retired + self.max_lifetime:
+            return None
+        return mac
+
+    def _deny_user(self, user_id, issued_before, expires_epoch):
+        current = self._user_cutoffs.get(user_id)
+        if current is None or current[0] < issued_before:
+            self._user_cutoffs[user_id] = (issued_before, expires_epoch)
+
+    def _sync_denylist(self):
+        """Load deny-list rows written since the last poll, by any process."""
+        if time.monotonic() - self._last_sync < DENYLIST_SYNC_INTERVAL:
+            return
+        with self._sync_lock:
+            if time.monotonic() - self._last_sync < DENYLIST_SYNC_INTERVAL:
+                return
+            with self._get_conn() as conn:
+                if self._last_entry is None:
+                    last = conn.execute('SELECT COALESCE(MAX(entryId), 0) FROM auth_token_denylist').fetchone()[0]
+                    rows = conn.execute('SELECT entryId, tokenId, userId, issuedBefore, expiresEpoch '
+                                        'FROM auth_token_denylist WHERE expiresEpoch >= ? AND entryId <= ?',
+                                        (int(time.time()), last)).fetchall()
+                    self._last_entry = last
+                else:
+                    rows = conn.execute('SELECT entryId, tokenId, userId, issuedBefore, expiresEpoch '
+                                        'FROM auth_token_denylist WHERE entryId > ? ORDER BY entryId',
+                                        (self._last_entry,)).fetchall()
+                    if rows:
+                        self._last_entry = rows[-1][0]
+            with self._lock:
+                for _, token_id, user_id, issued_before, expires_epoch in rows:
+                    if token_id is not None:
+                        self._denied_tokens[token_id] = expires_epoch
+                    else:
+                        self._deny_user(user_id, issued_before, expires_epoch)
+                if time.monotonic() - self._last_compact >= COMPACT_INTERVAL:
+                    self._compact()
+            self._last_sync = time.monotonic()
+
+    def _compact(self):
+        # Entries outlive nothing once the tokens they cover have expired
+        now = time.time()
+        self._denied_tokens = {k: v for k, v in self._denied_tokens.items() if v >= now}
+        self._user_cutoffs = {k: v for k, v in self._user_cutoffs.items() if v[1] >= now}
+        self._last_compact = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            active = [key_id for key_id, key in self._keys.items() if key[2] is None]
+            return {
+                'keys': len(self._keys),
+                'activeKeyId': max(active) if active else None,
+                'deniedTokens': len(self._denied_tokens),
+                'userCutoffs': len(self._user_cutoffs),
+                'verified': self.verified,
+                'rejected': self.rejected,
+            }
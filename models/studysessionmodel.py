@@ -9,17 +9,16 @@ Description:
 
 
 import sqlite3
+from models.basemodel import BaseModel
 from datetime import datetime, timedelta
 
 
 DB_PATH = "arcadia.db"
 
 
-class StudySessionModel:
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_PATH)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+class StudySessionModel(BaseModel):
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
 
 
     def log_session(self, user_id:int, start_time:str, end_time:str, pomodoro_setting:str) -> bool:
@@ -34,14 +33,16 @@ class StudySessionModel:
             if duration <= 0:
                 print("Error logging session: End time before start time")
                 return False
-            streak = self._calculate_streak(user_id, end_time)
-            xp_earned = self._calculate_xp(duration, streak)
-            self.cursor.execute("""
-            INSERT INTO study_sessions (userId, startTime, endTime, duration, streakTimer, xpEarned, pomodoroSetting)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, start_time, end_time, duration, streak, xp_earned, pomodoro_setting))
-            self.conn.commit()
-            self._update_user_rewards(user_id, xp_earned)
+            with self._get_conn() as conn:
+                cursor = conn.cursor()
+                streak = self._calculate_streak(cursor, user_id, end_time)
+                xp_earned = self._calculate_xp(duration, streak)
+                cursor.execute("""
+                INSERT INTO study_sessions (userId, startTime, endTime, duration, streakTimer, xpEarned, pomodoroSetting)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, start_time, end_time, duration, streak, xp_earned, pomodoro_setting))
+                self._update_user_rewards(cursor, user_id, xp_earned)
+                conn.commit()
             return True
         except Exception as e:
             print(f"Error logging session: {e}")
@@ -56,18 +57,18 @@ class StudySessionModel:
         return int((et - st).total_seconds() // 60)
 
 
-    def _calculate_streak(self, user_id:int, current_end_time:str) -> int:
+    def _calculate_streak(self, cursor, user_id:int, current_end_time:str) -> int:
         """Calculate the streakTimer (0-5) based on last sessions."""
         fmt = "%Y-%m-%d %H:%M:%S"
         current_time = datetime.strptime(current_end_time, fmt)
 
 
-        self.cursor.execute("""
+        cursor.execute("""
             SELECT endTime, streakTimer FROM study_sessions
             WHERE userId = ?
             ORDER BY endTime DESC LIMIT 1
         """, (user_id,))
-        row = self.cursor.fetchone()
+        row = cursor.fetchone()
 
 
         if row:
@@ -90,19 +91,18 @@ class StudySessionModel:
         return base_xp + streak_bonus
 
 
-    def _update_user_rewards(self, user_id:int, xp:int):
+    def _update_user_rewards(self, cursor, user_id:int, xp:int):
         """Update user's XP and glitter currency based on session."""
         # Glitter awarded every streak of 5
         glitter_reward = 10 if xp >= 50 else 0
 
 
         upd_xp = "UPDATE user SET xp = xp + ? WHERE userId = ?"
-        self.cursor.execute(upd_xp, (xp, user_id))
+        cursor.execute(upd_xp, (xp, user_id))
         if glitter_reward > 0:
             upd_glitter = "UPDATE user SET glitter = glitter + ? WHERE userId = ?"
-            self.cursor.execute(upd_glitter, (glitter_reward, user_id))
-        self.conn.commit()
+            cursor.execute(upd_glitter, (glitter_reward, user_id))
 
 
     def close(self):
-        self.conn.close()
+        pass
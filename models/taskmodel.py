@@ -8,6 +8,7 @@ Description:
 """
 
 import sqlite3
+from models.basemodel import BaseModel
 from datetime import datetime
 
 DB_PATH = 'arcadia.db'
@@ -22,15 +23,10 @@ def valid_date(date_str):
     except ValueError:
         return False
 
-class TaskModel:
+class TaskModel(BaseModel):
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
 
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path, timeout=10)
-        conn.row_factory = sqlite3.Row
-        return conn
-
     def create_task(self, **data):
         errors = []
         if not data.get('title') or data['title'].strip() == '':
@@ -0,0 +1,98 @@
+"""
+File: tokensweeper.py
+Author: Allyson Taylor
+Date: 2026-10-18
+Description:
+    Background sweeper for expired and used tokens.
+    auth_tokens rows otherwise only go away on logout, re-login or a failed
+    validation, and password reset tokens never do. A daemon thread runs
+    database.maintenance.sweep_expired_tokens every interval seconds; the deletes
+    are index range deletes in small batches. Records rows reclaimed per run.
+
+Configuration (environment):
+    ARCADIA_TOKEN_SWEEP_INTERVAL    seconds between sweeps (default: 3600; 0 disables the thread)
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from database.maintenance import sweep_expired_tokens, SWEEP_BATCH_SIZE
+from models.basemodel import BaseModel
+
+DB_PATH = 'arcadia.db'
+INTERVAL_ENV_VAR = 'ARCADIA_TOKEN_SWEEP_INTERVAL'
+DEFAULT_INTERVAL = 3600
+# Seconds between batches, so request writers get the lock in between
+BATCH_PAUSE = 0.05
+
+
+class TokenSweeper(BaseModel):
+    def __init__(self, db_path=DB_PATH, interval=None, batch_size=SWEEP_BATCH_SIZE, pause=BATCH_PAUSE):
+        self.db_path = db_path
+        if interval is None:
+            interval = float(os.environ.get(INTERVAL_ENV_VAR, DEFAULT_INTERVAL))
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.total_reclaimed = 0
+        self.last_run = None
+
+    def sweep(self):
+        """Run one sweep now. Returns {table: rows deleted}."""
+        started = time.perf_counter()
+        try:
+            with self._get_conn() as conn:
+                reclaimed = sweep_expired_tokens(conn, batch_size=self.batch_size, pause=self.pause)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        with self._lock:
+            self.runs += 1
+            self.total_reclaimed += sum(reclaimed.values())
+            self.last_run = {
+                'at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                'reclaimed': reclaimed,
+                'ms': round((time.perf_counter() - started) * 1000, 2),
+            }
+        return reclaimed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(f'Token sweep failed: {e}')
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background thread; does nothing if the interval is 0 or it is already running."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='token-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'interval': self.interval,
+                'runs': self.runs,
+                'failures': self.failures,
+                'totalReclaimed': self.total_reclaimed,
+                'lastRun': self.last_run,
+            }
@@ -92,10 +92,29 @@ export async function habitCheckIn(habitId, jwtToken) {
   return request(`${BASE_URL_HABITS}/habits/${habitId}/check-in`, 'POST', null, jwtToken);
 }
 
+// checkIns: [{ habitId, date: 'YYYY-MM-DD' }], e.g. queued while offline
+export async function habitCheckInMany(checkIns, jwtToken) {
+  return request(`${BASE_URL_HABITS}/habits/check-ins`, 'POST', { checkIns }, jwtToken);
+}
+
 export async function habitStreak(habitId, jwtToken) {
   return request(`${BASE_URL_HABITS}/habits/${habitId}/streak`, 'GET', null, jwtToken);
 }
 
+export async function habitAnalytics(userId, jwtToken) {
+  return request(`${BASE_URL_HABITS}/habits/analytics?userId=${userId}`, 'GET', null, jwtToken);
+}
+
+export async function habitCalendar(habitId, year, jwtToken) {
+  return request(`${BASE_URL_HABITS}/habits/${habitId}/calendar?year=${year}`, 'GET', null, jwtToken);
+}
+
+// Expand a calendar bitmap into one boolean per day of the year (index 0 = Jan 1)
+export function decodeHabitCalendar({ bitmap, days }) {
+  const bytes = atob(bitmap);
+  return Array.from({ length: days }, (_, d) => ((bytes.charCodeAt(d >> 3) >> (d & 7)) & 1) === 1);
+}
+
 // --- Budget APIs ---
 export async function addTransaction(data, jwtToken) {
   return request(`${BASE_URL_BUDGET}/transactions`, 'POST', data, jwtToken);
@@ -109,8 +128,24 @@ export async function viewTransaction(transactionId, jwtToken) {
   return request(`${BASE_URL_BUDGET}/transactions/${transactionId}`, 'GET', null, jwtToken);
 }
 
-export async function listTransactions(jwtToken) {
-  return request(`${BASE_URL_BUDGET}/transactions`, 'GET', null, jwtToken);
+// One page of transactions, newest first; pass the previous page's nextCursor as params.cursor
+export async function listTransactionsPage(params, jwtToken) {
+  const query = new URLSearchParams(Object.entries(params || {}).filter(([, v]) => v != null)).toString();
+  return request(`${BASE_URL_BUDGET}/transactions${query ? `?${query}` : ''}`, 'GET', null, jwtToken);
+}
+
+// Every transaction matching params (userId, startDate, endDate, type, category, fields),
+// following nextCursor until the last page
+export async function listTransactions(jwtToken, params = {}) {
+  const transactions = [];
+  let cursor = null;
+  do {
+    const page = await listTransactionsPage({ limit: 500, ...params, cursor }, jwtToken);
+    if (!page.success) return page;
+    transactions.push(...page.transactions);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return { success: true, transactions, nextCursor: null };
 }
 
 export async function deleteTransaction(transactionId, jwtToken) {
@@ -5,9 +5,9 @@ Author: Allyson Taylor
 Last Modified: Nov 5, 2025
 """
 
-import bcrypt
 import re
 from database.db_manager import DatabaseManager
+from models.hashpool import get_hash_pool
 
 class AuthManager:
     def __init__(self, db_path='arcadia.db'):
@@ -17,13 +17,11 @@ class AuthManager:
 
     def hash_password(self, password: str) -> str:
         """Return a bcrypt hash of the plain password."""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        return get_hash_pool().hash(password.encode('utf-8')).decode('utf-8')
 
     def check_password(self, password: str, stored_hash: str) -> bool:
         """Return True if password matches the stored bcrypt hash."""
-        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+        return get_hash_pool().verify(password.encode('utf-8'), stored_hash.encode('utf-8'))
 
     def is_valid_username(self, username: str) -> bool:
         """Check if username is 3-40 chars and alphanumeric/underscore only."""
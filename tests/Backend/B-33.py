@@ -0,0 +1,92 @@
+# File: tests/Backend/B-33.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the shared SQLite connection pool.
+#   Verifies: Connections are reused, pool size is bounded, nested checkouts share a connection,
+#   failed blocks roll back, and models draw their connections from the pool.
+#   Test Case: B-33 connection pool
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import threading
+from database.connection_pool import ConnectionPool, PoolTimeout, get_pool, close_pool
+from models.recipeboxmodel import RecipeBoxModel
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE notes (noteId INTEGER PRIMARY KEY, body TEXT)")
+        db.execute("""CREATE TABLE recipes (
+            recipeId INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, instructions TEXT,
+            categoryId INTEGER, subcategoryId INTEGER, stickerId INTEGER, measurement REAL)""")
+    yield path
+    close_pool(path)
+
+def test_connections_are_reused(db_path):
+    pool = ConnectionPool(db_path, max_size=2)
+    with pool.connection() as first:
+        first.execute("INSERT INTO notes (body) VALUES ('a')")
+    with pool.connection() as second:
+        assert second is first
+        assert second.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 1
+    assert pool.stats()['created'] == 1
+    pool.close()
+
+def test_pool_is_bounded(db_path):
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.2)
+    errors = []
+    def other_thread():
+        try:
+            pool.acquire()
+        except PoolTimeout as e:
+            errors.append(e)
+    with pool.connection():
+        t = threading.Thread(target=other_thread)
+        t.start()
+        t.join()
+    assert len(errors) == 1
+    assert pool.stats()['size'] == 1
+    pool.close()
+
+def test_nested_checkout_shares_connection(db_path):
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.2)
+    with pool.connection() as outer:
+        with pool.connection(row_factory=sqlite3.Row) as inner:
+            assert inner is outer
+            assert inner.row_factory is sqlite3.Row
+        assert outer.row_factory is None
+    pool.close()
+
+def test_failed_block_rolls_back(db_path):
+    pool = ConnectionPool(db_path)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO notes (body) VALUES ('lost')")
+            raise ValueError("boom")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+    pool.close()
+
+def test_unhealthy_connection_is_replaced(db_path):
+    pool = ConnectionPool(db_path, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+    with pool.connection() as fresh:
+        assert fresh is not conn
+        fresh.execute("SELECT 1")
+    assert pool.stats()['discarded'] == 1
+    pool.close()
+
+def test_models_share_the_pool(db_path):
+    model = RecipeBoxModel(db_path=db_path)
+    recipe_id = model.add_recipe("Pool pancakes", measurement="1/2")
+    assert model.get_recipe(recipe_id)['measurement'] == "1/2"
+    assert RecipeBoxModel(db_path=db_path).pool is model.pool
+    assert get_pool(db_path).stats()['created'] == 1
@@ -0,0 +1,52 @@
+# File: tests/Backend/B-34.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for database storage profiles.
+#   Verifies: Pooled and DatabaseManager connections get the profile PRAGMAs,
+#   the profile can be picked from the environment, and bad names are rejected.
+#   Test Case: B-34 storage profiles
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+from database.connection_pool import ConnectionPool
+from database.db_manager import DatabaseManager
+from database.storage_profile import get_profile, PROFILE_ENV_VAR
+
+def pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+def test_pool_applies_balanced_profile(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    pool = ConnectionPool(str(tmp_path / "profile.db"))
+    with pool.connection() as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+        assert pragma(conn, "synchronous") == 1  # NORMAL
+        assert pragma(conn, "busy_timeout") == 10000
+        assert pragma(conn, "temp_store") == 2  # MEMORY
+    pool.close()
+
+def test_profile_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "durable")
+    pool = ConnectionPool(str(tmp_path / "durable.db"))
+    with pool.connection() as conn:
+        assert pragma(conn, "synchronous") == 2  # FULL
+        assert pragma(conn, "busy_timeout") == 15000
+    pool.close()
+
+def test_database_manager_applies_profile(tmp_path):
+    db = DatabaseManager(str(tmp_path / "manager.db"), profile="fast-ephemeral")
+    conn = db.connect()
+    assert pragma(conn, "journal_mode") == "memory"
+    assert pragma(conn, "synchronous") == 0  # OFF
+    db.disconnect()
+
+def test_overrides_and_unknown_profiles():
+    assert get_profile("balanced", cache_size=-2000)["cache_size"] == -2000
+    with pytest.raises(ValueError):
+        get_profile("turbo")
+    with pytest.raises(ValueError):
+        get_profile("balanced", page_size=8192)
@@ -0,0 +1,61 @@
+# File: tests/Backend/B-35.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the schema migration runner.
+#   Verifies: Fresh databases get every table and hot-query index, schema_version is tracked,
+#   re-running is a no-op, dry runs change nothing, and a failing version rolls back.
+#   Test Case: B-35 migrations
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner, Migration, MigrationError, MIGRATIONS, add_column
+
+def names(conn, kind):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type=?", (kind,))}
+
+@pytest.fixture
+def conn(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "migrate.db"))
+    yield db
+    db.close()
+
+def test_fresh_database_is_fully_migrated(conn):
+    applied = MigrationRunner(conn).migrate()
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+    tables = names(conn, "table")
+    for table in ["user", "tasks", "habits", "habit_completions", "transactions", "savings_goals",
+                  "savings_transactions", "auth_tokens", "user_inventory", "store_items", "study_sessions", "recipes"]:
+        assert table in tables
+    indexes = names(conn, "index")
+    assert "idx_habit_completions_habit_date" in indexes
+    assert "idx_study_sessions_user_end" in indexes
+    assert "idx_tasks_user_order" in indexes
+    assert "idx_savings_transactions_goal_time" in indexes
+    assert "idx_user_inventory_user_item" in indexes
+    assert MigrationRunner(conn).current_version() == MIGRATIONS[-1].version
+
+def test_rerun_and_dry_run_are_noops(conn):
+    runner = MigrationRunner(conn)
+    assert [m.version for m in runner.migrate(target=1)] == [1]
+    pending = runner.migrate(dry_run=True)
+    assert [m.version for m in pending] == [m.version for m in MIGRATIONS[1:]]
+    assert runner.current_version() == 1
+    assert "idx_tasks_user_order" not in names(conn, "index")
+    runner.migrate()
+    assert runner.migrate() == []
+
+def test_failed_migration_rolls_back(conn):
+    migrations = [
+        Migration(1, "notes", ["CREATE TABLE notes (noteId INTEGER PRIMARY KEY)"]),
+        Migration(2, "broken", [add_column("notes", "body", "TEXT"), "CREATE INDEX idx_bad ON notes(missing)"]),
+    ]
+    runner = MigrationRunner(conn, migrations)
+    with pytest.raises(MigrationError):
+        runner.migrate()
+    assert runner.current_version() == 1
+    assert "body" not in [r[1] for r in conn.execute("PRAGMA table_info(notes)")]
@@ -0,0 +1,62 @@
+# File: tests/Backend/B-36.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the EXPLAIN QUERY PLAN audit tool.
+#   Verifies: No hot model query scans a table with the current migrations, every scenario
+#   runs, and dropping the hot-query indexes or a scenario raising makes the audit fail.
+#   Test Case: B-36 query plan audit
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+from database import query_audit
+from database.migrations import MigrationRunner
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+def test_plan_analysis_flags_scans_and_sorts():
+    scans, sorts, suggestions = query_audit.analyze_plan(
+        "SELECT * FROM tasks WHERE userId=1 ORDER BY orderIndex",
+        ["SCAN tasks", "USE TEMP B-TREE FOR ORDER BY"])
+    assert scans == ["SCAN tasks"]
+    assert sorts == ["USE TEMP B-TREE FOR ORDER BY"]
+    assert suggestions == ["CREATE INDEX ON tasks(userId)"]
+    assert query_audit.analyze_plan("SELECT 1", ["SEARCH tasks USING INDEX idx (userId=?)"]) == ([], [], [])
+    # Scanning a CTE the plan built itself is not a table scan
+    assert query_audit.analyze_plan("WITH days AS (SELECT 1) SELECT * FROM days WHERE x=1",
+                                    ["CO-ROUTINE days", "SCAN days"]) == ([], [], [])
+
+def test_hot_queries_use_indexes():
+    results, errors = query_audit.run_audit()
+    assert results and errors == {}
+    regressions = [(r['label'], r['sql'], r['plan']) for r in results if r['hot'] and r['scans']]
+    assert regressions == []
+    assert query_audit.main([]) == 0
+
+def test_missing_indexes_fail_the_audit(monkeypatch):
+    class BaselineOnly(MigrationRunner):
+        def migrate(self, target=None, dry_run=False):
+            return super().migrate(target=1, dry_run=dry_run)
+    monkeypatch.setattr(query_audit, "MigrationRunner", BaselineOnly)
+    results, _ = query_audit.run_audit()
+    assert any(r['label'] == 'TaskModel.get_tasks' and r['scans'] for r in results)
+    assert query_audit.main([]) == 1
+
+def test_scenario_errors_fail_the_audit(monkeypatch):
+    build_scenarios = query_audit.build_scenarios
+
+    def with_broken_scenario(db_path, capture):
+        def broken():
+            raise RuntimeError("no such column: completed")
+        return build_scenarios(db_path, capture) + [('Broken.scenario', False, broken)]
+    monkeypatch.setattr(query_audit, "build_scenarios", with_broken_scenario)
+    _, errors = query_audit.run_audit()
+    assert errors == {'Broken.scenario': 'no such column: completed'}
+    assert query_audit.main([]) == 1
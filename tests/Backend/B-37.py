@@ -0,0 +1,74 @@
+# File: tests/Backend/B-37.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for SQL-aggregated budget analytics.
+#   Verifies: Response shape is unchanged, and type, category, user and date-range filters
+#   are applied in the aggregate query; date ranges leave out undated transactions.
+#   Bad filters are rejected.
+#   Test Case: B-37 analytics filters
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany(
+            "INSERT INTO transactions (name, amount, category, type, userId, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            [("lunch", 12.0, "food", "expense", 1, "2025-11-01 12:00:00"),
+             ("dinner", 20.0, "food", "expense", 1, "2025-11-30 19:00:00"),
+             ("bus", 3.0, "transport", "expense", 2, "2025-12-01 08:00:00"),
+             ("pay", 500.0, "salary", "income", 1, "2025-11-15 09:00:00")])
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def test_summary_shape(model):
+    out = model.analytics()
+    assert out['sum'] == 535.0
+    assert out['average'] == 535.0 / 4
+    assert out['by_category'] == {
+        'food': {'sum': 32.0, 'count': 2},
+        'transport': {'sum': 3.0, 'count': 1},
+        'salary': {'sum': 500.0, 'count': 1},
+    }
+
+def test_filters(model):
+    assert model.analytics(trans_type='expense')['sum'] == 35.0
+    assert model.analytics(category='food')['by_category'] == {'food': {'sum': 32.0, 'count': 2}}
+    assert model.analytics(user_id=2)['sum'] == 3.0
+    november = model.analytics(start_date='2025-11-01', end_date='2025-11-30')
+    assert november['sum'] == 532.0
+    assert 'transport' not in november['by_category']
+    assert model.analytics(trans_type='expense', user_id=1, end_date='2025-11-01')['sum'] == 12.0
+    assert model.analytics(category='nothing') is None
+
+def test_date_ranges_leave_out_undated_transactions(model):
+    with sqlite3.connect(model.db_path) as db:
+        db.execute("INSERT INTO transactions (name, amount, category, type, userId, timestamp) "
+                   "VALUES ('cash', 7.0, 'food', 'expense', 1, NULL)")
+    assert model.analytics(user_id=1, category='food')['sum'] == 39.0
+    assert model.analytics(user_id=1, category='food', start_date='2025-11-01')['sum'] == 32.0
+    assert model.analytics(user_id=1, category='food', end_date='2025-12-31')['sum'] == 32.0
+    distribution = model.analytics(user_id=1, start_date='2025-11-01', include_distribution=True)
+    assert distribution['by_category']['food']['count'] == 2
+    assert sum(b['count'] for b in distribution['by_category']['food']['histogram']) == 2
+
+def test_new_transactions_carry_user(model):
+    model.add_transaction("coffee", 4.5, "food", "expense", user_id=2)
+    assert model.analytics(user_id=2, category='food')['sum'] == 4.5
+
+def test_invalid_filters(model):
+    with pytest.raises(ValueError):
+        model.analytics(trans_type='refund')
+    with pytest.raises(ValueError):
+        model.analytics(start_date='11/01/2025')
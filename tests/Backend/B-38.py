@@ -0,0 +1,114 @@
+# File: tests/Backend/B-38.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for budget rollup tables.
+#   Verifies: Rollups follow add/update/delete (including min/max after removing an extreme),
+#   match a rebuild from scratch after a random workload (undated rows and NULL users included),
+#   and analytics reads them.
+#   Test Case: B-38 budget rollups
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import random
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from database.maintenance import rebuild_budget_rollups, rebuild_budget_sketches
+from models.budgetmodel import BudgetModel
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "rollups.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def rollups(model):
+    with model._get_conn() as conn:
+        rows = conn.execute("SELECT period, periodStart, userId, type, category, round(total, 6), count, "
+                            "minAmount, maxAmount FROM budget_rollups ORDER BY 1, 2, 3, 4, 5").fetchall()
+    return [tuple(r) for r in rows]
+
+def sketches(model):
+    with model._get_conn() as conn:
+        rows = conn.execute("SELECT period, periodStart, userId, type, category, bucket, count "
+                            "FROM budget_sketches ORDER BY 1, 2, 3, 4, 5, 6").fetchall()
+    return [tuple(r) for r in rows]
+
+def month_bucket(model, category):
+    with model._get_conn() as conn:
+        return conn.execute("SELECT total, count, minAmount, maxAmount FROM budget_rollups "
+                            "WHERE period='month' AND category=?", (category,)).fetchone()
+
+def test_write_paths_update_rollups(model):
+    a = model.add_transaction("a", 5.0, "food", "expense", user_id=1)
+    b = model.add_transaction("b", 9.0, "food", "expense", user_id=1)
+    model.add_transaction("c", 7.0, "food", "expense", user_id=1)
+    assert tuple(month_bucket(model, "food")) == (21.0, 3, 5.0, 9.0)
+    model.delete_transaction(b)
+    assert tuple(month_bucket(model, "food")) == (12.0, 2, 5.0, 7.0)
+    model.update_transaction(a, category="rent")
+    assert tuple(month_bucket(model, "food")) == (7.0, 1, 7.0, 7.0)
+    assert tuple(month_bucket(model, "rent")) == (5.0, 1, 5.0, 5.0)
+    model.delete_transaction(a)
+    assert month_bucket(model, "rent") is None
+
+def test_rollups_match_rebuild_after_random_workload(model):
+    rng = random.Random(7)
+    ids = []
+    for i in range(300):
+        op = rng.random()
+        if op < 0.6 or not ids:
+            ids.append(model.add_transaction(f"t{i}", round(rng.uniform(1, 100), 2), rng.choice("abc"),
+                                             rng.choice(["expense", "income"]), rng.choice([None, 1, 2])))
+        elif op < 0.8:
+            model.update_transaction(rng.choice(ids), amount=round(rng.uniform(1, 100), 2), category=rng.choice("abcd"))
+        else:
+            model.delete_transaction(ids.pop(rng.randrange(len(ids))))
+    with sqlite3.connect(model.db_path) as db:
+        db.execute("UPDATE transactions SET timestamp='2024-02-29 10:00:00' WHERE transactionId % 5 = 0")
+    incremental = rollups(model)
+    assert model.rebuild_rollups() > 0
+    assert incremental == rollups(model)
+
+    with sqlite3.connect(model.db_path) as db:
+        expected = {cat: (round(s, 6), n) for cat, s, n in db.execute(
+            "SELECT category, SUM(amount), COUNT(*) FROM transactions WHERE type='expense' GROUP BY category")}
+    out = model.analytics(trans_type="expense")
+    assert {cat: (round(v['sum'], 6), v['count']) for cat, v in out['by_category'].items()} == expected
+    leap_day = model.analytics(start_date="2024-02-29", end_date="2024-02-29")
+    assert leap_day['by_category'] and sum(v['count'] for v in leap_day['by_category'].values()) == len(
+        [i for i in ids if i % 5 == 0])
+
+def test_triggers_match_rebuild_with_undated_rows_and_null_users(model):
+    rng = random.Random(11)
+    stamps = [None, None, "2026-03-01 09:00:00", "2026-03-01 18:30:00", "2026-03-02 12:00:00",
+              "2026-04-15 08:00:00"]
+    users = [None, 0, 1, 2]
+    with sqlite3.connect(model.db_path) as db:
+        ids = []
+        for i in range(400):
+            op = rng.random()
+            if op < 0.5 or not ids:
+                cur = db.execute("INSERT INTO transactions (name, amount, category, type, userId, timestamp) "
+                                 "VALUES (?, ?, ?, 'expense', ?, ?)",
+                                 (f"t{i}", rng.choice([1.0, 2.5, 5.0, 9.75, 20.0]), rng.choice("ab"),
+                                  rng.choice(users), rng.choice(stamps)))
+                ids.append(cur.lastrowid)
+            elif op < 0.8:
+                db.execute("UPDATE transactions SET amount = ?, userId = ?, timestamp = ? WHERE transactionId = ?",
+                           (rng.choice([1.0, 2.5, 5.0, 9.75, 20.0]), rng.choice(users), rng.choice(stamps),
+                            rng.choice(ids)))
+            else:
+                db.execute("DELETE FROM transactions WHERE transactionId = ?", (ids.pop(rng.randrange(len(ids))),))
+    incremental = rollups(model), sketches(model)
+    assert any(r[1] == 'unknown' for r in incremental[0])
+    with sqlite3.connect(model.db_path) as db:
+        rebuild_budget_rollups(db)
+        rebuild_budget_sketches(db)
+    assert incremental == (rollups(model), sketches(model))
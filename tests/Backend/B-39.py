@@ -0,0 +1,90 @@
+# File: tests/Backend/B-39.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for keyset-paginated transaction listing.
+#   Verifies: Pages walk every row exactly once, newest first, with filters, user scoping
+#   and column projection applied; rows without a timestamp come last and are paged too.
+#   Bad cursors, fields and limits are rejected.
+#   Test Case: B-39 transaction pagination
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel, MAX_PAGE_SIZE
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        # Pairs of rows share a timestamp so the transactionId tie-break is exercised
+        db.executemany(
+            "INSERT INTO transactions (name, amount, category, type, userId, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"tx {i}", float(i), "food" if i % 2 else "rent", "expense" if i % 3 else "income",
+              i % 2 + 1, f"2025-11-{i // 2 + 1:02d} 12:00:00") for i in range(40)])
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def walk(model, **kwargs):
+    rows, cursor = model.list_transactions(**kwargs)
+    pages = [rows]
+    while cursor:
+        rows, cursor = model.list_transactions(cursor=cursor, **kwargs)
+        pages.append(rows)
+    return pages
+
+def test_pages_cover_all_rows_newest_first(model):
+    pages = walk(model, limit=7)
+    assert [len(p) for p in pages] == [7, 7, 7, 7, 7, 5]
+    rows = [r for p in pages for r in p]
+    keys = [(r['timestamp'], r['transactionId']) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 40
+    assert set(rows[0]) == {'transactionId', 'name', 'amount', 'category', 'type', 'timestamp'}
+
+def test_filters_and_user_scope(model):
+    rows = [r for p in walk(model, limit=3, user_id=2, fields=['userId', 'category']) for r in p]
+    assert len(rows) == 20
+    assert all(r == {'userId': 2, 'category': 'food'} for r in rows)
+    rows, cursor = model.list_transactions(start_date='2025-11-03', end_date='2025-11-04', trans_type='expense')
+    assert cursor is None
+    assert sorted(r['name'] for r in rows) == ['tx 4', 'tx 5', 'tx 7']
+
+def test_new_rows_do_not_shift_pages(model):
+    first, cursor = model.list_transactions(limit=10)
+    model.add_transaction("late", 1.0, "food", "expense", user_id=1)
+    second, _ = model.list_transactions(limit=10, cursor=cursor)
+    assert second[0]['transactionId'] == first[-1]['transactionId'] - 1
+
+def test_rows_without_timestamp_are_paged_last(model):
+    with sqlite3.connect(model.db_path) as db:
+        db.executemany("INSERT INTO transactions (name, amount, category, type, userId, timestamp) "
+                       "VALUES (?, 1.0, 'food', 'expense', ?, NULL)", [(f"undated {i}", i % 2 + 1) for i in range(5)])
+    for kwargs in ({}, {'user_id': 1}):
+        for limit in (3, 7, 40):
+            rows = [r for p in walk(model, limit=limit, fields=['transactionId', 'timestamp'], **kwargs) for r in p]
+            expected = 45 if not kwargs else 23
+            assert len(rows) == expected and len({r['transactionId'] for r in rows}) == expected
+            undated = [r['transactionId'] for r in rows if r['timestamp'] is None]
+            assert rows[-len(undated):] == [r for r in rows if r['timestamp'] is None]
+            assert undated == sorted(undated, reverse=True)
+
+def test_limit_is_capped(model):
+    rows, cursor = model.list_transactions(limit=MAX_PAGE_SIZE * 10)
+    assert len(rows) == 40 and cursor is None
+
+def test_invalid_arguments(model):
+    with pytest.raises(ValueError):
+        model.list_transactions(cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        model.list_transactions(fields=['password'])
+    with pytest.raises(ValueError):
+        model.list_transactions(limit=0)
+    with pytest.raises(ValueError):
+        model.list_transactions(start_date='2025/11/01')
@@ -0,0 +1,102 @@
+# File: tests/Backend/B-40.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for streaming transaction and savings exports.
+#   Verifies: Rows arrive in fetchmany-sized batches, oldest first, with filters applied,
+#   and the export endpoint streams valid CSV and NDJSON. Bad requests are rejected up front.
+#   Test Case: B-40 streaming export
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import csv
+import io
+import json
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel
+from controllers import budget_controller, auth_middleware
+from models.authmanager import AuthManager
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany(
+            "INSERT INTO transactions (name, amount, category, type, userId, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"tx {i}", float(i), "food" if i % 2 else "rent", "expense", i % 2 + 1,
+              f"2025-11-{i % 28 + 1:02d} 12:00:00") for i in range(25)])
+        db.execute("INSERT INTO savings_goals (userId, name, targetAmount) VALUES (1, 'trip', 100)")
+        db.executemany(
+            "INSERT INTO savings_transactions (goalId, userId, amount, direction) VALUES (1, 1, ?, 'deposit')",
+            [(float(i),) for i in range(3)])
+    model = BudgetModel(db_path)
+    monkeypatch.setattr(budget_controller, "budget_model", model)
+    yield model
+    close_pool(db_path)
+
+
+def sign_in(client, monkeypatch, db_path, user_id):
+    """Send a bearer token for user_id with every request; services validate it against db_path."""
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                   (f'test-token-{user_id}', user_id))
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer test-token-{user_id}'
+    return client
+
+def test_batches_and_order(model):
+    columns, batches = model.export('transactions', batch_size=10)
+    batches = list(batches)
+    assert [len(b) for b in batches] == [10, 10, 5]
+    rows = [r for b in batches for r in b]
+    ts = columns.index('timestamp')
+    assert [r[ts] for r in rows] == sorted(r[ts] for r in rows)
+    assert model.pool.stats()['idle'] == model.pool.stats()['size']
+
+def test_filters(model):
+    columns, batches = model.export('transactions', user_id=2, category='food')
+    rows = [r for b in batches for r in b]
+    assert len(rows) == 12
+    assert {r[columns.index('userId')] for r in rows} == {2}
+    columns, batches = model.export('savings', goal_id=1)
+    assert columns[:2] == ['transactionId', 'goalId']
+    assert sum(len(b) for b in batches) == 3
+    with pytest.raises(ValueError):
+        model.export('users')
+    with pytest.raises(ValueError):
+        model.export('savings', category='food')
+
+def test_csv_and_ndjson_endpoint(model, monkeypatch):
+    client = sign_in(budget_controller.app.test_client(), monkeypatch, model.db_path, 1)
+    resp = client.get('/export/transactions?format=csv&userId=1')
+    assert resp.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows[0][0] == 'transactionId' and len(rows) == 14
+    resp = client.get('/export/savings?format=ndjson')
+    lines = resp.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['amount'] for line in lines] == [0.0, 1.0, 2.0]
+    empty = client.get('/export/savings?goalId=99').get_data(as_text=True)
+    assert empty.strip() == 'transactionId,goalId,userId,amount,direction,timestamp'
+    assert client.get('/export/transactions?format=xml').status_code == 400
+    assert client.get('/export/transactions?startDate=yesterday').status_code == 400
+
+def test_requests_without_user_id_are_scoped_to_signed_in_user(model, monkeypatch):
+    client = sign_in(budget_controller.app.test_client(), monkeypatch, model.db_path, 2)
+    listed = client.get('/transactions?limit=100').get_json()['transactions']
+    # User 2 owns the odd-numbered transactions
+    assert sorted(tx['name'] for tx in listed) == sorted(f"tx {i}" for i in range(1, 25, 2))
+    summary = client.get('/analytics').get_json()['summary']
+    assert summary == model.analytics(user_id=2) and summary != model.analytics()
+    lines = client.get('/export/transactions?format=ndjson').get_data(as_text=True).splitlines()
+    assert len(lines) == 12 and {json.loads(line)['userId'] for line in lines} == {2}
+    assert client.get('/export/savings?format=ndjson').get_data(as_text=True) == ''    # user 1's goal
+    # Cache stats are counters only, never cached rows
+    stats = client.get('/cache/stats').get_json()['cache']
+    assert all(isinstance(value, (int, float)) or value is None for value in stats.values())
+    assert client.get('/transactions?userId=1').status_code == 403
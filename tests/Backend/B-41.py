@@ -0,0 +1,172 @@
+# File: tests/Backend/B-41.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for bulk bank-statement imports.
+#   Verifies: CSV and OFX statements are imported in batches, bad rows are reported by line
+#   without aborting the file, re-importing skips rows that already exist, and a stream that
+#   cannot be read to the end keeps its earlier batches and reports the read error.
+#   Test Case: B-41 statement import
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import csv
+import io
+import pytest
+import threading
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel
+from models.budgetimport import StatementImporter, main
+from controllers import budget_controller, auth_middleware
+from models.authmanager import AuthManager
+
+CSV_STATEMENT = """Date,Description,Amount,Category
+2025-11-01,Coffee,-4.50,food
+11/02/2025,Paycheck,1200.00,
+2025-11-03,Broken row,n/a,food
+2025-11-04,,-10.00,food
+2025-11-05,Bus,-2.75,transport
+"""
+
+OFX_STATEMENT = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20251110120000.000[-5:EST]<TRNAMT>-20.00<FITID>A1<NAME>Groceries</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20251111
+<TRNAMT>-20.00
+<FITID>A2
+<NAME>Groceries
+</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    model = BudgetModel(db_path)
+    monkeypatch.setattr(budget_controller, "budget_model", model)
+    yield model
+    close_pool(db_path)
+
+def rows(model):
+    with model._get_conn() as conn:
+        found = conn.execute(
+            "SELECT name, amount, category, type, userId, timestamp FROM transactions ORDER BY timestamp"
+        ).fetchall()
+    return [tuple(r) for r in found]
+
+
+def sign_in(client, monkeypatch, db_path, user_id):
+    """Send a bearer token for user_id with every request; services validate it against db_path."""
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                   (f'test-token-{user_id}', user_id))
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer test-token-{user_id}'
+    return client
+
+def test_csv_import_reports_bad_rows(model):
+    summary = StatementImporter(model, batch_size=2).import_stream(io.StringIO(CSV_STATEMENT), 'csv', user_id=7)
+    assert summary['imported'] == 3 and summary['duplicates'] == 0
+    assert [e['line'] for e in summary['errors']] == [4, 5]
+    assert rows(model) == [
+        ('Coffee', 4.5, 'food', 'expense', 7, '2025-11-01 00:00:00'),
+        ('Paycheck', 1200.0, 'Uncategorized', 'income', 7, '2025-11-02 00:00:00'),
+        ('Bus', 2.75, 'transport', 'expense', 7, '2025-11-05 00:00:00'),
+    ]
+    assert model.analytics(user_id=7, trans_type='expense')['sum'] == 7.25
+
+def test_reimport_skips_duplicates(model):
+    importer = StatementImporter(model)
+    importer.import_stream(io.StringIO(CSV_STATEMENT), 'csv', user_id=7)
+    again = importer.import_stream(io.StringIO(CSV_STATEMENT), 'csv', user_id=7)
+    assert again['imported'] == 0 and again['duplicates'] == 3
+    other_user = importer.import_stream(io.StringIO(CSV_STATEMENT), 'csv', user_id=8)
+    assert other_user['imported'] == 3
+
+def test_identical_rows_are_each_imported_once(model):
+    statement = CSV_STATEMENT + "2025-11-05,Bus,-2.75,transport\n2025-11-05,Bus,-2.75,transport\n"
+    importer = StatementImporter(model, batch_size=2)
+    first = importer.import_stream(io.StringIO(CSV_STATEMENT), 'csv', user_id=7)
+    assert first['imported'] == 3
+    # The file grew by two more identical bus fares: only those are new
+    again = importer.import_stream(io.StringIO(statement), 'csv', user_id=7)
+    assert again['imported'] == 2 and again['duplicates'] == 3
+    assert importer.import_stream(io.StringIO(statement), 'csv', user_id=7)['imported'] == 0
+    assert [r[0] for r in rows(model)].count('Bus') == 3
+
+def test_ofx_uses_fitid(model):
+    summary = StatementImporter(model).import_stream(io.StringIO(OFX_STATEMENT), 'ofx', user_id=1)
+    # Same name and amount on different days, told apart by FITID
+    assert summary['imported'] == 2 and summary['errorCount'] == 0
+    assert [r[5] for r in rows(model)] == ['2025-11-10 12:00:00', '2025-11-11 00:00:00']
+
+def test_missing_columns_and_format(model):
+    with pytest.raises(ValueError):
+        StatementImporter(model).import_stream(io.StringIO("when,what\n"), 'csv')
+    with pytest.raises(ValueError):
+        StatementImporter(model).import_stream(io.StringIO(CSV_STATEMENT), 'qif')
+
+def test_api_and_cli(model, tmp_path, monkeypatch):
+    client = sign_in(budget_controller.app.test_client(), monkeypatch, model.db_path, 3)
+    resp = client.post('/transactions/import?userId=3', data=CSV_STATEMENT)
+    assert resp.status_code == 200 and resp.get_json()['imported'] == 3
+    resp = client.post('/transactions/import?userId=3',
+                       data={'file': (io.BytesIO(OFX_STATEMENT.encode()), 'bank.ofx')},
+                       content_type='multipart/form-data')
+    assert resp.get_json()['imported'] == 2
+    statement = tmp_path / "statement.csv"
+    statement.write_text(CSV_STATEMENT)
+    assert main([str(statement), '--user', '4', '--db', model.db_path]) == 0
+    assert len(rows(model)) == 8
+
+def test_non_finite_and_malformed_rows_are_reported(model):
+    huge = 'x' * (csv.field_size_limit() + 1)
+    statement = ("Date,Description,Amount\n"
+                 "2025-11-01,Coffee,-4.50\n"
+                 "2025-11-02,Bad,nan\n"
+                 "2025-11-03,Worse,-inf\n"
+                 f"2025-11-04,{huge},-1.00\n"
+                 "2025-11-05,Bus,-2.75\n")
+    summary = StatementImporter(model).import_stream(io.StringIO(statement), 'csv', user_id=7)
+    assert summary['imported'] == 2 and summary['errorCount'] == 3
+    assert [e['line'] for e in summary['errors']] == [3, 4, 5]
+    assert 'finite' in summary['errors'][0]['error'] and 'Malformed CSV' in summary['errors'][2]['error']
+    assert [r[0] for r in rows(model)] == ['Coffee', 'Bus']
+
+def test_unreadable_stream_keeps_earlier_batches(model, monkeypatch):
+    good = "Date,Description,Amount\n" + "".join(f"2025-11-01,Row {i},-1.00\n" for i in range(1000))
+    body = good.encode() + b"2025-11-02,Caf\xe9,-3.00\n2025-11-03,Tea,-2.00\n"
+    stream = io.TextIOWrapper(io.BytesIO(body), encoding='utf-8', newline='')
+    summary = StatementImporter(model, batch_size=50).import_stream(stream, 'csv', user_id=7)
+    assert summary['complete'] is False and summary['errorCount'] == 1
+    assert 0 < summary['imported'] == len(rows(model)) <= 1000
+    assert 'Could not read' in summary['errors'][0]['error']
+    assert summary['errors'][0]['line'] == summary['imported'] + 2
+
+    client = sign_in(budget_controller.app.test_client(), monkeypatch, model.db_path, 3)
+    resp = client.post('/transactions/import', data=body)
+    assert resp.status_code == 200
+    assert resp.get_json()['complete'] is False and resp.get_json()['imported'] > 0
+
+def test_concurrent_imports_count_each_row_once(model):
+    # Each batch checks for duplicates and inserts under the write lock, so two imports of the
+    # same statement racing each other import every row exactly once between them
+    summaries = []
+    def run():
+        summaries.append(StatementImporter(BudgetModel(model.db_path)).import_stream(
+            io.StringIO(CSV_STATEMENT), 'csv', user_id=7))
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(s['imported'] for s in summaries) == [0, 3]
+    assert sum(s['duplicates'] for s in summaries) == 3
+    assert len(rows(model)) == 3
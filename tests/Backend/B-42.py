@@ -0,0 +1,122 @@
+# File: tests/Backend/B-42.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend stress test for atomic savings contributions.
+#   Verifies: Many threads depositing and withdrawing at once lose no updates, the balance
+#   always matches the ledger and never goes negative, and batched contributions report per item.
+#   Test Case: B-42 concurrent contributions
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import threading
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel
+
+THREADS = 12
+OPS_PER_THREAD = 40
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "savings.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def run_threads(target):
+    errors = []
+    def worker(n):
+        try:
+            target(n)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+def ledger_balance(model, goal_id):
+    with model._get_conn() as conn:
+        return conn.execute(
+            "SELECT IFNULL(SUM(CASE direction WHEN 'deposit' THEN amount ELSE -amount END), 0) "
+            "FROM savings_transactions WHERE goalId=?", (goal_id,)).fetchone()[0]
+
+def test_no_lost_deposits(model):
+    goal_id = model.create_savings_goal(1, "trip", 10000)
+    run_threads(lambda n: [model.contribute_to_goal(goal_id, 1, 1.0) for _ in range(OPS_PER_THREAD)])
+    assert model.get_goal(goal_id)['currentAmount'] == THREADS * OPS_PER_THREAD
+    assert ledger_balance(model, goal_id) == THREADS * OPS_PER_THREAD
+
+def test_withdrawals_never_overdraw(model):
+    goal_id = model.create_savings_goal(1, "rainy day", 1000)
+    model.contribute_to_goal(goal_id, 1, 100.0)
+    succeeded = []
+    def withdraw(n):
+        for _ in range(OPS_PER_THREAD):
+            try:
+                model.contribute_to_goal(goal_id, 1, 1.0, 'withdrawal')
+                succeeded.append(1)
+            except ValueError as e:
+                assert str(e) == "Insufficient savings"
+    run_threads(withdraw)
+    assert len(succeeded) == 100
+    assert model.get_goal(goal_id)['currentAmount'] == 0
+    assert ledger_balance(model, goal_id) == 0
+
+def test_batch_contributions(model):
+    goal_a = model.create_savings_goal(1, "a", 100)
+    goal_b = model.create_savings_goal(1, "b", 100)
+    results = model.contribute_many([
+        {'goalId': goal_a, 'userId': 1, 'amount': 30.0},
+        {'goalId': goal_b, 'userId': 1, 'amount': 5.0, 'direction': 'withdrawal'},
+        {'goalId': 999, 'userId': 1, 'amount': 5.0},
+        {'goalId': goal_a, 'userId': 1, 'amount': 10.0, 'direction': 'withdrawal'},
+    ])
+    assert results == [
+        {'goalId': goal_a, 'newAmount': 30.0},
+        {'goalId': goal_b, 'error': 'Insufficient savings'},
+        {'goalId': 999, 'error': 'Goal not found'},
+        {'goalId': goal_a, 'newAmount': 20.0},
+    ]
+    assert len(model.list_goal_transactions(goal_a)) == 2
+    assert model.list_goal_transactions(goal_b) == []
+    with pytest.raises(ValueError):
+        model.contribute_to_goal(goal_a, 1, -5.0)
+
+def test_bad_item_rolls_back_alone(model):
+    goal_id = model.create_savings_goal(1, "mixed", 100)
+    results = model.contribute_many([
+        {'goalId': goal_id, 'userId': 1, 'amount': 30.0},
+        {'goalId': goal_id, 'amount': 5.0},
+        {'goalId': goal_id, 'userId': 1, 'amount': float('inf')},
+        {'goalId': goal_id, 'userId': 1, 'amount': float('nan')},
+        {'goalId': goal_id, 'userId': 1, 'amount': 2.5},
+    ])
+    assert results == [
+        {'goalId': goal_id, 'newAmount': 30.0},
+        {'goalId': goal_id, 'error': 'Invalid userId'},
+        {'goalId': goal_id, 'error': 'Invalid amount'},
+        {'goalId': goal_id, 'error': 'Invalid amount'},
+        {'goalId': goal_id, 'newAmount': 32.5},
+    ]
+    assert model.get_goal(goal_id)['currentAmount'] == 32.5
+    assert ledger_balance(model, goal_id) == 32.5
+    # A write that fails inside an item's savepoint undoes only that item's changes
+    with model._get_conn() as conn:
+        conn.execute('''CREATE TRIGGER reject_big AFTER INSERT ON savings_transactions
+                        WHEN NEW.amount > 50 BEGIN SELECT RAISE(ABORT, 'too big'); END''')
+        conn.commit()
+    results = model.contribute_many([
+        {'goalId': goal_id, 'userId': 1, 'amount': 60.0},
+        {'goalId': goal_id, 'userId': 1, 'amount': 1.0},
+    ])
+    assert results == [{'goalId': goal_id, 'error': 'too big'}, {'goalId': goal_id, 'newAmount': 33.5}]
+    assert model.get_goal(goal_id)['currentAmount'] == 33.5
@@ -0,0 +1,84 @@
+# File: tests/Backend/B-43.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for savings goal forecasting.
+#   Verifies: Every goal of a user is projected in one call with the savings rate over the
+#   window, the projected completion date, the weekly rate needed for the deadline and progress.
+#   Test Case: B-43 goal forecasts
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.budgetmodel import BudgetModel
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "savings.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany(
+            "INSERT INTO savings_goals (userId, name, targetAmount, currentAmount, createdAt, deadline) VALUES (?, ?, ?, ?, ?, ?)",
+            [(1, "old goal", 1000, 100, "2025-01-01", "2025-12-31"),
+             (1, "done", 50, 60, "2025-10-01", None),
+             (1, "stalled", 500, 0, "2025-11-01", "2025-11-30"),
+             (1, "new goal", 500, 50, "2025-10-25", "2026-06-30"),
+             (2, "someone else", 10, 0, "2025-01-01", None)])
+        db.executemany(
+            "INSERT INTO savings_transactions (goalId, userId, amount, direction, timestamp) VALUES (?, 1, ?, ?, ?)",
+            [(1, 10.0, "deposit", "2025-08-01 00:00:00"),   # outside the 90-day window
+             (1, 70.0, "deposit", "2025-10-15 00:00:00"),
+             (1, 20.0, "deposit", "2025-11-10 00:00:00"),
+             (4, 100.0, "deposit", "2025-10-25 00:00:00"),
+             (4, 50.0, "withdrawal", "2025-10-30 00:00:00")])
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def test_forecasts(model):
+    forecasts = {f['name']: f for f in model.forecast_goals(1, as_of='2025-11-24')}
+    assert set(forecasts) == {"old goal", "done", "stalled", "new goal"}
+
+    old = forecasts["old goal"]
+    assert old['weeklyRate'] == round(90 / 90 * 7, 2)
+    assert old['progress'] == 0.1
+    assert old['requiredWeeklyRate'] == round(900 * 7 / 37, 2)
+    assert old['onTrack'] is False
+
+    # Created 30 days ago, so the rate is over 30 days rather than the full window
+    new = forecasts["new goal"]
+    assert new['weeklyRate'] == round(50 / 30 * 7, 2)
+    assert new['projectedDate'] == '2026-08-21'   # 450 remaining / (50 / 30 per day) = 270 days
+    assert new['onTrack'] is False
+
+    assert forecasts["done"]['progress'] == 1.0
+    assert forecasts["done"]['projectedDate'] == '2025-11-24'
+    assert forecasts["done"]['requiredWeeklyRate'] is None
+    assert forecasts["stalled"]['projectedDate'] is None
+    assert forecasts["stalled"]['requiredWeeklyRate'] == round(500 * 7 / 6, 2)
+
+def test_window_and_deadline(model):
+    wide = {f['name']: f for f in model.forecast_goals(1, as_of='2025-11-24', window_days=365)}
+    assert wide["old goal"]['weeklyRate'] == round(100 / 327 * 7, 2)
+    passed = {f['name']: f for f in model.forecast_goals(1, as_of='2025-12-15')}
+    assert passed["stalled"]['requiredWeeklyRate'] is None
+
+def test_on_track(model):
+    with model._get_conn() as conn:
+        conn.execute("INSERT INTO savings_transactions (goalId, userId, amount, direction, timestamp) "
+                     "VALUES (4, 1, 400.0, 'deposit', '2025-11-20 00:00:00')")
+        conn.execute("UPDATE savings_goals SET currentAmount = currentAmount + 400 WHERE goalId = 4")
+    forecast = [f for f in model.forecast_goals(1, as_of='2025-11-24') if f['goalId'] == 4][0]
+    assert forecast['projectedDate'] <= forecast['deadline']
+    assert forecast['onTrack'] is True
+
+def test_invalid_arguments(model):
+    assert model.forecast_goals(99) == []
+    with pytest.raises(ValueError):
+        model.forecast_goals(1, as_of='24/11/2025')
+    with pytest.raises(ValueError):
+        model.forecast_goals(1, window_days=0)
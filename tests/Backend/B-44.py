@@ -0,0 +1,156 @@
+# File: tests/Backend/B-44.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the budget analytics and goals cache.
+#   Verifies: Repeated reads are served from the cache, each write path drops exactly the
+#   entries it affects, writes made outside the model are picked up by polling, and the
+#   LRU respects its entry and byte bounds.
+#   Test Case: B-44 analytics cache
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import io
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models import budgetmodel
+from models.budgetmodel import BudgetModel
+from models.budgetimport import StatementImporter
+from models.cache import LRUCache, MISS
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    model = BudgetModel(db_path)
+    model.add_transaction("lunch", 10.0, "food", "expense", user_id=1)
+    model.add_transaction("pay", 100.0, "salary", "income", user_id=2)
+    yield model
+    close_pool(db_path)
+
+def test_repeated_reads_hit(model):
+    first = model.analytics(user_id=1)
+    assert model.analytics(user_id=1) == first
+    stats = model.cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+def test_writes_invalidate_precisely(model):
+    model.analytics(user_id=1)
+    model.analytics(user_id=2)
+    model.analytics(trans_type='income')
+    model.analytics()
+    tx = model.add_transaction("dinner", 5.0, "food", "expense", user_id=1)
+    assert model.cache.stats()['entries'] == 2   # user 2 and income survive
+    assert model.analytics(user_id=1)['sum'] == 15.0
+    assert model.analytics()['sum'] == 115.0
+
+    model.update_transaction(tx, type='income')
+    assert model.analytics(trans_type='income')['sum'] == 105.0
+    model.delete_transaction(tx)
+    assert model.analytics(user_id=1)['sum'] == 10.0
+
+    # A date range that does not contain the write keeps its entry
+    model.analytics(start_date='2000-01-01', end_date='2000-12-31')
+    model.add_transaction("snack", 1.0, "food", "expense", user_id=1)
+    hits = model.cache.stats()['hits']
+    model.analytics(start_date='2000-01-01', end_date='2000-12-31')
+    assert model.cache.stats()['hits'] == hits + 1
+
+def test_import_and_rebuild_invalidate(model):
+    assert model.analytics(user_id=3) is None
+    StatementImporter(model).import_stream(io.StringIO("date,name,amount\n2025-11-01,bus,-2.5\n"), 'csv', user_id=3)
+    assert model.analytics(user_id=3)['sum'] == 2.5
+    model.rebuild_rollups()
+    assert model.cache.stats()['entries'] == 0
+
+def test_goals_invalidation(model):
+    goal = model.create_savings_goal(1, "trip", 100)
+    other = model.create_savings_goal(2, "car", 100)
+    model.get_goals(1)
+    model.get_goals(2)
+    model.contribute_to_goal(goal, 1, 25.0)
+    assert model.get_goals(1)[0]['currentAmount'] == 25.0
+    assert model.cache.stats()['hits'] == 0
+    model.contribute_many([{'goalId': other, 'userId': 2, 'amount': 5.0}])
+    assert model.get_goals(2)[0]['currentAmount'] == 5.0
+    model.delete_goal(goal)
+    assert model.get_goals(1) == []
+
+def test_outside_writes_are_seen(model, monkeypatch):
+    monkeypatch.setattr(budgetmodel, 'CACHE_SYNC_INTERVAL', 0)
+    goal = model.create_savings_goal(1, "trip", 100)
+    model.analytics(user_id=1)
+    model.analytics(user_id=2)
+    model.analytics()
+    model.get_goals(1)
+
+    # Another worker process has its own model and cache
+    other = BudgetModel(model.db_path, cache=LRUCache())
+    other.add_transaction("dinner", 5.0, "food", "expense", user_id=1)
+    other.contribute_to_goal(goal, 1, 25.0)
+    assert model.analytics(user_id=1)['sum'] == 15.0
+    assert model.analytics()['sum'] == 115.0
+    assert model.get_goals(1)[0]['currentAmount'] == 25.0
+    hits = model.cache.stats()['hits']
+    model.analytics(user_id=2)   # user 2 did not change
+    assert model.cache.stats()['hits'] == hits + 1
+
+    with sqlite3.connect(model.db_path) as db:
+        db.execute("UPDATE transactions SET amount = 50.0 WHERE name = 'pay'")
+    assert model.analytics(user_id=2)['sum'] == 50.0
+    assert model.cache_stats()['changesSeen'] == 3
+
+    # The model's own writes are not invalidated a second time by the poll
+    model.add_transaction("snack", 1.0, "food", "expense", user_id=1)
+    model.analytics(user_id=2)
+    hits = model.cache.stats()['hits']
+    model.analytics(user_id=2)
+    assert model.cache.stats()['hits'] == hits + 1
+    assert model.cache_stats()['changesSeen'] == 3
+
+def test_outside_write_followed_by_own_write_is_seen(model, monkeypatch):
+    monkeypatch.setattr(budgetmodel, 'CACHE_SYNC_INTERVAL', 0)
+    assert model.analytics(user_id=1, category='food')['sum'] == 10.0
+    BudgetModel(model.db_path, cache=LRUCache()).add_transaction("dinner", 5.0, "food", "expense", user_id=1)
+    # The model's own write for the same user lands before its next poll, and does not
+    # touch the cached food entry itself
+    model.add_transaction("refund", 2.0, "other", "income", user_id=1)
+    assert model.analytics(user_id=1, category='food')['sum'] == 15.0
+    assert model.cache_stats()['changesSeen'] == 1
+
+def test_pruned_changes_drop_the_whole_cache(model, monkeypatch):
+    monkeypatch.setattr(budgetmodel, 'CACHE_SYNC_INTERVAL', 0)
+    model.analytics(user_id=2)
+    model.get_goals(2)
+    # The writer prunes all but the newest log row at once, as if this model had not polled for a long time
+    monkeypatch.setattr(budgetmodel, 'CHANGE_RETENTION', -1)
+    other = BudgetModel(model.db_path, cache=LRUCache())
+    other.add_transaction("bonus", 50.0, "salary", "income", user_id=2)
+    other.add_transaction("lunch", 8.0, "food", "expense", user_id=3)
+    assert model.analytics(user_id=2)['sum'] == 150.0
+    assert model.cache.stats()['entries'] == 1
+
+def test_lru_bounds():
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is MISS and cache.get('a') == 1
+    cache.put('big', 'x' * 200)
+    assert cache.get('big') is MISS
+    cache.put('d', 'y' * 60)
+    cache.put('e', 'z' * 60)
+    assert cache.stats()['bytes'] <= 100 and cache.get('d') is MISS
+
+def test_stale_put_is_dropped():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.invalidate(lambda key: True)   # a write lands while the read is in flight
+    cache.put('k', 'stale', generation)
+    assert cache.get('k') is MISS
@@ -0,0 +1,82 @@
+# File: tests/Backend/B-45.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for approximate spending percentiles and histograms.
+#   Verifies: Median and p90 from the persisted amount sketches stay within 1% of the exact
+#   values, histograms count every transaction, and triggers keep the sketches equal to a rebuild.
+#   Test Case: B-45 quantile sketches
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import random
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from database.maintenance import rebuild_budget_sketches
+from database.quantile_sketch import RELATIVE_ACCURACY, HISTOGRAM_EDGES
+from models.budgetmodel import BudgetModel
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "budget.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield BudgetModel(db_path)
+    close_pool(db_path)
+
+def exact(amounts, q):
+    ordered = sorted(amounts)
+    return ordered[int(q * (len(ordered) - 1))]
+
+def sketch_rows(model):
+    with model._get_conn() as conn:
+        return sorted(tuple(r) for r in conn.execute("SELECT * FROM budget_sketches"))
+
+def test_percentiles_within_accuracy(model):
+    rng = random.Random(7)
+    amounts = {'food': [round(rng.lognormvariate(3, 1), 2) for _ in range(3000)],
+               'rent': [round(rng.uniform(900, 1500), 2) for _ in range(200)]}
+    with model._get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO transactions (name, amount, category, type, userId, timestamp) VALUES ('x', ?, ?, 'expense', 1, ?)",
+            [(a, cat, f"2025-11-{i % 28 + 1:02d} 10:00:00") for cat, values in amounts.items() for i, a in enumerate(values)])
+    summary = model.analytics(include_distribution=True)
+    everything = amounts['food'] + amounts['rent']
+    checks = [(summary, everything)] + [(summary['by_category'][cat], values) for cat, values in amounts.items()]
+    for target, values in checks:
+        for name, q in (('median', 0.5), ('p90', 0.9)):
+            assert target[name] == pytest.approx(exact(values, q), rel=RELATIVE_ACCURACY + 0.001)
+        assert sum(b['count'] for b in target['histogram']) == len(values)
+        assert [b['min'] for b in target['histogram']] == HISTOGRAM_EDGES
+
+def test_date_range_and_plain_response(model):
+    model.add_transaction("a", 10.0, "food", "expense", user_id=1)
+    with model._get_conn() as conn:
+        conn.execute("INSERT INTO transactions (name, amount, category, type, userId, timestamp) "
+                     "VALUES ('old', 500.0, 'food', 'expense', 1, '2020-01-01 00:00:00')")
+    assert 'median' not in model.analytics()
+    old = model.analytics(start_date='2020-01-01', end_date='2020-01-31', include_distribution=True)
+    assert old['median'] == pytest.approx(500.0, rel=RELATIVE_ACCURACY)
+    # Bins are (min, max], and an amount equal to an edge is counted exactly
+    assert [b['count'] for b in old['histogram'] if b['max'] == 500] == [1]
+
+def test_sketches_match_rebuild_after_random_workload(model):
+    rng = random.Random(11)
+    ids = []
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.6 or not ids:
+            ids.append(model.add_transaction("t", round(rng.uniform(0, 300), 2), rng.choice("abc"),
+                                             rng.choice(["expense", "income"]), user_id=rng.randint(1, 3)))
+        elif action < 0.8:
+            model.update_transaction(rng.choice(ids), amount=round(rng.uniform(0, 300), 2), category=rng.choice("abc"))
+        else:
+            model.delete_transaction(ids.pop(rng.randrange(len(ids))))
+    live = sketch_rows(model)
+    with model._get_conn() as conn:
+        rebuild_budget_sketches(conn)
+    assert live == sketch_rows(model)
@@ -0,0 +1,81 @@
+# File: tests/Backend/B-46.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for stored habit streaks.
+#   Verifies: Check-ins update current/longest streak and last completion incrementally,
+#   backfills and deletes recompute them, broken runs read as 0, and a rebuild agrees.
+#   Test Case: B-46 persisted habit streaks
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.habitmodel import HabitModel
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield HabitModel(db_path)
+    close_pool(db_path)
+
+def day(offset):
+    return (datetime.utcnow().date() - timedelta(days=offset)).strftime('%Y-%m-%d')
+
+def complete(model, habit_id, *offsets):
+    with model._get_conn() as conn:
+        conn.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                         [(habit_id, day(o)) for o in offsets])
+
+def stored(model, habit_id):
+    with model._get_conn() as conn:
+        return tuple(conn.execute('SELECT currentStreak, longestStreak, lastCompletionDate FROM habits '
+                                  'WHERE habitId=?', (habit_id,)).fetchone())
+
+def test_check_in_extends_streak(model):
+    habit_id = model.create_habit(1, "read")
+    complete(model, habit_id, 2, 1)
+    assert model.habit_check_in(habit_id) is True
+    assert model.streak_info(habit_id) == {'currentStreak': 3, 'longestStreak': 3, 'lastCompletionDate': day(0)}
+    assert model.habit_check_in(habit_id) is False
+    assert model.habit_streak(habit_id) == 3
+
+def test_backfill_and_delete_recompute(model):
+    habit_id = model.create_habit(1, "run")
+    complete(model, habit_id, 0, 1, 3, 4, 5)
+    assert stored(model, habit_id) == (2, 3, day(0))
+    complete(model, habit_id, 2)           # backfilled gap joins the runs
+    assert stored(model, habit_id) == (6, 6, day(0))
+    with model._get_conn() as conn:
+        conn.execute('DELETE FROM habit_completions WHERE habitId=? AND completionDate=?', (habit_id, day(3)))
+    assert stored(model, habit_id) == (3, 3, day(0))
+
+def test_broken_run_reads_zero(model):
+    habit_id = model.create_habit(1, "stretch")
+    complete(model, habit_id, 5, 4, 3)
+    assert model.habit_streak(habit_id) == 0
+    assert model.streak_info(habit_id)['longestStreak'] == 3
+    assert model.streak_info(9999) is None
+
+def test_matches_rebuild_after_random_workload(model):
+    rng = random.Random(5)
+    habits = [model.create_habit(1, f"habit {i}") for i in range(3)]
+    for _ in range(300):
+        with model._get_conn() as conn:
+            if rng.random() < 0.75:
+                conn.execute('INSERT OR IGNORE INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                             (rng.choice(habits), day(rng.randint(0, 40))))
+            else:
+                conn.execute('DELETE FROM habit_completions WHERE completionId = '
+                             '(SELECT completionId FROM habit_completions ORDER BY RANDOM() LIMIT 1)')
+    live = [stored(model, h) for h in habits]
+    assert model.rebuild_streaks() == 3
+    assert [stored(model, h) for h in habits] == live
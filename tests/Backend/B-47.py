@@ -0,0 +1,83 @@
+# File: tests/Backend/B-47.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for batch habit streaks.
+#   Verifies: One query computes every habit's streaks for a user (habits without completions
+#   included, other users excluded), it agrees with the stored columns, the habit list can
+#   carry streaks, and a per-user rebuild only touches that user's habits.
+#   Test Case: B-47 batch habit streaks
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.habitmodel import HabitModel, HABIT_FIELDS, STREAK_FIELDS
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield HabitModel(db_path)
+    close_pool(db_path)
+
+def day(offset):
+    return (datetime.utcnow().date() - timedelta(days=offset)).strftime('%Y-%m-%d')
+
+def complete(model, habit_id, *offsets):
+    with model._get_conn() as conn:
+        conn.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                         [(habit_id, day(o)) for o in offsets])
+
+def test_compute_streaks_for_user(model):
+    read = model.create_habit(1, "read")
+    run = model.create_habit(1, "run")
+    idle = model.create_habit(1, "idle")
+    other = model.create_habit(2, "read")
+    complete(model, read, 0, 1, 2, 5, 6, 7, 8)
+    complete(model, run, 3, 4)                      # broken run reads as 0
+    complete(model, other, 0)
+    assert model.compute_streaks(1) == {
+        read: {'currentStreak': 3, 'longestStreak': 4, 'lastCompletionDate': day(0)},
+        run: {'currentStreak': 0, 'longestStreak': 2, 'lastCompletionDate': day(3)},
+        idle: {'currentStreak': 0, 'longestStreak': 0, 'lastCompletionDate': None},
+    }
+    assert model.compute_streaks(99) == {}
+
+def test_get_habits_include_streaks(model):
+    habit_id = model.create_habit(1, "read")
+    complete(model, habit_id, 0, 1)
+    plain, = model.get_habits(1)
+    assert list(plain) == HABIT_FIELDS
+    with_streaks, = model.get_habits(1, include_streaks=True)
+    assert list(with_streaks) == HABIT_FIELDS + STREAK_FIELDS
+    assert (with_streaks['currentStreak'], with_streaks['longestStreak']) == (2, 2)
+
+def test_batch_matches_stored_after_random_workload(model):
+    rng = random.Random(11)
+    habits = [model.create_habit(1, f"habit {i}") for i in range(6)]
+    rows = {(rng.choice(habits), day(rng.randint(0, 60))) for _ in range(200)}
+    with model._get_conn() as conn:
+        conn.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)', sorted(rows))
+    stored = {h['habitId']: {f: h[f] for f in STREAK_FIELDS} for h in model.get_habits(1, include_streaks=True)}
+    assert model.compute_streaks(1) == stored
+
+def test_rebuild_for_one_user(model):
+    mine = model.create_habit(1, "read")
+    theirs = model.create_habit(2, "read")
+    complete(model, mine, 0)
+    complete(model, theirs, 0)
+    with model._get_conn() as conn:
+        conn.execute('UPDATE habits SET currentStreak = 9, longestStreak = 9')
+    assert model.rebuild_streaks(1) == 1
+    assert model.streak_info(mine)['longestStreak'] == 1
+    assert model.streak_info(theirs)['longestStreak'] == 9
+    assert model.rebuild_streaks() == 2
+    assert model.streak_info(theirs)['longestStreak'] == 1
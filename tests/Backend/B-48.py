@@ -0,0 +1,110 @@
+# File: tests/Backend/B-48.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for habit completion calendars.
+#   Verifies: Inserts, deletes and edits keep the per-year bitmaps in step with
+#   habit_completions (including day 366 and bit 63 of a word), a rebuild agrees, windowed
+#   completion rates span years, and the calendar endpoint returns the encoded bitmap.
+#   Test Case: B-48 habit completion calendar
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import random
+import sqlite3
+from datetime import date, timedelta
+from database import completion_calendar as calendar
+from database.maintenance import rebuild_habit_calendars
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.habitmodel import HabitModel
+from models.authmanager import AuthManager
+from controllers import auth_middleware
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield HabitModel(db_path)
+    close_pool(db_path)
+
+def execute(model, sql, params=()):
+    with model._get_conn() as conn:
+        return conn.execute(sql, params).fetchall()
+
+def complete(model, habit_id, *days):
+    with model._get_conn() as conn:
+        conn.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                         [(habit_id, d) for d in days])
+
+def calendar_rows(model):
+    return [tuple(row) for row in execute(model, 'SELECT * FROM habit_calendar ORDER BY habitId, year')]
+
+
+def sign_in(client, monkeypatch, db_path, user_id):
+    """Send a bearer token for user_id with every request; services validate it against db_path."""
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                   (f'test-token-{user_id}', user_id))
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer test-token-{user_id}'
+    return client
+
+def test_bitmap_tracks_completions(model):
+    habit_id = model.create_habit(1, "read")
+    # Day 0, day 63 (bit 63 of w0), day 64 and day 365 of a leap year
+    complete(model, habit_id, '2024-01-01', '2024-03-04', '2024-03-05', '2024-12-31')
+    bitmap = model.completion_calendar(habit_id, 2024)
+    assert calendar.completion_dates(bitmap, 2024) == [
+        date(2024, 1, 1), date(2024, 3, 4), date(2024, 3, 5), date(2024, 12, 31)]
+    execute(model, "UPDATE habit_completions SET completionDate = '2025-01-02' WHERE completionDate = '2024-03-04'")
+    assert calendar.completion_dates(model.completion_calendar(habit_id, 2024), 2024) == [
+        date(2024, 1, 1), date(2024, 3, 5), date(2024, 12, 31)]
+    assert calendar.completion_dates(model.completion_calendar(habit_id, 2025), 2025) == [date(2025, 1, 2)]
+    execute(model, "DELETE FROM habit_completions WHERE completionDate LIKE '2025%'")
+    assert model.completion_calendar(habit_id, 2025) == 0
+    assert [row[1] for row in calendar_rows(model)] == [2024]
+
+def test_matches_rebuild_after_random_workload(model):
+    rng = random.Random(3)
+    habits = [model.create_habit(1, f"habit {i}") for i in range(3)]
+    start = date(2023, 12, 1)
+    for _ in range(400):
+        if rng.random() < 0.75:
+            execute(model, 'INSERT OR IGNORE INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                    (rng.choice(habits), str(start + timedelta(days=rng.randint(0, 500)))))
+        else:
+            execute(model, 'DELETE FROM habit_completions WHERE completionId = '
+                           '(SELECT completionId FROM habit_completions ORDER BY RANDOM() LIMIT 1)')
+    live = calendar_rows(model)
+    with model._get_conn() as conn:
+        rebuild_habit_calendars(conn)
+    assert calendar_rows(model) == live
+    days = {(h, d) for h, d in execute(model, 'SELECT habitId, completionDate FROM habit_completions')}
+    assert {(h, str(d)) for h in habits for y in (2023, 2024, 2025)
+            for d in calendar.completion_dates(model.completion_calendar(h, y), y)} == days
+
+def test_completion_rate_spans_years(model):
+    habit_id = model.create_habit(1, "run")
+    complete(model, habit_id, '2024-12-30', '2024-12-31', '2025-01-01', '2025-01-05', '2025-01-10')
+    assert model.completion_rate(habit_id, 10, '2025-01-05') == pytest.approx(0.4)
+    assert model.completed_days(habit_id, date(2024, 1, 1), date(2025, 12, 31)) == 5
+    assert model.completion_rate(habit_id, 7, '2024-06-01') == 0
+    with pytest.raises(ValueError):
+        model.completion_rate(habit_id, 0)
+
+def test_calendar_endpoint(model, monkeypatch):
+    import controllers.habit_controller as controller
+    monkeypatch.setattr(controller, 'habit_model', model)
+    habit_id = model.create_habit(1, "stretch")
+    complete(model, habit_id, '2025-01-01', '2025-02-01')
+    client = sign_in(controller.app.test_client(), monkeypatch, model.db_path, 1)
+    body = client.get(f'/habits/{habit_id}/calendar?year=2025').get_json()
+    assert (body['days'], body['completedDays']) == (365, 2)
+    raw = calendar.decode(body['bitmap']).to_bytes(calendar.CALENDAR_BYTES, 'little')
+    assert raw[0] == 1 and raw[31 // 8] >> (31 % 8) & 1
+    assert client.get(f'/habits/{habit_id}/calendar?year=0').status_code == 400
@@ -0,0 +1,101 @@
+# File: tests/Backend/B-49.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for bulk and backfilled habit check-ins.
+#   Verifies: A batch records new days, reports duplicates and invalid items per item,
+#   returns refreshed streaks, rejects other users' habits, and migration 11 removes
+#   duplicate completions before making (habitId, completionDate) unique.
+#   Test Case: B-49 bulk habit check-ins
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from datetime import datetime, timedelta
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.habitmodel import HabitModel, MAX_CHECK_INS
+from models.authmanager import AuthManager
+from controllers import auth_middleware
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield HabitModel(db_path)
+    close_pool(db_path)
+
+def day(offset):
+    return (datetime.utcnow().date() - timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+def sign_in(client, monkeypatch, db_path, user_id):
+    """Send a bearer token for user_id with every request; services validate it against db_path."""
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                   (f'test-token-{user_id}', user_id))
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer test-token-{user_id}'
+    return client
+
+def test_bulk_backfill(model):
+    read = model.create_habit(1, "read")
+    run = model.create_habit(1, "run")
+    assert model.habit_check_in(read) is True
+    # A week queued offline, newest first, with a repeat and some bad items
+    week = [{'habitId': read, 'date': day(d)} for d in range(6, -1, -1)]
+    items = week[::-1] + [{'habitId': run, 'date': day(1)}, {'habitId': read, 'date': day(3)},
+                          {'habitId': 999, 'date': day(0)}, {'habitId': run, 'date': '2025/01/01'},
+                          {'habitId': run, 'date': day(-5)}]
+    results, streaks = model.check_in_many(items)
+    assert [r.get('status', r.get('error')) for r in results] == (
+        ['duplicate'] + ['recorded'] * 6 + ['recorded', 'duplicate',
+                                            'Habit not found', 'Invalid date format', 'Date is in the future'])
+    assert results[0] == {'habitId': read, 'date': day(0), 'status': 'duplicate'}
+    assert streaks == {
+        read: {'currentStreak': 7, 'longestStreak': 7, 'lastCompletionDate': day(0)},
+        run: {'currentStreak': 1, 'longestStreak': 1, 'lastCompletionDate': day(1)},
+    }
+    # Replaying the same sync changes nothing
+    again, _ = model.check_in_many(week)
+    assert {r['status'] for r in again} == {'duplicate'}
+    assert model.habit_check_in(read) is False
+
+def test_other_users_habit_rejected(model):
+    theirs = model.create_habit(2, "read")
+    results, streaks = model.check_in_many([{'habitId': theirs, 'date': day(0)}], user_id=1)
+    assert results == [{'habitId': theirs, 'date': day(0), 'error': 'Habit not found'}]
+    assert streaks == {}
+    with pytest.raises(ValueError):
+        model.check_in_many([{'habitId': theirs, 'date': day(0)}] * (MAX_CHECK_INS + 1))
+
+def test_endpoint(model, monkeypatch):
+    import controllers.habit_controller as controller
+    monkeypatch.setattr(controller, 'habit_model', model)
+    habit_id = model.create_habit(1, "stretch")
+    client = sign_in(controller.app.test_client(), monkeypatch, model.db_path, 1)
+    body = client.post('/habits/check-ins', json={'userId': 1, 'checkIns': [
+        {'habitId': habit_id, 'date': day(1)}, {'habitId': habit_id, 'date': day(0)}]}).get_json()
+    assert [r['status'] for r in body['results']] == ['recorded', 'recorded']
+    assert body['streaks'] == [{'habitId': habit_id, 'currentStreak': 2, 'longestStreak': 2,
+                                'lastCompletionDate': day(0)}]
+    assert client.post('/habits/check-ins', json={'checkIns': 'nope'}).status_code == 400
+
+def test_migration_removes_duplicates(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate(target=10)
+        db.execute("INSERT INTO habits (userId, habitName) VALUES (1, 'read')")
+        db.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (1, ?)',
+                       [(day(1),), (day(0),), (day(0),)])
+        db.commit()
+        MigrationRunner(db).migrate()
+        assert db.execute('SELECT completionId, completionDate FROM habit_completions').fetchall() == [
+            (1, day(1)), (2, day(0))]
+        assert db.execute('SELECT currentStreak, longestStreak FROM habits').fetchone() == (2, 2)
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute('INSERT INTO habit_completions (habitId, completionDate) VALUES (1, ?)', (day(0),))
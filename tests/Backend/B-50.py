@@ -0,0 +1,122 @@
+# File: tests/Backend/B-50.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for habit analytics.
+#   Verifies: Rolling 7/30/90-day completion rates (including young habits and backfills),
+#   best weekday, trend slope, streaks and per-category totals match values computed by hand,
+#   and the cache is reused until a new completion or a habit edit.
+#   Test Case: B-50 habit analytics
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from datetime import date, timedelta
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models.habitmodel import HabitModel
+from models.authmanager import AuthManager
+from controllers import auth_middleware
+
+AS_OF = date(2026, 3, 31)  # a Tuesday
+
+@pytest.fixture
+def model(tmp_path):
+    db_path = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    yield HabitModel(db_path)
+    close_pool(db_path)
+
+def complete(model, habit_id, offsets):
+    with model._get_conn() as conn:
+        conn.executemany('INSERT INTO habit_completions (habitId, completionDate) VALUES (?, ?)',
+                         [(habit_id, str(AS_OF - timedelta(days=o))) for o in offsets])
+
+def slope(days, n):
+    """Reference least-squares slope per week for completed day positions 0..n-1."""
+    xs = range(n)
+    ys = [1 if x in days else 0 for x in xs]
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    return 7 * sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+
+
+def sign_in(client, monkeypatch, db_path, user_id):
+    """Send a bearer token for user_id with every request; services validate it against db_path."""
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                   (f'test-token-{user_id}', user_id))
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer test-token-{user_id}'
+    return client
+
+def test_habit_and_category_analytics(model):
+    read = model.create_habit(1, "read", category="learning", start_date="2025-01-01")
+    write = model.create_habit(1, "write", category="learning", start_date="2025-01-01")
+    young = model.create_habit(1, "yoga", category="health", start_date=str(AS_OF - timedelta(days=9)))
+    model.create_habit(2, "other", category="learning", start_date="2025-01-01")
+    # read: every day of the last 20, plus every Monday before that and one day past the window
+    read_days = list(range(20)) + [o for o in range(20, 90) if (AS_OF - timedelta(days=o)).weekday() == 0] + [120]
+    complete(model, read, read_days)
+    complete(model, write, [60, 61, 62])
+    # yoga started 9 days ago, one completion backfilled before that
+    complete(model, young, [0, 2, 12])
+
+    result = model.analytics(1, as_of=str(AS_OF))
+    habits = {h['habitName']: h for h in result['habits']}
+    assert list(habits) == ['read', 'write', 'yoga']
+
+    in_90 = [o for o in read_days if o < 90]
+    assert habits['read']['completionRate'] == {
+        '7d': 1.0, '30d': round(len([o for o in in_90 if o < 30]) / 30, 4), '90d': round(len(in_90) / 90, 4)}
+    assert habits['read']['bestWeekday'] == 'Monday'
+    assert habits['read']['trend'] == pytest.approx(slope({89 - o for o in in_90}, 90), abs=1e-4)
+    assert habits['read']['longestStreak'] == 20
+
+    assert habits['write']['completionRate'] == {'7d': 0.0, '30d': 0.0, '90d': round(3 / 90, 4)}
+    assert habits['write']['trend'] < 0
+
+    # 13 days of history: 7/13 days in the 30- and 90-day windows
+    assert habits['yoga']['completionRate'] == {'7d': round(2 / 7, 4), '30d': round(3 / 13, 4),
+                                                '90d': round(3 / 13, 4)}
+    assert habits['yoga']['trend'] == pytest.approx(slope({12, 10, 0}, 13), abs=1e-4)
+
+    learning, = [c for c in result['categories'] if c['category'] == 'learning']
+    assert learning['habits'] == 2
+    assert learning['completionRate']['90d'] == round((len(in_90) + 3) / 180, 4)
+    assert learning['longestStreak'] == 20
+    assert learning['bestWeekday'] == 'Monday'
+    assert learning['trend'] == pytest.approx((habits['read']['trend'] + habits['write']['trend']) / 2, abs=1e-4)
+
+def test_habit_without_history(model):
+    model.create_habit(1, "later", start_date=str(AS_OF + timedelta(days=3)))
+    habit, = model.analytics(1, as_of=str(AS_OF))['habits']
+    assert habit['completionRate'] == {'7d': None, '30d': None, '90d': None}
+    assert (habit['bestWeekday'], habit['trend']) == (None, None)
+    assert model.analytics(99) == {'asOf': model.analytics(99)['asOf'], 'habits': [], 'categories': []}
+    with pytest.raises(ValueError):
+        model.analytics(1, as_of='31/03/2026')
+
+def test_cache_keyed_by_last_completion(model):
+    habit_id = model.create_habit(1, "read", start_date="2026-01-01")
+    complete(model, habit_id, [1])
+    first = model.analytics(1, as_of=str(AS_OF))
+    assert model.analytics(1, as_of=str(AS_OF)) is first
+    complete(model, habit_id, [0])
+    second = model.analytics(1, as_of=str(AS_OF))
+    assert second['habits'][0]['completionRate']['7d'] == round(2 / 7, 4)
+    model.update_habit(habit_id, category='learning')
+    assert model.analytics(1, as_of=str(AS_OF))['categories'][0]['category'] == 'learning'
+
+def test_endpoint(model, monkeypatch):
+    import controllers.habit_controller as controller
+    monkeypatch.setattr(controller, 'habit_model', model)
+    model.create_habit(1, "read")
+    client = sign_in(controller.app.test_client(), monkeypatch, model.db_path, 1)
+    body = client.get('/habits/analytics?userId=1').get_json()
+    assert [h['habitName'] for h in body['analytics']['habits']] == ['read']
+    assert client.get('/habits/analytics').status_code == 400
+    assert client.get('/habits/analytics?userId=1&asOf=bad').status_code == 400
@@ -0,0 +1,151 @@
+# File: tests/Backend/B-51.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the bcrypt worker pool.
+#   Verifies: Hashes made in worker processes verify, a full pool rejects at once with
+#   HashPoolBusy (503 from the auth service) while /health still answers, and the
+#   metrics count admitted/rejected jobs and time queue wait and hashing. A job whose
+#   caller timed out keeps its slot until it finishes.
+#   Test Case: B-51 bounded password hashing pool
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import threading
+import time
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models import hashpool
+from models.authmanager import AuthManager
+from models.hashpool import HashPool, HashPoolBusy
+
+@pytest.fixture
+def pool():
+    pool = HashPool(workers=1, max_queue=1)
+    old = hashpool.set_hash_pool(pool)
+    yield pool
+    hashpool.set_hash_pool(old)
+    pool.shutdown()
+
+def test_hash_and_verify_in_workers(pool):
+    hashed = pool.hash(b'Secret#123')
+    assert hashed.startswith(b'$2')
+    assert pool.verify(b'Secret#123', hashed) is True
+    assert pool.verify(b'wrong', hashed) is False
+    stats = pool.stats()
+    assert (stats['admitted'], stats['rejected'], stats['failed'], stats['inFlight']) == (3, 0, 0, 0)
+    assert stats['hashTime']['avgMs'] > 0
+    with pytest.raises(ValueError):
+        pool.verify(b'x', b'not a hash')
+    assert pool.stats()['failed'] == 1
+
+def test_full_pool_rejects_immediately(pool):
+    hashed = pool.hash(b'Secret#123')
+    # Hold both slots, as two slow hashes would
+    for _ in range(pool.capacity):
+        pool._slots.acquire()
+    try:
+        with pytest.raises(HashPoolBusy):
+            pool.verify(b'Secret#123', hashed)
+    finally:
+        for _ in range(pool.capacity):
+            pool._slots.release()
+    assert pool.stats()['rejected'] == 1
+    assert pool.verify(b'Secret#123', hashed) is True
+
+def test_concurrent_burst_is_bounded(pool):
+    hashed = pool.hash(b'Secret#123')
+    outcomes = []
+    def attempt():
+        try:
+            outcomes.append(pool.verify(b'Secret#123', hashed))
+        except HashPoolBusy:
+            outcomes.append('busy')
+    threads = [threading.Thread(target=attempt) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert outcomes.count(True) >= 1 and outcomes.count('busy') >= 1
+    assert outcomes.count(True) + outcomes.count('busy') == 8
+    assert pool.stats()['queueWait']['maxMs'] >= 0
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes():
+    pool = HashPool(workers=1, max_queue=0, timeout=0.01)
+    try:
+        # The first job also waits for the worker to spawn, so it outlives the timeout
+        with pytest.raises(TimeoutError):
+            pool.hash(b'Secret#123')
+        with pytest.raises(HashPoolBusy):
+            pool.hash(b'Secret#123')
+        deadline = time.monotonic() + 30
+        while pool.stats()['inFlight'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.stats()['inFlight'] == 0
+        pool.timeout = 30
+        assert pool.hash(b'Secret#123').startswith(b'$2')
+    finally:
+        pool.shutdown()
+
+def test_auth_service_returns_503_when_saturated(pool, tmp_path, monkeypatch):
+    import controllers.auth_controller as controller
+    db_path = str(tmp_path / "auth.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    monkeypatch.setattr(controller, 'auth_manager', AuthManager(db_path))
+    controller.auth_manager.register_user('someone', 'pw')
+    client = controller.app.test_client()
+    for _ in range(pool.capacity):
+        pool._slots.acquire()
+    try:
+        response = client.post('/auth/login', json={'username': 'someone', 'password': 'pw'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.get('/health').status_code == 200
+    finally:
+        for _ in range(pool.capacity):
+            pool._slots.release()
+    assert client.get('/auth/hash-pool/stats').get_json()['hashPool']['rejected'] == 1
+    assert client.post('/auth/login', json={'username': 'someone', 'password': 'pw'}).status_code == 200
+    close_pool(db_path)
+
+class BlockedPool:
+    """Hash pool stand-in whose verifications wait until released, like a saturated pool."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.waiting = threading.Semaphore(0)
+    def verify(self, password, hashed):
+        self.waiting.release()
+        self.release.wait(10)
+        return True
+
+def test_waiting_logins_hold_no_connections(tmp_path):
+    db_path = str(tmp_path / "auth.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+    old = hashpool.set_hash_pool(HashPool(workers=0))
+    auth = AuthManager(db_path, token_cache_mode='off')
+    auth.register_user('storm', 'pw')
+    token = auth.login('storm', 'pw')
+    blocked = BlockedPool()
+    hashpool.set_hash_pool(blocked)
+    # More logins waiting on bcrypt than the connection pool has connections
+    threads = [threading.Thread(target=auth.login, args=('storm', 'pw')) for _ in range(12)]
+    try:
+        for t in threads:
+            t.start()
+        for _ in threads:
+            assert blocked.waiting.acquire(timeout=5)
+        started = time.perf_counter()
+        assert auth.validate_token(token)
+        assert time.perf_counter() - started < 1
+    finally:
+        blocked.release.set()
+        for t in threads:
+            t.join()
+        hashpool.set_hash_pool(old)
+        close_pool(db_path)
@@ -0,0 +1,123 @@
+# File: tests/Backend/B-52.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the token validation cache.
+#   Verifies: Entries expire after their TTL, cached tokens never outlive their own expiry,
+#   logout() and login() invalidate at once, a logout in another process reaches the cache
+#   through auth_token_revocations, and the stats endpoint reports the hit rate.
+#   Test Case: B-52 token validation cache
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from models import cache as cache_module
+from models import hashpool
+from models.authmanager import AuthManager, AuthError
+from models.cache import LRUCache, MISS
+from models.hashpool import HashPool
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "auth.db")
+    with sqlite3.connect(path) as db:
+        MigrationRunner(db).migrate()
+    old = hashpool.set_hash_pool(HashPool(workers=0))
+    yield path
+    hashpool.set_hash_pool(old)
+    close_pool(path)
+
+def delete_behind_cache(db_path, sql, params):
+    with sqlite3.connect(db_path) as db:
+        db.execute(sql, params)
+
+def test_cache_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(ttl=10)
+    cache.put('a', 1)
+    cache.put('b', 2, ttl=30)
+    cache.put('c', 3, ttl=0)    # already expired, never stored
+    now[0] += 11
+    assert cache.get('a') is MISS and cache.get('b') == 2 and cache.get('c') is MISS
+    assert cache.stats()['expirations'] == 1 and cache.stats()['entries'] == 1
+
+def test_cached_token_skips_database_until_logout(db_path):
+    auth = AuthManager(db_path, token_cache_mode='local')
+    auth.register_user('cached', 'pw')
+    token = auth.login('cached', 'pw')
+    user_id = auth.validate_token(token)
+    # Deleted behind the cache: 'local' mode keeps answering from memory
+    delete_behind_cache(db_path, 'DELETE FROM auth_tokens WHERE token=?', (token,))
+    assert auth.validate_token(token) == user_id
+    assert auth.token_cache_stats()['hits'] == 1
+    auth.logout(token)
+    with pytest.raises(AuthError):
+        auth.validate_token(token)
+
+def test_login_invalidates_older_tokens(db_path):
+    auth = AuthManager(db_path)
+    auth.register_user('relogin', 'pw')
+    first = auth.login('relogin', 'pw')
+    auth.validate_token(first)
+    second = auth.login('relogin', 'pw')
+    with pytest.raises(AuthError):
+        auth.validate_token(first)
+    assert auth.validate_token(second)
+
+def test_entry_never_outlives_token_expiry(db_path):
+    auth = AuthManager(db_path)
+    auth.register_user('shortlived', 'pw')
+    token = auth.login('shortlived', 'pw')
+    expires = (datetime.utcnow() + timedelta(seconds=5)).strftime('%Y-%m-%d %H:%M:%S')
+    delete_behind_cache(db_path, 'UPDATE auth_tokens SET expires_at=? WHERE token=?', (expires, token))
+    auth.validate_token(token)
+    assert auth.token_cache._entries[token][2] - time.monotonic() <= 5
+    assert auth.token_cache_stats()['ttl'] == 60
+
+def test_logout_in_another_process_reaches_shared_cache(db_path):
+    worker_a = AuthManager(db_path, token_cache_mode='shared')
+    worker_b = AuthManager(db_path, token_cache_mode='shared')
+    worker_a.register_user('multi', 'pw')
+    token = worker_a.login('multi', 'pw')
+    user_id = worker_a.validate_token(token)
+    assert worker_a.validate_token(token) == user_id    # cached, no poll due yet
+    worker_b.logout(token)
+    worker_a._last_sync = 0.0    # the next poll is due
+    with pytest.raises(AuthError):
+        worker_a.validate_token(token)
+    assert worker_a.token_cache_stats()['revocationsSeen'] == 1
+    with sqlite3.connect(db_path) as db:
+        # Tokens that had expired anyway are not logged
+        db.execute("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES ('stale', 1, '2000-01-01 00:00:00')")
+        db.execute("DELETE FROM auth_tokens WHERE token='stale'")
+        assert db.execute('SELECT COUNT(*) FROM auth_token_revocations').fetchone()[0] == 1
+
+def test_token_cache_stats_endpoint(db_path, monkeypatch):
+    import controllers.auth_controller as controller
+    monkeypatch.setattr(controller, 'auth_manager', AuthManager(db_path))
+    client = controller.app.test_client()
+    controller.auth_manager.register_user('stats', 'pw')
+    token = client.post('/auth/login', json={'username': 'stats', 'password': 'pw'}).get_json()['token']
+    for _ in range(4):
+        assert client.post('/auth/validate', json={'token': token}).status_code == 200
+    stats = client.get('/auth/token-cache/stats').get_json()['tokenCache']
+    assert stats['mode'] == 'shared'
+    assert (stats['hits'], stats['misses'], stats['hitRate']) == (3, 1, 0.75)
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        AuthManager('unused.db', token_cache_mode='sometimes')
@@ -0,0 +1,97 @@
+# File: tests/Backend/B-53.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the expired token sweeper.
+#   Verifies: expiresEpoch is filled for every way a token is written, the sweep deletes
+#   expired auth tokens and expired or used reset tokens in bounded batches and keeps
+#   live ones, and the background thread reports rows reclaimed per run.
+#   Test Case: B-53 expired token sweeper
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import time
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from database.maintenance import sweep_expired_tokens
+from models import hashpool
+from models.authmanager import AuthManager, AuthError
+from models.hashpool import HashPool
+from models.tokensweeper import TokenSweeper
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+PAST = '2000-01-01 00:00:00'
+FUTURE = '2999-01-01 00:00:00'
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "sweep.db")
+    with sqlite3.connect(path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany('INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, 1, ?)',
+                       [(f'old-{i}', PAST) for i in range(25)] + [('live', FUTURE)])
+        db.executemany('INSERT INTO password_reset_tokens (token, user_id, expires_at, used) VALUES (?, 1, ?, ?)',
+                       [('reset-old', PAST, 0), ('reset-used', FUTURE, 1), ('reset-live', FUTURE, 0)])
+    old = hashpool.set_hash_pool(HashPool(workers=0))
+    yield path
+    hashpool.set_hash_pool(old)
+    close_pool(path)
+
+def remaining(db_path, table):
+    with sqlite3.connect(db_path) as db:
+        return sorted(row[0] for row in db.execute(f'SELECT token FROM {table}'))
+
+def test_expiry_epoch_follows_expires_at(db_path):
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT expiresEpoch FROM auth_tokens WHERE token='old-0'").fetchone()[0] == 946684800
+        db.execute("UPDATE auth_tokens SET expires_at='2000-01-02 00:00:00' WHERE token='old-0'")
+        assert db.execute("SELECT expiresEpoch FROM auth_tokens WHERE token='old-0'").fetchone()[0] == 946771200
+    auth = AuthManager(db_path)
+    auth.register_user('epoch', 'pw')
+    token = auth.login('epoch', 'pw')
+    with sqlite3.connect(db_path) as db:
+        expires = db.execute('SELECT expiresEpoch FROM auth_tokens WHERE token=?', (token,)).fetchone()[0]
+    assert 3500 < expires - time.time() <= 3600
+    with pytest.raises(AuthError, match='expired'):
+        auth.validate_token('old-1')
+
+def test_sweep_deletes_in_bounded_batches(db_path):
+    with sqlite3.connect(db_path) as db:
+        commits = []
+        db.set_trace_callback(lambda sql: commits.append(sql) if sql == 'COMMIT' else None)
+        reclaimed = sweep_expired_tokens(db, batch_size=10)
+    assert reclaimed == {'auth_tokens': 25, 'password_reset_tokens': 2, 'auth_token_denylist': 0, 'auth_rate_limits': 0}
+    # One transaction per batch: 10 + 10 + 5 auth tokens, then one per other condition
+    assert len(commits) == 7
+    assert remaining(db_path, 'auth_tokens') == ['live']
+    assert remaining(db_path, 'password_reset_tokens') == ['reset-live']
+    # Expired tokens are not logged as revocations
+    with sqlite3.connect(db_path) as db:
+        assert db.execute('SELECT COUNT(*) FROM auth_token_revocations').fetchone()[0] == 0
+        assert sweep_expired_tokens(db) == {'auth_tokens': 0, 'password_reset_tokens': 0, 'auth_token_denylist': 0, 'auth_rate_limits': 0}
+
+def test_background_sweeper_reports_runs(db_path):
+    sweeper = TokenSweeper(db_path, interval=60, pause=0)
+    sweeper.start()
+    try:
+        deadline = time.time() + 5
+        while sweeper.stats()['runs'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        sweeper.stop()
+    stats = sweeper.stats()
+    assert stats['running'] is False and stats['runs'] == 1 and stats['totalReclaimed'] == 27
+    assert stats['lastRun']['reclaimed'] == {'auth_tokens': 25, 'password_reset_tokens': 2, 'auth_token_denylist': 0, 'auth_rate_limits': 0}
+    disabled = TokenSweeper(db_path, interval=0)
+    disabled.start()
+    assert disabled.stats()['running'] is False
+    assert sweeper.sweep() == {'auth_tokens': 0, 'password_reset_tokens': 0, 'auth_token_denylist': 0, 'auth_rate_limits': 0}
@@ -0,0 +1,130 @@
+# File: tests/Backend/B-54.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for signed session tokens.
+#   Verifies: Signed tokens validate without querying the database, tampered or expired
+#   ones are rejected, logout and a new login revoke them in every process through the
+#   persisted deny-list, rotated keys keep verifying, and opaque tokens still work.
+#   Test Case: B-54 signed session tokens
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+import time
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool, get_pool
+from database.maintenance import sweep_expired_tokens
+from models import hashpool
+from models.authmanager import AuthManager, AuthError
+from models.hashpool import HashPool
+from models.signedtokens import SignedTokens
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "signed.db")
+    with sqlite3.connect(path) as db:
+        MigrationRunner(db).migrate()
+    old = hashpool.set_hash_pool(HashPool(workers=0))
+    AuthManager(path).register_user('signer', 'pw')
+    yield path
+    hashpool.set_hash_pool(old)
+    close_pool(path)
+
+def test_signed_token_validates_in_memory(db_path):
+    auth = AuthManager(db_path, token_kind='signed')
+    token = auth.login('signer', 'pw')
+    assert token.startswith('s1.')
+    user_id = auth.validate_token(token)
+    statements = []
+    get_pool(db_path).add_connect_hook(lambda conn: conn.set_trace_callback(statements.append))
+    for _ in range(50):
+        assert auth.validate_token(token) == user_id
+    assert statements == []
+    with sqlite3.connect(db_path) as db:
+        assert db.execute('SELECT COUNT(*) FROM auth_tokens').fetchone()[0] == 0
+
+def test_tampered_and_expired_tokens_are_rejected(db_path):
+    auth = AuthManager(db_path, token_kind='signed')
+    token = auth.login('signer', 'pw')
+    user_id = auth.validate_token(token)
+    parts = token.split('.')
+    forged = '.'.join(parts[:1] + [str(user_id + 1)] + parts[2:])
+    for bad in (forged, token[:-2] + 'xx', 's1.garbage', token.replace('.', '', 1)):
+        with pytest.raises(AuthError):
+            auth.validate_token(bad)
+    expired = auth.signed_tokens.issue(user_id, time.time() - 1)
+    with pytest.raises(AuthError, match='expired'):
+        auth.validate_token(expired)
+
+def test_logout_and_relogin_revoke_across_processes(db_path):
+    worker_a = AuthManager(db_path, token_kind='signed')
+    worker_b = AuthManager(db_path, token_kind='signed')
+    first = worker_a.login('signer', 'pw')
+    assert worker_b.validate_token(first)
+    second = worker_a.login('signer', 'pw')    # ends the first session
+    with pytest.raises(AuthError):
+        worker_a.validate_token(first)
+    worker_b.signed_tokens._last_sync = 0.0    # the next poll is due
+    with pytest.raises(AuthError):
+        worker_b.validate_token(first)
+    worker_b.logout(second)
+    worker_a.signed_tokens._last_sync = 0.0
+    with pytest.raises(AuthError):
+        worker_a.validate_token(second)
+    # A fresh process loads the persisted deny-list
+    with pytest.raises(AuthError):
+        AuthManager(db_path).validate_token(second)
+    with sqlite3.connect(db_path) as db:
+        assert sweep_expired_tokens(db, now=int(time.time()) + 15 * 24 * 3600)['auth_token_denylist'] == 3
+
+def test_keys_rotate_and_retired_keys_still_verify(db_path):
+    auth = AuthManager(db_path, token_kind='signed')
+    other = SignedTokens(db_path)
+    old_token = other.issue(1, time.time() + 60)
+    old_key = other.stats()['activeKeyId']
+    auth.signed_tokens.rotate_key()
+    new_token = auth.signed_tokens.issue(2, time.time() + 60)
+    assert auth.signed_tokens.stats()['activeKeyId'] == old_key + 1
+    with sqlite3.connect(db_path) as db:
+        assert db.execute('SELECT retiredAt FROM auth_signing_keys WHERE keyId=?', (old_key,)).fetchone()[0]
+    # other still holds the old key as active; it learns the new key on first sight
+    assert other.verify(new_token) == 2
+    # Ids far past the newest key are rejected without a reload
+    forged = new_token.replace(f'.{old_key + 1}.', f'.{old_key + 50}.')
+    with pytest.raises(ValueError):
+        other.verify(forged)
+    assert max(other._keys) == old_key + 1
+    assert auth.validate_token(old_token) == 1
+
+def test_alternating_forged_key_ids_reload_keys_once_each(db_path):
+    tokens = SignedTokens(db_path)
+    token = tokens.issue(1, time.time() + 60)
+    key_id = tokens.stats()['activeKeyId']
+    forged = [token.replace(f'.{key_id}.', f'.{key_id + step}.') for step in (1, 2)]
+    reloads = []
+    get_pool(db_path).add_connect_hook(lambda conn: conn.set_trace_callback(
+        lambda sql: reloads.append(sql) if 'auth_signing_keys' in sql else None))
+    for _ in range(20):
+        for bad in forged:
+            with pytest.raises(ValueError):
+                tokens.verify(bad)
+    assert len(reloads) == 2
+
+def test_opaque_tokens_still_work_in_signed_mode(db_path):
+    opaque = AuthManager(db_path).login('signer', 'pw')
+    signed = AuthManager(db_path, token_kind='signed')
+    assert signed.validate_token(opaque)
+    stats = signed.token_cache_stats()
+    assert stats['tokenKind'] == 'signed' and stats['signedTokens']['verified'] == 0
+    with pytest.raises(ValueError):
+        AuthManager(db_path, token_kind='jwt')
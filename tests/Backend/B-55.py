@@ -0,0 +1,157 @@
+# File: tests/Backend/B-55.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the shared authentication middleware.
+#   Verifies: Requests without a valid bearer token get 401, /health stays open, a userId
+#   in the query string, JSON body or URL must match the token's user (403 otherwise), the
+#   token is validated once per request, the time spent is reported in Server-Timing
+#   and auth_stats(), and transactions, goals and habits of other users answer 404.
+#   Test Case: B-55 authentication middleware
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from flask import Flask, jsonify
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from controllers import auth_middleware, budget_controller, habit_controller
+from controllers.auth_middleware import require_auth, auth_stats, current_user_id
+from models.authmanager import AuthManager
+from models.budgetmodel import BudgetModel
+from models.habitmodel import HabitModel
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "auth.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, ?)",
+                       [('alice-token', 1, '2999-01-01 00:00:00'),
+                        ('expired-token', 1, '2000-01-01 00:00:00')])
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+
+    app = Flask(__name__)
+    require_auth(app)
+
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'ok'})
+
+    @app.route('/whoami', methods=['GET', 'POST'])
+    def whoami():
+        return jsonify({'userId': current_user_id()})
+
+    @app.route('/users/<int:user_id>/streak')
+    def streak(user_id):
+        return jsonify({'userId': user_id})
+
+    yield app.test_client()
+    close_pool(db_path)
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def test_missing_or_invalid_token_is_rejected(client):
+    resp = client.get('/whoami')
+    assert resp.status_code == 401 and resp.headers['WWW-Authenticate'] == 'Bearer'
+    assert resp.get_json() == {'success': False, 'error': 'Missing bearer token'}
+    for headers in (bearer('nope'), bearer('expired-token'), {'Authorization': 'Basic alice-token'}):
+        assert client.get('/whoami', headers=headers).status_code == 401
+    assert client.get('/health').status_code == 200
+
+def test_principal_is_available_to_views(client):
+    resp = client.get('/whoami', headers=bearer('alice-token'))
+    assert resp.status_code == 200 and resp.get_json() == {'userId': 1}
+    assert resp.headers['Server-Timing'].startswith('auth;dur=')
+
+def test_user_id_must_match_token(client):
+    headers = bearer('alice-token')
+    assert client.get('/whoami?userId=1', headers=headers).status_code == 200
+    assert client.get('/whoami?userId=2', headers=headers).status_code == 403
+    assert client.post('/whoami', json={'userId': 1}, headers=headers).status_code == 200
+    resp = client.post('/whoami', json={'userId': 2}, headers=headers)
+    assert resp.status_code == 403 and resp.get_json()['error'] == 'userId does not match the signed-in user'
+    assert client.get('/users/1/streak', headers=headers).status_code == 200
+    assert client.get('/users/2/streak', headers=headers).status_code == 403
+
+def test_token_validated_once_per_request(client, monkeypatch):
+    manager = auth_middleware.get_auth_manager()
+    calls = []
+    validate = manager.validate_token
+    monkeypatch.setattr(manager, 'validate_token', lambda token: calls.append(token) or validate(token))
+    for _ in range(3):
+        client.post('/whoami?userId=1', json={'userId': 1}, headers=bearer('alice-token'))
+    client.get('/whoami')
+    client.get('/health')
+    assert calls == ['alice-token'] * 3
+    stats = auth_stats(client.application)
+    assert (stats['requests'], stats['rejected']) == (4, 1)
+    assert stats['maxMs'] >= stats['avgMs'] > 0
+
+@pytest.fixture
+def owned(tmp_path, monkeypatch):
+    """Budget and habit services on one database holding a transaction, goal and habit of user 2."""
+    db_path = str(tmp_path / "owned.db")
+    with sqlite3.connect(db_path) as db:
+        MigrationRunner(db).migrate()
+        db.executemany("INSERT INTO auth_tokens (token, user_id, expires_at) VALUES (?, ?, '2999-01-01 00:00:00')",
+                       [('alice-token', 1), ('bob-token', 2)])
+    monkeypatch.setattr(auth_middleware, '_auth_manager', AuthManager(db_path))
+    budget, habits = BudgetModel(db_path), HabitModel(db_path)
+    monkeypatch.setattr(budget_controller, 'budget_model', budget)
+    monkeypatch.setattr(habit_controller, 'habit_model', habits)
+    ids = {
+        'transaction': budget.add_transaction('rent', 900.0, 'housing', 'expense', 2),
+        'goal': budget.create_savings_goal(2, 'car', 5000),
+        'habit': habits.create_habit(2, 'run'),
+    }
+    yield budget_controller.app.test_client(), habit_controller.app.test_client(), ids
+    close_pool(db_path)
+
+def test_transactions_of_other_users_are_not_found(owned):
+    budget, _, ids = owned
+    path = f"/transactions/{ids['transaction']}"
+    for method, kwargs in (('get', {}), ('put', {'json': {'amount': 1.0}}), ('delete', {})):
+        resp = getattr(budget, method)(path, headers=bearer('alice-token'), **kwargs)
+        assert resp.status_code == 404, method
+        assert resp.get_json()['error'] == 'Transaction not found'
+    resp = budget.get(path, headers=bearer('bob-token'))
+    assert resp.status_code == 200 and resp.get_json()['transaction']['amount'] == 900.0
+    assert budget.delete(path, headers=bearer('bob-token')).status_code == 200
+
+def test_goals_of_other_users_are_not_found(owned):
+    budget, _, ids = owned
+    path = f"/savings/goal/{ids['goal']}"
+    for method, url in (('get', path), ('get', f'{path}/transactions'), ('delete', path)):
+        assert getattr(budget, method)(url, headers=bearer('alice-token')).status_code == 404, url
+    resp = budget.post('/savings/contribute', json={'goalId': ids['goal'], 'amount': 10},
+                       headers=bearer('alice-token'))
+    assert resp.status_code == 400 and resp.get_json()['error'] == 'Goal not found'
+    resp = budget.post('/savings/contribute/batch', json={'contributions': [{'goalId': ids['goal'], 'amount': 10}]},
+                       headers=bearer('alice-token'))
+    assert resp.get_json()['results'] == [{'goalId': ids['goal'], 'error': 'Goal not found'}]
+    resp = budget.get(path, headers=bearer('bob-token'))
+    assert resp.status_code == 200 and resp.get_json()['goal']['currentAmount'] == 0
+    assert budget.get(f'{path}/transactions', headers=bearer('bob-token')).get_json()['transactions'] == []
+
+def test_habits_of_other_users_are_not_found(owned):
+    _, habits, ids = owned
+    path = f"/habits/{ids['habit']}"
+    for method, url, kwargs in (('put', path, {'json': {'habitName': 'walk'}}), ('delete', path, {}),
+                                ('post', f'{path}/check-in', {}), ('get', f'{path}/streak', {}),
+                                ('get', f'{path}/calendar', {})):
+        resp = getattr(habits, method)(url, headers=bearer('alice-token'), **kwargs)
+        assert resp.status_code == 404, url
+        assert resp.get_json()['error'] == 'Habit not found'
+    assert habits.post(f'{path}/check-in', headers=bearer('bob-token')).status_code == 201
+    assert habits.get(f'{path}/streak', headers=bearer('bob-token')).get_json()['streak'] == 1
@@ -0,0 +1,156 @@
+# File: tests/Backend/B-56.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the login and registration rate limiter.
+#   Verifies: Buckets allow a burst then refill at their rate, IP and username are limited
+#   separately and a rejected attempt charges neither, refilled buckets are evicted, sqlite mode shares buckets between workers,
+#   and /auth/login answers 429 with Retry-After before any bcrypt work.
+#   Test Case: B-56 login rate limiter
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import sqlite3
+from database.migrations import MigrationRunner
+from database.connection_pool import close_pool
+from database.maintenance import sweep_expired_tokens
+from models import hashpool
+from models import ratelimiter as ratelimiter_module
+from models.authmanager import AuthManager
+from models.hashpool import HashPool
+from models.ratelimiter import RateLimiter, RateLimited
+from models.errorlog import configure_logging
+
+@pytest.fixture(autouse=True)
+def error_log(tmp_path):
+    # Auth failures are logged; keep them out of the repository's logs/errors.log
+    return configure_logging(path=str(tmp_path / "errors.log"))
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "limits.db")
+    with sqlite3.connect(path) as db:
+        MigrationRunner(db).migrate()
+    yield path
+    close_pool(path)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000000.0]
+    monkeypatch.setattr(ratelimiter_module.time, 'time', lambda: now[0])
+    monkeypatch.setattr(ratelimiter_module.time, 'monotonic', lambda: now[0])
+    return now
+
+def attempts(limiter, n, ip='10.0.0.1', username=None):
+    allowed = 0
+    for _ in range(n):
+        try:
+            limiter.check(ip, username)
+            allowed += 1
+        except RateLimited:
+            pass
+    return allowed
+
+def test_burst_then_refill(clock):
+    limiter = RateLimiter(mode='memory', limits={'ip': '3/30', 'username': '100/1'})
+    assert attempts(limiter, 5) == 3
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.check('10.0.0.1')
+    assert excinfo.value.limit == 'ip' and excinfo.value.retry_after == pytest.approx(10)
+    clock[0] += 10
+    assert attempts(limiter, 2) == 1
+    assert attempts(limiter, 1, ip='10.0.0.2') == 1    # other IPs have their own bucket
+    stats = limiter.stats()
+    assert stats['allowed'] == 5 and stats['rejected'] == {'ip': 4, 'username': 0}
+
+def test_username_limited_across_ips(clock):
+    limiter = RateLimiter(mode='memory', limits={'ip': '100/1', 'username': '2/60'})
+    allowed = sum(attempts(limiter, 1, ip=f'10.0.0.{i}', username='Victim') for i in range(5))
+    assert allowed == 2
+    assert attempts(limiter, 1, username='victim ') == 0    # same bucket after normalising
+    assert RateLimiter(mode='off', limits={'ip': '1/60'}).check('10.0.0.1') is None
+
+@pytest.mark.parametrize('mode', ['memory', 'sqlite'])
+def test_rejected_attempt_charges_neither_bucket(db_path, clock, mode):
+    limiter = RateLimiter(db_path, mode=mode, limits={'ip': '3/60', 'username': '1/60'})
+    assert attempts(limiter, 1, username='victim') == 1
+    # The locked-out username must not use up the IP's attempts
+    assert attempts(limiter, 5, username='victim') == 0
+    assert attempts(limiter, 2, username='other') + attempts(limiter, 5, username='third') == 2
+    assert limiter.stats()['rejected'] == {'ip': 4, 'username': 6}
+    if mode == 'sqlite':
+        # The shared IP bucket was charged for the three allowed attempts only
+        with sqlite3.connect(db_path) as db:
+            assert db.execute("SELECT tokens FROM auth_rate_limits WHERE bucketKey = 'ip:10.0.0.1'").fetchone() == (0,)
+
+def test_refilled_buckets_are_evicted(clock):
+    limiter = RateLimiter(mode='memory', limits={'ip': '2/10', 'username': '2/10'}, max_buckets=3)
+    for i in range(5):
+        limiter.check(f'10.0.0.{i}')
+    # Over max_buckets the least recently used is dropped
+    assert limiter.stats()['limits']['ip']['buckets'] == 3
+    clock[0] += 30
+    limiter.check('10.0.0.9')
+    stats = limiter.stats()['limits']['ip']
+    assert stats['buckets'] == 1 and stats['evicted'] == 5
+
+def test_sqlite_mode_shares_buckets_between_workers(db_path, clock):
+    limits = {'ip': '4/60', 'username': '100/1'}
+    worker_a = RateLimiter(db_path, mode='sqlite', limits=limits)
+    worker_b = RateLimiter(db_path, mode='sqlite', limits=limits)
+    assert attempts(worker_a, 3) == 3
+    assert attempts(worker_b, 3) == 1
+    # Once worker_b has seen the shared bucket empty it rejects from memory
+    checks = worker_b.stats()['dbChecks']
+    assert attempts(worker_b, 5) == 0 and worker_b.stats()['dbChecks'] == checks
+    clock[0] += 15
+    assert attempts(worker_a, 2) + attempts(worker_b, 2) == 1
+    with sqlite3.connect(db_path) as db:
+        assert sweep_expired_tokens(db, now=int(clock[0]))['auth_rate_limits'] == 0
+        assert sweep_expired_tokens(db, now=int(clock[0]) + 61)['auth_rate_limits'] == 1
+
+def test_login_rejected_before_bcrypt(db_path, monkeypatch):
+    import controllers.auth_controller as controller
+    old = hashpool.set_hash_pool(HashPool(workers=0))
+    try:
+        monkeypatch.setattr(controller, 'auth_manager', AuthManager(db_path))
+        monkeypatch.setattr(controller, 'rate_limiter',
+                            RateLimiter(db_path, mode='memory', limits={'ip': '100/60', 'username': '3/60'}))
+        client = controller.app.test_client()
+        assert client.post('/auth/register', json={'username': 'limited', 'password': 'pw'}).status_code == 201
+        hashes = []
+        verify = controller.auth_manager.verify_password
+        monkeypatch.setattr(controller.auth_manager, 'verify_password',
+                            lambda plain, hashed: hashes.append(plain) or verify(plain, hashed))
+        codes = [client.post('/auth/login', json={'username': 'limited', 'password': 'wrong'}).status_code
+                 for _ in range(4)]
+        assert codes == [401, 401, 429, 429] and len(hashes) == 2
+        resp = client.post('/auth/login', json={'username': 'limited', 'password': 'pw'})
+        assert resp.status_code == 429 and 1 <= int(resp.headers['Retry-After']) <= 20
+        stats = client.get('/auth/rate-limit/stats').get_json()['rateLimit']
+        assert stats['rejected']['username'] == 3 and stats['limits']['username']['burst'] == 3
+    finally:
+        hashpool.set_hash_pool(old)
+
+def test_non_string_credentials_are_rejected(db_path, clock, monkeypatch):
+    import controllers.auth_controller as controller
+    monkeypatch.setattr(controller, 'auth_manager', AuthManager(db_path))
+    monkeypatch.setattr(controller, 'rate_limiter', RateLimiter(db_path, mode='memory'))
+    client = controller.app.test_client()
+    for route in ('/auth/login', '/auth/register'):
+        for body in ({'username': 123, 'password': 'pw'}, {'username': 'x', 'password': ['pw']}):
+            resp = client.post(route, json=body)
+            assert resp.status_code == 400 and resp.get_json()['error'] == 'Username and password must be strings'
+    limiter = RateLimiter(db_path, mode='memory', limits={'ip': '100/60', 'username': '1/60'})
+    limiter.check('10.0.0.1', 123)
+    with pytest.raises(RateLimited):
+        limiter.check('10.0.0.2', '123')
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(mode='sometimes')
+    with pytest.raises(ValueError):
+        RateLimiter(limits={'ip': '0/60'})
@@ -0,0 +1,104 @@
+# File: tests/Backend/B-57.py
+# Author: Allyson Taylor
+# Date: 2026-10-18
+# Description:
+#   Backend unit test for the queued JSON error log.
+#   Verifies: Errors are written off the calling thread as JSON lines, repeated identical
+#   errors are sampled with the suppressed count carried forward, the file rotates by size,
+#   a full queue drops instead of blocking, and the log directory is created on demand.
+#   Test Case: B-57 error log pipeline
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+import json
+import logging
+from models import errorlog
+from models.errorlog import LogPipeline, configure_logging, logging_stats
+
+@pytest.fixture
+def logger(request):
+    logger = logging.getLogger(f'arcadia.test.{request.node.name}')
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+def attach(logger, path, **options):
+    pipeline = LogPipeline(str(path), logging.ERROR, options.pop('max_bytes', 0), options.pop('backups', 0), **options)
+    logger.addHandler(pipeline.handler)
+    return pipeline
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_errors_written_as_json_lines(logger, tmp_path):
+    path = tmp_path / 'nested' / 'errors.log'
+    pipeline = attach(logger, path)
+    assert not path.parent.exists()    # nothing is created until the first write
+    logger.warning('below the level')
+    logger.error('Login failed: %s', 'Invalid credentials.')
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception('Logout failed')
+    pipeline.flush()
+    first, second = read_lines(path)
+    assert first['level'] == 'ERROR' and first['logger'] == logger.name
+    assert first['message'] == 'Login failed: Invalid credentials.' and 'suppressed' not in first
+    assert second['message'] == 'Logout failed' and 'ValueError: boom' in second['exception']
+    pipeline.stop()
+
+def test_repeated_errors_are_sampled(logger, tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(errorlog.time, 'monotonic', lambda: now[0])
+    pipeline = attach(logger, tmp_path / 'errors.log', window=60, burst=3)
+    for _ in range(10):
+        logger.error('Login failed: Invalid credentials.')
+    logger.error('Token validation failed: Token expired.')
+    now[0] += 60
+    logger.error('Login failed: Invalid credentials.')
+    pipeline.flush()
+    lines = read_lines(tmp_path / 'errors.log')
+    assert [line['message'].split(':')[0] for line in lines] == ['Login failed'] * 3 + ['Token validation failed',
+                                                                                      'Login failed']
+    assert lines[-1]['suppressed'] == 7
+    assert pipeline.stats()['suppressed'] == 7
+    pipeline.stop()
+
+def test_rotates_by_size(logger, tmp_path):
+    path = tmp_path / 'errors.log'
+    pipeline = attach(logger, path, max_bytes=500, backups=2)
+    for i in range(40):
+        logger.error(f'distinct error {i}')
+    pipeline.stop()
+    assert sorted(os.listdir(tmp_path)) == ['errors.log', 'errors.log.1', 'errors.log.2']
+    assert all(os.path.getsize(tmp_path / name) < 700 for name in os.listdir(tmp_path))
+    assert read_lines(path)[-1]['message'] == 'distinct error 39'
+
+def test_full_queue_drops_without_blocking(logger, tmp_path):
+    pipeline = attach(logger, tmp_path / 'errors.log', queue_size=5)
+    pipeline.stop()    # nothing drains the queue
+    for i in range(8):
+        logger.error(f'error {i}')
+    assert pipeline.stats()['dropped'] == 3 and pipeline.stats()['queued'] == 5
+    pipeline.flush()
+    assert len(read_lines(tmp_path / 'errors.log')) == 5
+    pipeline.stop()
+
+def test_configure_logging_replaces_root_handler(tmp_path, monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(errorlog, '_pipeline', None)
+    monkeypatch.setattr(root, 'handlers', [])
+    monkeypatch.setattr(root, 'level', root.level)
+    pipeline = configure_logging(path=str(tmp_path / 'a.log'))
+    assert configure_logging() is pipeline and root.level == logging.ERROR
+    replacement = configure_logging(path=str(tmp_path / 'b.log'))
+    assert root.handlers == [replacement.handler] and not pipeline.running
+    logging.error('routed through the root logger')
+    replacement.stop()
+    assert read_lines(tmp_path / 'b.log')[0]['message'] == 'routed through the root logger'
+    assert logging_stats()['file'] == str(tmp_path / 'b.log')